@@ -0,0 +1,272 @@
+import collections
+import math
+import threading
+import time
+
+from config import (
+    CURSOR_RATE_HZ, CURSOR_RENDER_DELAY, CURSOR_MAX_EXTRAPOLATION, CURSOR_LATENCY_SMOOTHING,
+    SCROLL_FRICTION, SCROLL_MIN_VELOCITY, SCROLL_RATE_HZ
+)
+from gestures import Action
+from pipeline import ActionQueue
+
+# How long the executor waits for an action while nothing is coasting
+ACTION_POLL_TIMEOUT = 0.1
+
+
+class CursorActuator(threading.Thread):
+    """Moves the cursor at a fixed rate, independent of camera FPS.
+
+    The tracker pushes timestamped target positions (one per camera frame).
+    This thread wakes on a deadline-based timer at `rate_hz` and estimates
+    where the cursor should be from the last two samples. Samples carry
+    their capture time, so they always arrive a pipeline latency late; the
+    estimate is rendered that (smoothed) latency plus `delay` frame
+    intervals behind now. With the default half frame it interpolates
+    between the two samples for the first half of each frame interval and
+    extrapolates up to half a frame past the newest for the second (one
+    frame interpolates only, 0 always extrapolates); a late sample
+    extrapolates further, by a bounded distance. The cursor is only moved
+    when the rounded pixel position actually changes.
+
+    With a `timer`, each move_to() call is recorded as the "mouse" stage,
+    and the time from a sample's capture to the first cursor move that
+    reflects it as "motion_to_cursor" (the end-to-end latency).
+    """
+
+    def __init__(self, mouse, rate_hz=CURSOR_RATE_HZ, delay=CURSOR_RENDER_DELAY, max_extrapolation=CURSOR_MAX_EXTRAPOLATION, timer=None):
+        super().__init__()
+        self.daemon = True
+        self.mouse = mouse
+        self.timer = timer
+        width, height = mouse.size()
+        self.bounds = (0, 0, width - 1, height - 1) # Desktop pixels (x0, y0, x1, y1), inclusive
+        self.running = True
+        self.period = 1.0 / rate_hz
+        self.delay = delay # Frame intervals behind the newest sample (0 = predict "now")
+        self.latency = None # Smoothed capture -> push latency (seconds)
+        self.max_extrapolation = max_extrapolation
+
+        self._samples = collections.deque(maxlen=2) # (timestamp, x, y)
+        self._lock = threading.Lock()
+        self.active = False
+
+        # Coalescing
+        self.last_position = None
+        self.moves = 0
+        self.coalesced = 0
+
+        # Latency: capture time of the newest sample not yet on screen
+        self.pending_timestamp = None
+
+    def push(self, x, y, timestamp):
+        # `timestamp` is the perf_counter() time the source frame was captured
+        with self._lock:
+            self._samples.append((timestamp, x, y))
+            latency = time.perf_counter() - timestamp
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += CURSOR_LATENCY_SMOOTHING * (latency - self.latency)
+            self.pending_timestamp = timestamp
+            self.active = True
+
+    def deactivate(self):
+        # Hold the cursor where it is until the next push()
+        with self._lock:
+            self._samples.clear()
+            self.pending_timestamp = None
+            self.active = False
+
+    def estimate(self, now):
+        with self._lock:
+            samples = tuple(self._samples)
+        if not samples:
+            return None
+
+        t1, x1, y1 = samples[-1]
+        if len(samples) == 1:
+            return x1, y1
+        t0, x0, y0 = samples[0]
+        dt = t1 - t0
+        if dt <= 0:
+            return x1, y1
+
+        # Offset from the newest sample: negative values interpolate back
+        # towards the older one, positive values extrapolate (bounded).
+        offset = (now - (self.latency or 0.0) - self.delay * dt) - t1
+        offset = max(-dt, min(self.max_extrapolation, offset))
+        return (
+            x1 + (x1 - x0) / dt * offset,
+            y1 + (y1 - y0) / dt * offset
+        )
+
+    def run(self):
+        deadline = time.perf_counter()
+        while self.running:
+            deadline += self.period
+
+            if self.active:
+                position = self.estimate(time.perf_counter())
+                if position is not None:
+                    self.move(*position)
+
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            else:
+                # Fell behind (e.g. a slow moveTo): resync instead of bursting
+                deadline = time.perf_counter()
+
+    def move(self, x, y):
+        x0, y0, x1, y1 = self.bounds
+        x = int(round(max(x0, min(x1, x))))
+        y = int(round(max(y0, min(y1, y))))
+        if (x, y) == self.last_position:
+            self.coalesced += 1
+            return
+        if self.timer is None:
+            self.mouse.move_to(x, y)
+            self.mouse.flush()
+        else:
+            with self.timer.measure("mouse"):
+                self.mouse.move_to(x, y)
+                self.mouse.flush()
+            pending = self.pending_timestamp
+            if pending is not None:
+                self.pending_timestamp = None
+                self.timer.record("motion_to_cursor", time.perf_counter() - pending)
+        self.last_position = (x, y)
+        self.moves += 1
+
+    def stop(self):
+        self.running = False
+
+
+class ActionExecutor(threading.Thread):
+    """Carries out gesture Actions (see gestures.py) on the mouse.
+
+    The actuation stage only queues actions, so a slow mouseDown() or
+    scroll() never holds up the next frame. Scrolling keeps its momentum:
+    each scroll action sets a velocity (clicks per second) that keeps
+    scrolling at SCROLL_RATE_HZ between frames and decays with
+    SCROLL_FRICTION once the hand stops. Fractions of a wheel click are
+    carried over rather than lost.
+
+    Buttons held down are tracked, so a "release_all" action, or stopping
+    the executor, lets go of all of them. With a `timer`, left button
+    presses are recorded as "press_latency" (capture of the deciding frame
+    -> button down) and every press or click as "click_latency" (capture of
+    the frame where the pinch began -> button down).
+    """
+
+    def __init__(self, mouse, actions=None, timer=None, friction=SCROLL_FRICTION,
+                 min_velocity=SCROLL_MIN_VELOCITY, rate_hz=SCROLL_RATE_HZ):
+        super().__init__()
+        self.daemon = True
+        self.mouse = mouse
+        self.actions = actions if actions is not None else ActionQueue()
+        self.timer = timer
+        self.running = True
+        self.friction = friction
+        self.min_velocity = min_velocity
+        self.period = 1.0 / rate_hz
+
+        self.pressed = set()
+        self.velocity = 0.0 # Scroll clicks per second
+        self.last_scroll = None # Timestamp of the last scroll action
+        self.remainder = 0.0 # Fraction of a click not yet scrolled
+
+    def run(self):
+        try:
+            while True:
+                action = self.actions.get(timeout=self.period if self.velocity else ACTION_POLL_TIMEOUT)
+                if action is None:
+                    self.coast()
+                elif action.kind == "stop":
+                    break
+                else:
+                    self.execute(action)
+                    if not len(self.actions):
+                        self.mouse_call(self.mouse.flush) # One write per drained batch
+        finally:
+            self.release_all()
+
+    def execute(self, action):
+        kind = action.kind
+        if kind == "press":
+            if action.button not in self.pressed:
+                self.mouse_call(self.mouse.press, action.button)
+                self.pressed.add(action.button)
+                self.record_latency(action)
+        elif kind == "release":
+            if action.button in self.pressed:
+                self.mouse_call(self.mouse.release, action.button)
+                self.pressed.discard(action.button)
+        elif kind == "click":
+            self.mouse_call(self.mouse.press, action.button)
+            self.record_latency(action)
+            self.mouse_call(self.mouse.release, action.button)
+        elif kind == "scroll":
+            # Velocity from the time since the previous scroll frame
+            if self.last_scroll is not None and action.timestamp > self.last_scroll:
+                elapsed = min(action.timestamp - self.last_scroll, 4 * self.period)
+            else:
+                elapsed = self.period
+            self.last_scroll = action.timestamp
+            # Spread the frame's travel over the ticks until the next frame
+            self.velocity = action.amount / max(elapsed, self.period)
+            self.scroll(self.velocity * self.period)
+        elif kind == "release_all":
+            self.release_all()
+
+    def record_latency(self, action):
+        if self.timer is None:
+            return
+        now = time.perf_counter()
+        if action.kind == "press" and action.button == "left" and action.timestamp is not None:
+            self.timer.record("press_latency", now - action.timestamp)
+        if action.onset is not None:
+            self.timer.record("click_latency", now - action.onset)
+
+    def coast(self):
+        # Called every period without a new action while scrolling
+        if not self.velocity:
+            return
+        self.velocity *= math.exp(-self.friction * self.period)
+        if abs(self.velocity) < self.min_velocity:
+            self.velocity = 0.0
+            self.remainder = 0.0
+            return
+        self.scroll(self.velocity * self.period)
+        self.mouse_call(self.mouse.flush)
+
+    def scroll(self, amount):
+        self.remainder += amount
+        clicks = int(self.remainder)
+        if clicks:
+            self.remainder -= clicks
+            self.mouse_call(self.mouse.scroll, clicks)
+
+    def release_all(self):
+        for button in tuple(self.pressed):
+            self.mouse_call(self.mouse.release, button)
+        if self.pressed:
+            self.mouse_call(self.mouse.flush)
+        self.pressed.clear()
+        self.velocity = 0.0
+        self.remainder = 0.0
+        self.last_scroll = None
+
+    def mouse_call(self, method, *args):
+        if self.timer is None:
+            method(*args)
+        else:
+            with self.timer.measure("mouse"):
+                method(*args)
+
+    def stop(self):
+        # Actions queued so far are still carried out, then buttons released
+        # (a "stop" action marks the end of the queue)
+        self.running = False
+        self.actions.put(Action("stop"))
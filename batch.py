@@ -0,0 +1,259 @@
+import argparse
+import collections
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+from config import INFERENCE_LEVELS, MAX_NUM_HANDS, SharedState
+from gestures import GESTURE_CODES, GESTURE_NAMES, GestureEngine
+from hands import HandMatcher
+from landmarks import NUM_LANDMARKS
+from shm import SharedFrameRing
+
+# Offline batch labelling: runs hand detection and the gesture table over a
+# whole video file as fast as the machine allows, and writes the landmarks
+# and gesture events to one .npz file.
+#
+#   python batch.py recordings/session/frames.mp4 -o session_labels.npz
+#
+# One thread decodes the video into batches of consecutive frames; a pool of
+# worker processes, each with its own MediaPipe graph, runs the batches in
+# parallel, reading the frames from a shared memory ring. Results are put
+# back in frame order and the hand matching and gesture evaluation (which
+# depend on the previous frame) run here, exactly as the live ActuationStage
+# would on every hand.
+
+# Consecutive frames per task: a worker tracks the hand within a batch and,
+# unless the batch carries on from its previous one, starts detecting afresh
+# with a restarted MediaPipe graph. Every batch in flight holds this many
+# frames of the shared memory ring.
+BATCH_FRAMES = 16
+
+# Batches submitted to the pool and not yet collected, per worker
+BATCHES_PER_WORKER = 2
+
+_detector = None
+_detector_error = None
+_ring = None # The SharedFrameRing the batches are read from
+_next_frame = None # Index of the frame after this worker's previous batch
+
+
+def _init_worker(max_num_hands):
+    # Pool initializer. Errors are kept for the first task to report: an
+    # initializer that raises makes the pool respawn workers forever.
+    global _detector, _detector_error
+    try:
+        from detector import AdaptiveInputController, HandDetector
+        # Offline there is no frame budget: always the most accurate level
+        controller = AdaptiveInputController(levels=INFERENCE_LEVELS[:1])
+        _detector = HandDetector(max_num_hands=max_num_hands, controller=controller)
+    except Exception as e:
+        _detector_error = f"{type(e).__name__}: {e}"
+
+
+def _process_batch(ring_name, shape, ring_slots, slots, index):
+    # Runs the frames in `slots` of the ring, the first of them frame `index`
+    # of the video; the ring is attached on the first batch
+    global _ring, _next_frame
+    if _detector is None:
+        raise RuntimeError(f"Hand detector failed to load: {_detector_error}")
+    if _ring is None or _ring.name != ring_name:
+        _ring = SharedFrameRing(shape, ring_slots, name=ring_name)
+    if index != _next_frame:
+        # The previous batch this worker saw is elsewhere in the video: drop
+        # the ROI and MediaPipe's own tracking state along with it
+        _detector.reset(graph=True)
+    _next_frame = index + len(slots)
+    return [_detector.process(_ring.view(slot)) for slot in slots]
+
+
+def read_batches(cap, batches, batch_frames, stop):
+    # Reader thread: decodes the video into (first frame index, timestamps,
+    # frames) batches; None marks the end
+    index = 0
+    while not stop.is_set():
+        timestamps, frames = [], []
+        while len(frames) < batch_frames:
+            success, image = cap.read()
+            if not success:
+                break
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+            frames.append(image)
+        if frames:
+            batches.put((index, timestamps, frames))
+            index += len(frames)
+        if len(frames) < batch_frames:
+            break
+    batches.put(None)
+
+
+class BatchLabeller:
+    """Collects per-frame hands and gesture events into columnar arrays.
+
+    Hands are matched across frames (HandMatcher) and each gets its own
+    GestureEngine, so IDs and events match what the live app would produce
+    for every hand in view. Landmarks are stored as detected, in image
+    coordinates (not mirrored like the live preview).
+    """
+
+    def __init__(self, shared_state, max_num_hands):
+        self.state = shared_state
+        self.max_num_hands = max_num_hands
+        self.matcher = HandMatcher()
+        self.engines = {} # hand_id -> GestureEngine
+
+        # Per frame
+        self.timestamps = []
+        self.hand_ids = []
+        self.landmarks = []
+        self.gestures = []
+
+        # Per event
+        self.events = collections.defaultdict(list)
+
+    def add(self, timestamp, hands):
+        frame = len(self.timestamps)
+        tracked = self.matcher.update(0, hands, timestamp)
+
+        hand_ids = np.full(self.max_num_hands, -1, dtype=np.int32)
+        landmarks = np.full((self.max_num_hands, NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        gestures = np.zeros(self.max_num_hands, dtype=np.int8)
+
+        engines = {}
+        for slot, hand in enumerate(tracked[:self.max_num_hands]):
+            engine = self.engines.get(hand.hand_id) or GestureEngine(self.state)
+            engines[hand.hand_id] = engine
+            filtered = engine.filter_landmarks(hand.landmarks, timestamp)
+            gesture, actions = engine.recognise(filtered, timestamp)
+
+            hand_ids[slot] = hand.hand_id
+            landmarks[slot] = hand.landmarks
+            gestures[slot] = GESTURE_CODES[gesture]
+            for action in actions:
+                self.events["frame"].append(frame)
+                self.events["time"].append(timestamp)
+                self.events["hand_id"].append(hand.hand_id)
+                self.events["kind"].append(action.kind)
+                self.events["button"].append(action.button or "")
+                self.events["amount"].append(action.amount)
+        self.engines = engines
+
+        self.timestamps.append(timestamp)
+        self.hand_ids.append(hand_ids)
+        self.landmarks.append(landmarks)
+        self.gestures.append(gestures)
+
+    def save(self, path):
+        # Columnar arrays only (no pickled objects), loadable with np.load()
+        count = len(self.timestamps)
+        shape = (count, self.max_num_hands)
+        np.savez_compressed(
+            path,
+            timestamps=np.asarray(self.timestamps, dtype=np.float64),
+            hand_ids=np.asarray(self.hand_ids, dtype=np.int32).reshape(shape),
+            landmarks=np.asarray(self.landmarks, dtype=np.float32).reshape(shape + (NUM_LANDMARKS, 3)),
+            gestures=np.asarray(self.gestures, dtype=np.int8).reshape(shape),
+            gesture_names=np.array(GESTURE_NAMES),
+            event_frame=np.asarray(self.events["frame"], dtype=np.int64),
+            event_time=np.asarray(self.events["time"], dtype=np.float64),
+            event_hand_id=np.asarray(self.events["hand_id"], dtype=np.int32),
+            event_kind=np.asarray(self.events["kind"], dtype=str),
+            event_button=np.asarray(self.events["button"], dtype=str),
+            event_amount=np.asarray(self.events["amount"], dtype=np.float32)
+        )
+
+
+def run_batch(video_path, output_path, workers=None, max_num_hands=MAX_NUM_HANDS, shared_state=None, batch_frames=BATCH_FRAMES):
+    # Labels `video_path` into `output_path` (.npz); returns a summary dict.
+    # `shared_state` supplies the gesture settings (thresholds, filter).
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    labeller = BatchLabeller(shared_state or SharedState(), max_num_hands)
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video {video_path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    in_flight = workers * BATCHES_PER_WORKER
+    batches = queue.Queue(maxsize=in_flight)
+    stop = threading.Event()
+    ring = None
+    reader = threading.Thread(target=read_batches, args=(cap, batches, batch_frames, stop), daemon=True)
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    pool = context.Pool(workers, initializer=_init_worker, initargs=(max_num_hands,))
+    try:
+        reader.start()
+        # Bounded number of batches in flight, collected in submission order.
+        # Frames go through a ring with room for one batch more than that:
+        # a batch's slots are only written again once it has been collected.
+        pending = collections.deque()
+        while True:
+            batch = batches.get()
+            if batch is not None:
+                index, timestamps, frames = batch
+                if ring is None:
+                    ring = SharedFrameRing(frames[0].shape, (in_flight + 1) * batch_frames)
+                slots = [ring.write(image) for image in frames]
+                args = (ring.name, ring.shape, ring.slots, slots, index)
+                pending.append((timestamps, pool.apply_async(_process_batch, args)))
+            while pending and (batch is None or len(pending) > in_flight):
+                timestamps, result = pending.popleft()
+                for timestamp, hands in zip(timestamps, result.get()):
+                    labeller.add(timestamp, hands)
+            if batch is None:
+                break
+    finally:
+        stop.set()
+        pool.terminate()
+        pool.join()
+        # Unblock and finish the reader before releasing the capture
+        while reader.is_alive():
+            try:
+                batches.get_nowait()
+            except queue.Empty:
+                reader.join(timeout=0.1)
+        cap.release()
+        if ring is not None:
+            ring.close()
+    elapsed = time.perf_counter() - start
+
+    labeller.save(output_path)
+    frames = len(labeller.timestamps)
+    video_seconds = frames / video_fps if video_fps > 0 else 0.0
+    return {
+        "source": video_path,
+        "output": output_path,
+        "frames": frames,
+        "seconds": elapsed,
+        "throughput_fps": frames / elapsed if elapsed > 0 else 0.0,
+        "speedup": video_seconds / elapsed if elapsed > 0 else 0.0, # x real time
+        "events": len(labeller.events["frame"]),
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Label a video file with hand landmarks and gesture events.")
+    parser.add_argument("path", help="Video file")
+    parser.add_argument("-o", "--output", help="Output .npz file (default: next to the video)")
+    parser.add_argument("--workers", type=int, help="MediaPipe worker processes (default: half the CPUs)")
+    parser.add_argument("--hands", type=int, default=MAX_NUM_HANDS, help="Hands to detect per frame")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.path)[0] + "_labels.npz"
+    report = run_batch(args.path, output, workers=args.workers, max_num_hands=args.hands)
+    print(f"Source:      {report['source']}")
+    print(f"Frames:      {report['frames']} in {report['seconds']:.2f}s ({report['throughput_fps']:.1f} FPS, {report['speedup']:.1f}x real time)")
+    print(f"Workers:     {report['workers']}")
+    print(f"Events:      {report['events']}")
+    print(f"Saved to:    {report['output']}")
+
+
+if __name__ == "__main__":
+    main()
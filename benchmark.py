@@ -0,0 +1,89 @@
+import argparse
+import json
+import time
+
+from config import SharedState
+from mouse import NullMouse
+from pipeline import StageTimer
+from replay import open_replay
+from tracker import HandTracker
+
+# Offline benchmark: runs the full tracking pipeline over a recorded video
+# (MediaPipe included) or a landmark trace (gesture/actuation only), with a
+# null mouse, and reports per-stage latency percentiles, throughput and
+# gesture event timing. Needs no webcam or display.
+#
+#   python benchmark.py recordings/session/frames.mp4
+#   python benchmark.py recordings/session/landmarks.trace --json report.json
+
+
+def run_benchmark(path, realtime=False):
+    timer = StageTimer(window=None) # Keep every sample
+    state = SharedState(timer=timer)
+    source, detector = open_replay(path, realtime)
+    mouse = NullMouse(record=True)
+
+    tracker = HandTracker(state, source=source, detector=detector, mouse=mouse)
+    start = time.perf_counter()
+    tracker.start()
+    tracker.join()
+    elapsed = time.perf_counter() - start
+
+    frames = state.snapshot().version # One snapshot per processed frame
+    return {
+        "source": path,
+        "realtime": realtime,
+        "frames": frames,
+        "seconds": elapsed,
+        "throughput_fps": frames / elapsed if elapsed > 0 else 0.0,
+        "dropped_frames": tracker.frames.dropped + tracker.results.dropped,
+        "cursor_moves": mouse.moves,
+        # Frames that ran the detector (the rest reused unchanged landmarks)
+        "inferred_frames": tracker.scheduler.inferred if tracker.scheduler and source.has_frames else frames,
+        "stages": timer.stats(),
+        "gestures": {
+            "presses": sum(1 for event in mouse.events if event[1] == "press"),
+            "releases": sum(1 for event in mouse.events if event[1] == "release"),
+            # (seconds since start, kind)
+            "events": [(t - start, kind) for t, kind, _, _ in mouse.events],
+        },
+    }
+
+
+def print_report(report):
+    print(f"Source:      {report['source']}")
+    print(f"Frames:      {report['frames']} in {report['seconds']:.2f}s ({report['throughput_fps']:.1f} FPS)")
+    print(f"Dropped:     {report['dropped_frames']}")
+    print(f"Inferred:    {report['inferred_frames']} frames")
+    print(f"Cursor:      {report['cursor_moves']} moves")
+    print(f"Gestures:    {report['gestures']['presses']} presses, {report['gestures']['releases']} releases")
+    if not report["realtime"]:
+        # Frames carry the recording's timestamps but arrive faster than
+        # that, so capture -> X latencies only mean something with --realtime
+        print("Latencies:   capture-relative stages need --realtime")
+    click = report["stages"].get("click_latency")
+    if click:
+        print(f"Clicks:      {click['p50']:.2f} ms p50, {click['p95']:.2f} ms p95 from pinch onset to button down")
+    print()
+    print(f"{'stage':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'count':>8}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<16}{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}{stats['count']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tracking pipeline on a recording.")
+    parser.add_argument("path", help="Recorded video file, or a .trace / .npz landmark trace")
+    parser.add_argument("--realtime", action="store_true", help="Pace replay at the recorded rate")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.path, realtime=args.realtime)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
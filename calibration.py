@@ -1,133 +1,298 @@
-import time
-import numpy as np
-import mediapipe as mp
-import threading
+import functools
+import math
+
+from filters import tune_for_jitter
+from landmarks import INDEX, INDEX_FINGER_TIP, THUMB, hand_scale, tip_distances
+
+# Seconds each step shows its instructions before sampling, and its result
+# afterwards
+PROMPT_SECONDS = 2.0
+RESULT_SECONDS = 2.0
+
+
+class RunningStats:
+    """Streaming mean / variance / range (Welford's algorithm).
+
+    Constant memory and O(1) per sample, so calibration can look at every
+    frame instead of keeping sample lists.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def sem(self):
+        # Standard error of the mean
+        return self.std / math.sqrt(self.count) if self.count > 1 else math.inf
+
+
+class RangeStep:
+    # Sweep the index tip left to right. Done once both extremes have held
+    # for `settle` seconds over a plausible span.
+    message = "Step 1/7: Move hand FAR LEFT -> FAR RIGHT"
+    min_seconds, max_seconds = 1.5, 5.0
+    settle = 1.0
+    min_span = 0.3
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.extended_at = None
+
+    def add(self, landmarks, timestamp):
+        x = float(landmarks[INDEX_FINGER_TIP, 0])
+        before = (self.stats.min, self.stats.max)
+        self.stats.add(x)
+        if (self.stats.min, self.stats.max) != before:
+            self.extended_at = timestamp
+
+    def converged(self, timestamp):
+        return (
+            self.stats.max - self.stats.min >= self.min_span
+            and timestamp - self.extended_at >= self.settle
+        )
+
+    def apply(self, state):
+        if self.stats.count == 0:
+            return "Step 1 Failed: No hand detected"
+        # Calculate margin (symmetric): average the margins from both sides
+        margin_left = self.stats.min
+        margin_right = 1.0 - self.stats.max
+        new_margin = (margin_left + margin_right) / 2
+
+        # Clamp margin for sanity (0.05 to 0.4)
+        new_margin = max(0.05, min(0.4, new_margin))
+
+        state.update_settings(margin=new_margin)
+        return f"Range Set! Margin: {new_margin:.2f}"
+
+
+class CornerStep:
+    # Hold the hand where the cursor should reach one screen corner. Done
+    # once the mean index tip position is known to within `tolerance` on
+    # both axes (standard error). The four corners together give the
+    # perspective mapping (see mapping.py).
+    corners = ("TOP-LEFT", "TOP-RIGHT", "BOTTOM-RIGHT", "BOTTOM-LEFT")
+    min_seconds, max_seconds = 1.0, 4.0
+    min_samples = 15
+    tolerance = 0.003
+
+    def __init__(self, corner):
+        self.corner = corner
+        self.number = 2 + corner
+        self.message = f"Step {self.number}/7: Point to the screen's {self.corners[corner]} corner (Hold)"
+        self.x = RunningStats()
+        self.y = RunningStats()
+
+    def add(self, landmarks, timestamp):
+        self.x.add(float(landmarks[INDEX_FINGER_TIP, 0]))
+        self.y.add(float(landmarks[INDEX_FINGER_TIP, 1]))
+
+    def converged(self, timestamp):
+        return self.x.count >= self.min_samples and max(self.x.sem, self.y.sem) <= self.tolerance
+
+    def apply(self, state):
+        if self.x.count == 0:
+            return f"Step {self.number} Failed: No hand detected"
+        settings = state.settings
+        points = settings.mapping_points
+        if points is None:
+            # Start from the margin rectangle, so each corner is usable alone
+            low, high = settings.margin, 1.0 - settings.margin
+            points = ((low, low), (high, low), (high, high), (low, high))
+        points = list(points)
+        points[self.corner] = (self.x.mean, self.y.mean)
+        state.update_settings(mapping_points=tuple(points))
+        return f"Corner Set! ({self.x.mean:.2f}, {self.y.mean:.2f})"
+
+
+class PinchStep:
+    # Hold a natural pinch. Done once the mean thumb-index distance (in hand
+    # scales, like the click threshold) is known to within `tolerance`
+    # (relative standard error).
+    message = "Step 6/7: Pinch fingers naturally (Hold Pinch)"
+    min_seconds, max_seconds = 1.0, 4.0
+    min_samples = 15
+    tolerance = 0.05
+
+    def __init__(self):
+        self.stats = RunningStats()
+
+    def add(self, landmarks, timestamp):
+        self.stats.add(float(tip_distances(landmarks)[THUMB, INDEX]) / max(hand_scale(landmarks), 1e-6))
+
+    def converged(self, timestamp):
+        return self.stats.count >= self.min_samples and self.stats.sem <= self.tolerance * self.stats.mean
+
+    def apply(self, state):
+        if self.stats.count == 0:
+            return "Step 6 Failed: No hand detected"
+        # Set threshold slightly higher than average pinch distance
+        new_threshold = self.stats.mean * 1.3
+        new_threshold = max(0.1, min(1.0, new_threshold)) # Sanity clamp
+
+        state.update_settings(click_threshold=new_threshold)
+        return f"Pinch Set! Threshold: {new_threshold:.3f}"
+
+
+class StabilityStep:
+    # Hold still. Done once the jitter (standard deviation) estimate has a
+    # relative standard error of at most `tolerance` (~1 / sqrt(2(n - 1))).
+    message = "Step 7/7: Hold hand STEADY"
+    min_seconds, max_seconds = 1.0, 3.0
+    min_samples = 10
+    tolerance = 0.15
+
+    def __init__(self):
+        self.stats = RunningStats()
+
+    def add(self, landmarks, timestamp):
+        self.stats.add(float(landmarks[INDEX_FINGER_TIP, 0]))
+
+    def converged(self, timestamp):
+        n = self.stats.count
+        return n >= self.min_samples and 1.0 / math.sqrt(2 * (n - 1)) <= self.tolerance
+
+    def apply(self, state):
+        if self.stats.count < self.min_samples:
+            return "Step 7 Failed: Not enough data"
+        # Landmark jitter while holding still tunes every filter:
+        # steady hand -> light smoothing, shaky -> heavy smoothing
+        std_dev = self.stats.std
+        for filter_type, filter_params in tune_for_jitter(std_dev).items():
+            state.update_filter_params(filter_type, **filter_params)
+        return f"Stability Set! Jitter: {std_dev:.4f}"
+
+
+CALIBRATION_STEPS = (
+    (RangeStep,)
+    + tuple(functools.partial(CornerStep, corner) for corner in range(4))
+    + (PinchStep, StabilityStep)
+)
+
 
 class CalibrationWizard:
-    def __init__(self, shared_state, dashboard):
+    """Calibration as a state machine fed by the tracker, one frame at a time.
+
+    start() registers on_frame() as a SharedState frame hook; the tracker then
+    calls it with every snapshot it publishes. Each step goes through
+    "prompt" (show instructions), "collect" (streaming statistics over every
+    frame until the estimate converges or the step times out) and "result"
+    (show what was set). Phases are timed with the snapshot timestamps, so
+    nothing sleeps and no frame is sampled twice or skipped.
+
+    `on_complete(settings)` is called after a full run, e.g. to save the
+    result as a profile.
+    """
+
+    def __init__(self, shared_state, dashboard, on_complete=None):
         self.state = shared_state
         self.dashboard = dashboard
+        self.on_complete = on_complete
         self.running = False
-        self.mp_hands = mp.solutions.hands
 
-    def run_calibration(self):
+        self.steps = []
+        self.step = None
+        self.phase = None
+        self.phase_start = None
+
+    def start(self):
         if self.running:
             return
         self.running = True
-        self.state.set_calibrating(True)
-        
-        try:
-            # --- Step 1: Range Calibration ---
-            self.state.calibration_message = "Step 1/3: Move hand FAR LEFT -> FAR RIGHT"
-            time.sleep(2) 
-            
-            x_values = []
-            start_time = time.time()
-            while time.time() - start_time < 5.0: # 5 seconds
-                landmarks = self.state.get_landmarks()
-                if landmarks:
-                    index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    x_values.append(index_tip.x)
-                time.sleep(0.05)
-            
-            if x_values:
-                min_x = min(x_values)
-                max_x = max(x_values)
-                # Calculate margin (symmetric)
-                # If min_x is 0.2 and max_x is 0.8, range is 0.6. Center is 0.5.
-                # Margin should be roughly min_x.
-                # Let's average the margins from both sides.
-                margin_left = min_x
-                margin_right = 1.0 - max_x
-                new_margin = (margin_left + margin_right) / 2
-                
-                # Clamp margin for sanity (0.05 to 0.4)
-                new_margin = max(0.05, min(0.4, new_margin))
-                
-                self.state.set_margin(new_margin)
-                self.state.calibration_message = f"Range Set! Margin: {new_margin:.2f}"
-            else:
-                self.state.calibration_message = "Step 1 Failed: No hand detected"
-            
-            time.sleep(2)
-            
-            # --- Step 2: Pinch Calibration ---
-            self.state.calibration_message = "Step 2/3: Pinch fingers naturally (Hold Pinch)"
-            time.sleep(2)
-            
-            pinch_dists = []
-            start_time = time.time()
-            while time.time() - start_time < 4.0:
-                landmarks = self.state.get_landmarks()
-                if landmarks:
-                    index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    thumb_tip = landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                    dist = np.hypot(index_tip.x - thumb_tip.x, index_tip.y - thumb_tip.y)
-                    pinch_dists.append(dist)
-                time.sleep(0.05)
-                
-            if pinch_dists:
-                # Use the average of the smallest 50% of distances (assuming they were pinching most of the time)
-                # Or just average.
-                avg_dist = np.mean(pinch_dists)
-                # Set threshold slightly higher than average pinch distance
-                new_threshold = avg_dist * 1.3
-                new_threshold = max(0.02, min(0.2, new_threshold)) # Sanity clamp
-                
-                self.state.set_click_threshold(new_threshold)
-                self.state.calibration_message = f"Pinch Set! Threshold: {new_threshold:.3f}"
-            else:
-                 self.state.calibration_message = "Step 2 Failed: No hand detected"
-
-            time.sleep(2)
-
-            # --- Step 3: Stability Test ---
-            self.state.calibration_message = "Step 3/3: Hold hand STEADY"
-            time.sleep(2)
-            
-            stability_x = []
-            start_time = time.time()
-            while time.time() - start_time < 3.0:
-                landmarks = self.state.get_landmarks()
-                if landmarks:
-                    index_tip = landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    stability_x.append(index_tip.x)
-                time.sleep(0.05)
-                
-            if len(stability_x) > 10:
-                variance = np.var(stability_x)
-                # Low variance -> steady hand -> can handle higher Alpha (less smoothing)
-                # High variance -> shaky -> needs lower Alpha (more smoothing)
-                
-                # Heuristic mapping:
-                # Variance 0.00001 (very steady) -> Alpha 0.8
-                # Variance 0.001 (shaky) -> Alpha 0.2
-                
-                # Log scale might be better but let's do linear interpolation
-                # Target range 0.1 to 0.8
-                # Input range ~0 to 0.0005?
-                
-                # Let's simpliy:
-                # std_dev = sqrt(variance)
-                std_dev = np.std(stability_x)
-                
-                # If std_dev < 0.002 -> Alpha 0.8
-                # If std_dev > 0.01 -> Alpha 0.2
-                
-                target_alpha = np.interp(std_dev, [0.002, 0.01], [0.8, 0.2])
-                self.state.set_smoothing(target_alpha)
-                self.state.calibration_message = f"Stability Set! Alpha: {target_alpha:.2f}"
-            else:
-                self.state.calibration_message = "Step 3 Failed: Not enough data"
-
-            time.sleep(2)
-            self.state.calibration_message = "Calibration Complete!"
-            time.sleep(2)
+        self.steps = [step() for step in CALIBRATION_STEPS]
+        self.step = None
+        self.phase = None
+        self.state.update_settings(is_calibrating=True, calibration_step=0)
+        self.state.add_frame_hook(self.on_frame)
+
+    def cancel(self):
+        self.finish()
 
+    def on_frame(self, snapshot):
+        if not self.running:
+            return
+        if not self.state.settings.is_calibrating:
+            # Cancelled from elsewhere (e.g. the dashboard closing)
+            self.finish()
+            return
+
+        try:
+            self.advance(snapshot)
         except Exception as e:
             print(f"Calibration Error: {e}")
-            self.state.calibration_message = f"Error: {str(e)[:20]}"
-        finally:
-            self.state.set_calibrating(False)
-            self.state.calibration_message = ""
-            self.running = False
+            self.state.update_settings(calibration_message=f"Error: {str(e)[:20]}")
+            self.finish()
+
+    def advance(self, snapshot):
+        now = snapshot.timestamp
+        if self.phase is None:
+            self.next_step(now)
+            return
+
+        elapsed = now - self.phase_start
+        if self.phase == "prompt":
+            if elapsed >= PROMPT_SECONDS:
+                self.enter("collect", now)
+
+        elif self.phase == "collect":
+            step = self.step
+            if snapshot.landmarks is not None:
+                step.add(snapshot.landmarks, now)
+            if elapsed >= step.max_seconds or (elapsed >= step.min_seconds and step.converged(now)):
+                self.enter("result", now, step.apply(self.state))
+
+        elif self.phase == "result":
+            if elapsed >= RESULT_SECONDS:
+                self.next_step(now)
+
+        elif self.phase == "complete":
+            if elapsed >= RESULT_SECONDS:
+                self.finish(completed=True)
+
+    def next_step(self, now):
+        if self.steps:
+            self.step = self.steps.pop(0)
+            self.state.update_settings(calibration_step=self.state.settings.calibration_step + 1)
+            self.enter("prompt", now, self.step.message)
+        else:
+            self.step = None
+            self.enter("complete", now, "Calibration Complete!")
+
+    def enter(self, phase, now, message=None):
+        self.phase = phase
+        self.phase_start = now
+        if message is not None:
+            self.state.update_settings(calibration_message=message)
+
+    def finish(self, completed=False):
+        self.state.remove_frame_hook(self.on_frame)
+        self.running = False
+        self.step = None
+        self.phase = None
+        settings = self.state.update_settings(is_calibrating=False, calibration_message="", calibration_step=0)
+
+        if completed and self.on_complete is not None:
+            try:
+                self.on_complete(settings)
+            except OSError as e:
+                print(f"Could not save calibration: {e}")
@@ -0,0 +1,167 @@
+import sys
+import threading
+import time
+import cv2
+
+from config import (
+    CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAMERA_FOURCCS, CAMERA_BUFFER_SIZE,
+    CAMERA_BACKEND, CAMERA_MAX_FAILURES, CAMERA_RETRY_DELAY, CAMERA_RECONNECT_MIN, CAMERA_RECONNECT_MAX
+)
+
+# Longest a read() sleeps while waiting to reconnect, so the capture stage
+# can still notice it is being stopped
+RECONNECT_POLL = 0.1
+
+
+def default_backend():
+    # DirectShow opens much faster than Media Foundation on Windows and
+    # honours the FOURCC request; V4L2 is the native Linux API
+    if CAMERA_BACKEND is not None:
+        return getattr(cv2, "CAP_" + CAMERA_BACKEND.upper())
+    if sys.platform == "win32":
+        return cv2.CAP_DSHOW
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+
+def fourcc_name(code):
+    code = int(code)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0")
+
+
+class CameraSource:
+    """The webcam, set up for latency rather than convenience.
+
+    open() negotiates the first of `fourccs` the driver accepts, along with
+    resolution and frame rate, and limits the driver queue to
+    CAMERA_BUFFER_SIZE frames so read() never returns a stale one. The
+    capture stage reads continuously on its own thread, which drains
+    whatever queue a backend keeps despite the buffer size request.
+
+    read() grabs and decodes separately and keeps the grab time in
+    `timestamp`, the closest estimate of when the frame was taken. Failed
+    reads sleep briefly instead of spinning; after `max_failures` in a row
+    the camera is released and reopened with exponential backoff, while
+    isOpened() stays True so the pipeline simply waits. release() may be
+    called from another thread: it waits for a read() in progress, and
+    later reads fail instead of reconnecting.
+
+    `device` may also be a video file or stream URL, which makes the same
+    code path testable without a camera (format requests are ignored).
+    """
+
+    finite = False
+    has_frames = True
+
+    def __init__(self, device=CAMERA_INDEX, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS,
+                 fourccs=CAMERA_FOURCCS, backend=None, max_failures=CAMERA_MAX_FAILURES):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourccs = fourccs
+        self.backend = backend
+        self.max_failures = max_failures
+
+        self.cap = None
+        self._lock = threading.Lock() # Held while self.cap is in use
+        self.active = False # Opened once and not released yet
+        self.format = None # Negotiated (fourcc, width, height, fps)
+        self.timestamp = None # perf_counter() when the last frame was grabbed
+
+        # Fault Tolerance
+        self.failures = 0
+        self.reconnects = 0
+        self.next_attempt = None
+        self.backoff = CAMERA_RECONNECT_MIN
+
+    def open(self):
+        # True once the camera delivers frames in some format
+        if isinstance(self.device, int):
+            cap = cv2.VideoCapture(self.device, self.backend if self.backend is not None else default_backend())
+        else:
+            cap = cv2.VideoCapture(self.device)
+        if not cap.isOpened():
+            cap.release()
+            return False
+
+        if isinstance(self.device, int):
+            self.negotiate(cap)
+        self.cap = cap
+        self.active = True
+        self.failures = 0
+        self.backoff = CAMERA_RECONNECT_MIN
+        self.next_attempt = None
+        return True
+
+    def negotiate(self, cap):
+        # Drivers silently keep their current mode for requests they cannot
+        # meet, so every setting is read back
+        for fourcc in self.fourccs:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            if fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+                break
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_FPS, self.fps)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, CAMERA_BUFFER_SIZE)
+
+        self.format = (
+            fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            cap.get(cv2.CAP_PROP_FPS)
+        )
+        print("Camera {}: {} {}x{} @ {:.0f} FPS".format(self.device, *self.format))
+
+    def isOpened(self):
+        return self.active
+
+    def read(self):
+        with self._lock:
+            if not self.active:
+                return False, None # Released meanwhile
+            if self.cap is None:
+                if not self.reconnect():
+                    return False, None
+
+            success = self.cap.grab()
+            self.timestamp = time.perf_counter()
+            image = None
+            if success:
+                success, image = self.cap.retrieve()
+            if success:
+                self.failures = 0
+                return True, image
+
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                print(f"Camera {self.device} stopped delivering frames; reconnecting...")
+                self.cap.release()
+                self.cap = None
+                self.next_attempt = time.perf_counter()
+                return False, None
+        time.sleep(CAMERA_RETRY_DELAY)
+        return False, None
+
+    def reconnect(self):
+        # One attempt once the backoff has passed; otherwise waits a little
+        now = time.perf_counter()
+        if now < self.next_attempt:
+            time.sleep(min(RECONNECT_POLL, self.next_attempt - now))
+            return False
+        if self.open():
+            self.reconnects += 1
+            print(f"Camera {self.device} reconnected.")
+            return True
+        self.next_attempt = time.perf_counter() + self.backoff
+        self.backoff = min(self.backoff * 2, CAMERA_RECONNECT_MAX)
+        return False
+
+    def release(self):
+        with self._lock:
+            self.active = False
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
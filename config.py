@@ -1,19 +1,123 @@
+import collections
+import os
 import threading
-import pyautogui
+import time
+
+from framebuffer import FrameRing
+from pipeline import StageTimer
 
 # --- Constants ---
 
-# Screen
-SCREEN_WIDTH, SCREEN_HEIGHT = pyautogui.size()
+# Screen size comes from the mouse backend (mouse.py) when the tracker starts,
+# so importing config never needs a display.
 
 # Tracking
 DEFAULT_SMOOTHING = 0.5
-DEFAULT_CLICK_THRESHOLD = 0.05
-DEFAULT_SCROLL_THRESHOLD = 0.05
+DEFAULT_FILTER = "one_euro" # One of filters.FILTERS
+DEFAULT_FILTER_PARAMS = {
+    "ema": {"alpha": DEFAULT_SMOOTHING},
+    "one_euro": {"min_cutoff": 1.0, "beta": 20.0},
+    "kalman": {"process_noise": 0.03, "measurement_std": 0.003},
+}
+# Pinch thresholds are thumb-fingertip distances in hand scales (wrist to
+# middle finger MCP, see landmarks.hand_scale), so they hold at any distance
+# from the camera
+DEFAULT_CLICK_THRESHOLD = 0.35
+DEFAULT_SCROLL_THRESHOLD = 0.35
 DEFAULT_MARGIN = 0.15
 
 # Camera
 CAMERA_INDEX = 0
+CAMERA_INDICES = (CAMERA_INDEX,) # More than one runs a worker process per camera (manager.py)
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 30
+CAMERA_FOURCCS = ("MJPG", "YUYV") # Tried in order; MJPG reaches higher FPS over USB 2
+CAMERA_BUFFER_SIZE = 1 # Frames the driver may queue (older ones are stale)
+CAMERA_BACKEND = None # OpenCV capture API name ("dshow", "msmf", "v4l2", ...); None picks one per platform
+CAMERA_MAX_FAILURES = 30 # Consecutive failed reads before the camera is reopened
+CAMERA_RETRY_DELAY = 0.01 # Pause after a failed read
+CAMERA_RECONNECT_MIN = 0.5 # First reconnect delay (seconds), doubled after every failed attempt
+CAMERA_RECONNECT_MAX = 8.0
+
+# Hands
+# Per camera; every hand gets its own ID and gesture stream. Only a single
+# hand is tracked with the ROI crop (see detector.py), so more is opt-in
+# (--hands) and costs a full-frame detection every frame.
+MAX_NUM_HANDS = 1
+HAND_MATCH_DISTANCE = 0.15 # Max palm movement between frames to keep a hand's ID
+HAND_TRACK_TIMEOUT = 0.5 # Seconds a lost hand keeps its ID
+
+# Calibration Profiles
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".handtrack", "profiles.json")
+
+# Inference
+FRAME_BUDGET_MS = 33.0 # Target MediaPipe time per frame (~30 FPS)
+# (full-frame detection width, ROI input size, model complexity),
+# from most accurate to cheapest
+INFERENCE_LEVELS = (
+    (640, 256, 1),
+    (480, 224, 1),
+    (480, 224, 0),
+    (320, 192, 0),
+)
+ROI_PADDING = 1.6 # ROI side = largest landmark bbox side * padding
+ROI_MIN_FRACTION = 0.15 # Smallest ROI side, as a fraction of the frame
+INFERENCE_MODE = "inline" # "inline" (tracker thread) or "process" (inference_worker.py)
+
+# Recording
+TRACE_LANDMARK_DTYPE = "float16" # Half the size of float32; ~0.0005 resolution, well below MediaPipe's jitter
+
+# Inference Scheduling (scheduler.py): skip MediaPipe when nothing moved
+SCHEDULER_ENABLED = True
+MOTION_SIZE = (64, 48) # Thumbnail compared between frames (width, height)
+MOTION_PIXEL_DELTA = 12 # Grey-level change that counts a thumbnail pixel as changed
+MOTION_FRACTION = 0.002 # Fraction of changed pixels that counts as motion
+MAX_REUSE_SECONDS = 0.5 # Re-run inference at least this often while a hand is tracked
+PROBE_INTERVAL = 0.2 # Presence checks while no hand is in view / the cursor is off
+
+# Cursor Actuation
+CURSOR_RATE_HZ = 120 # Cursor updates per second, independent of camera FPS
+CURSOR_RENDER_DELAY = 0.5 # Frame intervals to render behind the newest sample, on top of the pipeline latency (0 = extrapolate)
+CURSOR_LATENCY_SMOOTHING = 0.1 # EMA weight of each sample's capture -> arrival latency
+CURSOR_MAX_EXTRAPOLATION = 0.05 # Never predict further than this past the newest sample
+
+# Gesture Actions
+GESTURE_RELEASE_RATIO = 1.4 # A pinch ends once the fingers are this much further apart than the threshold
+GESTURE_DEBOUNCE_FRAMES = 2 # Frames a gesture change must persist before it counts
+CLICK_MIN_HOLD = 0.08 # Seconds a pinch stays pressed at least (swallows release bounce)
+CLICK_MAX_SPEED = 8.0 # No new pinch starts while the hand moves faster (hand scales/second)
+DRAG_DISTANCE = 0.03 # Pinched fingertip travel (normalised) that turns a click into a drag
+DOUBLE_CLICK_INTERVAL = 0.4 # Seconds between a release and the next pinch for a double click
+SCROLL_SPEED = 40.0 # Scroll clicks per full frame height of hand travel
+SCROLL_DEADZONE = 0.003 # Per-frame travel ignored while scrolling (jitter)
+SCROLL_FRICTION = 5.0 # Inertia decay rate (1/s) once the hand stops moving
+SCROLL_MIN_VELOCITY = 1.0 # Inertia stops below this many clicks per second
+SCROLL_RATE_HZ = 60 # Scroll events per second while coasting
+
+# Gesture Events (eventbus.py)
+EVENT_WORKERS = 4 # Threads running plain-function event handlers
+EVENT_QUEUE_LIMIT = 256 # Undispatched events beyond which hold events are dropped
+
+# Streaming (server.py)
+STREAM_URL = "udp://127.0.0.1:5005" # Default endpoint of the headless mode
+STREAM_SUBSCRIBER_TIMEOUT = 5.0 # UDP subscribers must renew within this; stream subscribers may stall this long
+STREAM_HEARTBEAT = 1.0 # How often clients renew their UDP subscription
+STREAM_SEND_FRAMES = 4 # Frames a stream subscriber's socket may buffer before newer ones replace them
+
+# Dashboard Preview
+PREVIEW_WIDTH = 320
+PREVIEW_HEIGHT = 240
+PREVIEW_BUFFER_SLOTS = 3
+PREVIEW_FPS = 30 # Rate at which the tracker annotates frames for the preview
+
+# Dashboard
+DEFAULT_REFRESH_HZ = 60 # UI update cap when the monitor's refresh rate is unknown
+DEFAULT_SCREEN_SIZE = (1920, 1080) # When the desktop size cannot be queried (uinput on Wayland)
+
+# Display Layout (mapping.py)
+DPI_BASE = 96 # DPI of a monitor with scale 1.0
+DISPLAY_POLL_SECONDS = 2.0 # How often the monitor layout is checked for changes
 
 # Colors (BGR for OpenCV)
 COLOR_TEXT = (255, 255, 255)
@@ -23,103 +127,159 @@ COLOR_HAND = (0, 255, 0)
 GESTURE_NONE = "None"
 GESTURE_PINCH = "Click (Pinch)"
 GESTURE_SCROLL = "Scroll"
+GESTURE_DRAG = "Drag"
+GESTURE_RIGHT_CLICK = "Right Click"
+GESTURE_DOUBLE_CLICK = "Double Click"
 
 # --- Shared State ---
 
+# One frame's worth of tracking output. The tracker publishes a new snapshot
+# per processed frame and never mutates it afterwards, so readers can use
+# whatever snapshot they hold without taking a lock.
+TrackingSnapshot = collections.namedtuple(
+    "TrackingSnapshot",
+    ["version", "timestamp", "captured", "landmarks", "hand_detected", "gesture", "fps", "hands"]
+)
+
+# User-tunable settings and UI control flags. Copy-on-write: every change
+# swaps in a new tuple, so a reader always sees one consistent set.
+Settings = collections.namedtuple(
+    "Settings",
+    [
+        "cursor_active", "is_calibrating",
+        "filter_type", "filter_params", "click_threshold", "margin", "mapping_points",
+        "calibration_step", "calibration_message",
+        "preview_fps",
+        "startup_message"
+    ]
+)
+
+
 class SharedState:
-    def __init__(self):
-        self.lock = threading.Lock()
-        
-        # Tracking Data
-        self.frame = None  # The latest processed frame (BGR)
-        self.landmarks = None # MediaPipe landmarks
-        self.hand_detected = False
-        
-        # Cursor Control
-        self.cursor_active = True
-        self.is_calibrating = False
-        
-        # Dynamic Settings
-        self.smoothing_alpha = DEFAULT_SMOOTHING
-        self.click_threshold = DEFAULT_CLICK_THRESHOLD
-        self.margin = DEFAULT_MARGIN
-        
-        # UI Feedback
-        self.current_gesture = GESTURE_NONE
-        self.fps = 0.0
-        
-
-        
-        # Calibration State
-        self.calibration_step = 0
-        self.calibration_message = ""
-
-    def update_frame(self, frame):
-        with self.lock:
-            self.frame = frame
-            
-    def set_landmarks(self, landmarks):
-        with self.lock:
-            self.landmarks = landmarks
-            
-    def get_landmarks(self):
-        with self.lock:
-            return self.landmarks
+    def __init__(self, timer=None):
+        # Tracking Data (replaced wholesale by publish())
+        self._snapshot = TrackingSnapshot(
+            version=0,
+            timestamp=0.0, # perf_counter() at publish
+            captured=0.0, # perf_counter() when the frame was captured
+            landmarks=None, # (21, 3) float32 array of the primary hand, read-only
+            hand_detected=False,
+            gesture=GESTURE_NONE,
+            fps=0.0,
+            hands=() # hands.TrackedHand per visible hand; landmarks/gesture are the primary's
+        )
+        self._published = threading.Condition() # Serialises publishers, wakes waiters
+        self._frame_hooks = () # Called with every published snapshot (copy-on-write)
 
-    def get_frame(self):
-        with self.lock:
-            return self.frame.copy() if self.frame is not None else None
-
-    def set_gesture(self, gesture_name):
-        with self.lock:
-            self.current_gesture = gesture_name
-
-    def get_gesture(self):
-        with self.lock:
-            return self.current_gesture
-
-    def set_hand_detected(self, detected):
-        with self.lock:
-            self.hand_detected = detected
-
-    def is_hand_detected(self):
-        with self.lock:
-            return self.hand_detected
-
-    def set_fps(self, fps):
-        with self.lock:
-            self.fps = fps
-
-    def get_fps(self):
-        with self.lock:
-            return self.fps
-
-    def set_smoothing(self, alpha):
-        with self.lock:
-            self.smoothing_alpha = alpha
-
-    def get_smoothing(self):
-        with self.lock:
-            return self.smoothing_alpha
-            
-    def set_click_threshold(self, threshold):
-        with self.lock:
-            self.click_threshold = threshold
-            
-    def set_margin(self, margin):
-        with self.lock:
-            self.margin = margin
-            
-    def get_margin(self):
-        with self.lock:
-            return self.margin
-
-    def set_calibrating(self, is_calibrating):
-        with self.lock:
-            self.is_calibrating = is_calibrating
-
-    def is_calibrating_active(self):
-        with self.lock:
-            return self.is_calibrating
+        # Latency Metrics: rolling per-stage timings (ms percentiles via
+        # timer.stats()), fed by every pipeline stage
+        self.timer = timer or StageTimer()
+
+        # Preview Frames
+        self.frame_ring = FrameRing(PREVIEW_WIDTH, PREVIEW_HEIGHT, PREVIEW_BUFFER_SLOTS) # Preview-sized frames (RGB)
 
+        # Settings (replaced wholesale by update_settings())
+        self._settings = Settings(
+            cursor_active=True,
+            is_calibrating=False,
+            filter_type=DEFAULT_FILTER,
+            filter_params=DEFAULT_FILTER_PARAMS, # {filter_type: {param: value}}
+            click_threshold=DEFAULT_CLICK_THRESHOLD,
+            margin=DEFAULT_MARGIN,
+            mapping_points=None, # Calibrated camera (x, y) of the screen corners (see mapping.py); None = use margin
+            calibration_step=0,
+            calibration_message="",
+            preview_fps=0, # 0 = nobody is watching the preview
+            startup_message="" # Tracker start-up progress ("" once frames flow)
+        )
+        self._settings_lock = threading.Lock() # Writers only; readers never lock
+
+    # --- Tracking Snapshots ---
+
+    def snapshot(self):
+        # Attribute reads are atomic, so this is safe from any thread
+        return self._snapshot
+
+    def publish(self, **fields):
+        # Build the next snapshot from the previous one and wake any waiters
+        with self._published:
+            previous = self._snapshot
+            self._snapshot = snapshot = previous._replace(
+                version=previous.version + 1,
+                timestamp=time.perf_counter(),
+                **fields
+            )
+            self._published.notify_all()
+
+        # Frame hooks run on the publishing (tracker) thread, outside the
+        # lock, so they must be quick and may (un)register hooks themselves.
+        for hook in self._frame_hooks:
+            hook(snapshot)
+        return snapshot
+
+    def add_frame_hook(self, hook):
+        with self._published:
+            self._frame_hooks = self._frame_hooks + (hook,)
+
+    def remove_frame_hook(self, hook):
+        with self._published:
+            self._frame_hooks = tuple(h for h in self._frame_hooks if h != hook)
+
+    def wait_for_version(self, version, timeout=None):
+        # Block until a snapshot newer than `version` exists (or timeout),
+        # then return the newest snapshot.
+        with self._published:
+            self._published.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
+
+    def wait_for_update(self, version, settings, timeout=None):
+        # Like wait_for_version(), but a settings change (anything other than
+        # `settings`) wakes it too. Returns the newest (snapshot, settings).
+        with self._published:
+            self._published.wait_for(
+                lambda: self._snapshot.version > version or self._settings is not settings,
+                timeout
+            )
+            return self._snapshot, self._settings
+
+    # --- Settings ---
+
+    @property
+    def settings(self):
+        return self._settings
+
+    def update_settings(self, **changes):
+        with self._settings_lock:
+            self._settings = settings = self._settings._replace(**changes)
+        self._notify_settings()
+        return settings
+
+    def update_filter_params(self, filter_type, **params):
+        # filter_params is shared by every Settings copy, so build new dicts
+        # rather than mutating the current ones.
+        with self._settings_lock:
+            current = self._settings.filter_params
+            merged = dict(current)
+            merged[filter_type] = dict(current.get(filter_type, {}), **params)
+            self._settings = settings = self._settings._replace(filter_params=merged)
+        self._notify_settings()
+        return settings
+
+    def _notify_settings(self):
+        # Wake wait_for_update() callers (the dashboard)
+        with self._published:
+            self._published.notify_all()
+
+    # --- Preview Frames ---
+
+    def update_frame(self, frame, annotate=None, mirror=False):
+        # Single producer (the tracker), so no global lock is needed here
+        self.frame_ring.write(frame, annotate, mirror)
+
+    def get_frame(self):
+        # Read-only, preview-sized RGB view; valid until the next get_frame()
+        return self.frame_ring.read()
 
+    def frame_version(self):
+        # Changes whenever a new preview frame is published
+        return self.frame_ring.version
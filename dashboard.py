@@ -1,24 +1,83 @@
 import tkinter as tk
-from tkinter import ttk
-import cv2
+from tkinter import filedialog, ttk
 from PIL import Image, ImageTk
 import threading
+import time
 
 from config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT,
+    PREVIEW_WIDTH, PREVIEW_HEIGHT, PREVIEW_FPS,
     COLOR_TEXT,
     GESTURE_NONE,
     GESTURE_NONE
 )
 from calibration import CalibrationWizard
+from display import refresh_rate
+from filters import FILTER_LABELS, FILTER_TUNABLES
+from metrics import export_metrics
+
+# How often the latency table is refreshed (percentiles sort every window)
+LATENCY_REFRESH_MS = 500
+
+# How long the notifier blocks before re-checking its running flag
+NOTIFIER_POLL_TIMEOUT = 0.5
+
+
+class UpdateNotifier(threading.Thread):
+    """Wakes the Tk loop when the tracker publishes something new.
+
+    Blocks on SharedState.wait_for_update() and posts a <<TrackingUpdate>>
+    virtual event to `widget`, at most once per display refresh and never
+    while the previous event is still unhandled, so a fast tracker cannot
+    flood the Tk queue. The handler calls done() when it has drawn.
+    """
+
+    def __init__(self, widget, shared_state, rate_hz):
+        super().__init__()
+        self.daemon = True
+        self.widget = widget
+        self.state = shared_state
+        self.period = 1.0 / rate_hz
+        self.running = True
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def run(self):
+        version, settings = -1, None
+        while self.running:
+            snapshot, new_settings = self.state.wait_for_update(version, settings, timeout=NOTIFIER_POLL_TIMEOUT)
+            if snapshot.version == version and new_settings is settings:
+                continue
+
+            # One event in flight at a time; later updates coalesce into it
+            if not self._idle.wait(NOTIFIER_POLL_TIMEOUT):
+                continue
+            self._idle.clear()
+            version, settings = snapshot.version, new_settings
+            deadline = time.perf_counter() + self.period
+            try:
+                self.widget.event_generate("<<TrackingUpdate>>", when="tail")
+            except (tk.TclError, RuntimeError):
+                break # Window is gone
+
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def done(self):
+        self._idle.set()
+
+    def stop(self):
+        self.running = False
+
 
 class Dashboard(tk.Tk):
-    def __init__(self, shared_state):
+    def __init__(self, shared_state, profile=None):
         super().__init__()
         self.state = shared_state
+        self.profile = profile # Calibration results are saved here
         
         self.title("Hand Tracking Control Center")
-        self.geometry("400x600")
+        self.geometry("400x820")
         self.resizable(False, False)
         
         # Style
@@ -33,10 +92,18 @@ class Dashboard(tk.Tk):
         self.create_widgets()
         
         # Calibration Wizard
-        self.calibration_wizard = CalibrationWizard(shared_state, self)
+        self.calibration_wizard = CalibrationWizard(shared_state, self, on_complete=profile.save if profile else None)
         
-        # Main UI Loop for updates
+        # UI updates are driven by the tracker (see UpdateNotifier), capped
+        # at the monitor's refresh rate; only changed widgets are touched.
+        self._shown = {} # label -> options it currently shows
+        self.shown_frame_version = None
+        self.bind("<<TrackingUpdate>>", self.update_ui)
+        self.notifier = UpdateNotifier(self, shared_state, refresh_rate())
+        self.after_idle(self.notifier.start) # event_generate needs a running mainloop
+
         self.update_ui()
+        self.update_latency()
 
     def create_widgets(self):
         # Header
@@ -56,21 +123,42 @@ class Dashboard(tk.Tk):
         self.hand_label = ttk.Label(stats_frame, text="Hand Detected: NO", foreground="red")
         self.hand_label.pack(anchor="w")
 
+        self.startup_label = ttk.Label(stats_frame, text="", foreground="orange")
+        self.startup_label.pack(anchor="w")
+
         self.calibration_status_label = ttk.Label(stats_frame, text="", foreground="yellow")
         self.calibration_status_label.pack(anchor="w")
+
+        # Latency Frame (rolling per-stage percentiles)
+        latency_frame = ttk.LabelFrame(self, text="Latency (ms)", padding=10)
+        latency_frame.pack(fill="x", padx=10, pady=5)
+
+        self.latency_label = ttk.Label(latency_frame, text="No samples yet", font=("Consolas", 9), justify="left")
+        self.latency_label.pack(anchor="w")
+
+        self.export_btn = ttk.Button(latency_frame, text="Export Metrics...", command=self.export_latency)
+        self.export_btn.pack(fill="x", pady=(5, 0))
         
         # Controls Frame
         controls_frame = ttk.LabelFrame(self, text="Controls", padding=10)
         controls_frame.pack(fill="x", padx=10, pady=5)
         
-        # Smoothing Slider
-        ttk.Label(controls_frame, text="Smoothing (Alpha)").pack(anchor="w")
-        self.smoothing_val_label = ttk.Label(controls_frame, text=f"{self.state.get_smoothing():.2f}")
+        # Filter Selection
+        ttk.Label(controls_frame, text="Smoothing Filter").pack(anchor="w")
+        self.filter_var = tk.StringVar(value=FILTER_LABELS[self.state.settings.filter_type])
+        self.filter_combo = ttk.Combobox(controls_frame, textvariable=self.filter_var, values=list(FILTER_LABELS.values()), state="readonly")
+        self.filter_combo.bind("<<ComboboxSelected>>", self.on_filter_change)
+        self.filter_combo.pack(fill="x", pady=5)
+
+        # Smoothing Slider (tunes the selected filter's main parameter)
+        self.smoothing_name_label = ttk.Label(controls_frame, text="")
+        self.smoothing_name_label.pack(anchor="w")
+        self.smoothing_val_label = ttk.Label(controls_frame, text="")
         self.smoothing_val_label.pack(anchor="e")
         
-        self.smoothing_slider = ttk.Scale(controls_frame, from_=0.1, to=0.9, orient="horizontal", command=self.on_smoothing_change)
-        self.smoothing_slider.set(self.state.get_smoothing())
+        self.smoothing_slider = ttk.Scale(controls_frame, orient="horizontal", command=self.on_smoothing_change)
         self.smoothing_slider.pack(fill="x", pady=5)
+        self.sync_smoothing_slider()
         
         # Toggle Preview
         self.show_preview_var = tk.BooleanVar(value=False)
@@ -82,66 +170,126 @@ class Dashboard(tk.Tk):
         self.cal_btn.pack(fill="x", pady=10)
         
         # Preview Frame
-        self.preview_frame = tk.Frame(self, bg="black", width=320, height=240)
+        self.preview_frame = tk.Frame(self, bg="black", width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT)
         self.preview_frame.pack(pady=10)
         self.preview_label = tk.Label(self.preview_frame, bg="black")
         self.preview_label.pack()
 
+        # One PhotoImage for the lifetime of the window; frames are pasted in
+        self.preview_image = ImageTk.PhotoImage("RGB", (PREVIEW_WIDTH, PREVIEW_HEIGHT))
+
+    def sync_smoothing_slider(self):
+        # Point the slider at the selected filter's tunable and current value
+        settings = self.state.settings
+        name, low, high = FILTER_TUNABLES[settings.filter_type]
+        value = settings.filter_params.get(settings.filter_type, {}).get(name, low)
+
+        self.shown_filter_params = settings.filter_params
+        self.smoothing_name_label.config(text=f"Smoothing ({name})")
+        self.smoothing_slider.configure(from_=low, to=high)
+        self.smoothing_slider.set(value)
+        self.smoothing_val_label.config(text=f"{value:.3g}")
+
+    def on_filter_change(self, event=None):
+        labels = {label: filter_type for filter_type, label in FILTER_LABELS.items()}
+        self.state.update_settings(filter_type=labels[self.filter_var.get()])
+        self.sync_smoothing_slider()
+
     def on_smoothing_change(self, val):
-        alpha = float(val)
-        self.state.set_smoothing(alpha)
-        self.smoothing_val_label.config(text=f"{alpha:.2f}")
+        value = float(val)
+        settings = self.state.settings
+        name, _, _ = FILTER_TUNABLES[settings.filter_type]
+        settings = self.state.update_filter_params(settings.filter_type, **{name: value})
+        self.shown_filter_params = settings.filter_params
+        self.smoothing_val_label.config(text=f"{value:.3g}")
 
     def toggle_preview(self):
-        if not self.show_preview_var.get():
+        # The tracker only renders preview frames while someone subscribes
+        if self.show_preview_var.get():
+            self.shown_frame_version = None
+            self.preview_label.config(image=self.preview_image)
+            self.state.update_settings(preview_fps=PREVIEW_FPS)
+        else:
+            self.state.update_settings(preview_fps=0)
             self.preview_label.config(image="")
-            self.preview_label.image = None
 
     def start_calibration(self):
-        if not self.state.is_calibrating_active():
-            threading.Thread(target=self.calibration_wizard.run_calibration, daemon=True).start()
+        if not self.state.settings.is_calibrating:
+            self.calibration_wizard.start()
+
+    def update_ui(self, event=None):
+        # Update Stats (one consistent snapshot per update, no locking)
+        snapshot = self.state.snapshot()
+        settings = self.state.settings
+
+        self.set_label(self.fps_label, text=f"FPS: {snapshot.fps:.1f}")
+        self.set_label(self.gesture_label, text=f"Gesture: {snapshot.gesture}")
+
+        detected = snapshot.hand_detected
+        self.set_label(self.hand_label, text="Hand Detected: YES" if detected else "Hand Detected: NO", foreground="green" if detected else "red")
+
+        # Tracker start-up progress (camera / hand model)
+        self.set_label(self.startup_label, text=settings.startup_message)
+
+        # Calibration may have retuned the filter
+        if settings.filter_params is not self.shown_filter_params:
+            self.sync_smoothing_slider()
 
-    def update_ui(self):
-        # Update Stats
-        fps = self.state.get_fps()
-        self.fps_label.config(text=f"FPS: {fps:.1f}")
-        
-        gesture = self.state.get_gesture()
-        self.gesture_label.config(text=f"Gesture: {gesture}")
-        
-        detected = self.state.is_hand_detected()
-        self.hand_label.config(text="Hand Detected: YES" if detected else "Hand Detected: NO", foreground="green" if detected else "red")
-        
         # Calibration Check
-        if self.state.is_calibrating_active():
+        if settings.is_calibrating:
             self.cal_btn.state(["disabled"])
-            self.calibration_status_label.config(text=self.state.calibration_message)
+            self.set_label(self.calibration_status_label, text=settings.calibration_message)
         else:
             self.cal_btn.state(["!disabled"])
-            self.calibration_status_label.config(text="")
+            self.set_label(self.calibration_status_label, text="")
 
         # Gojo Easter Egg Check removed
 
-        # Update Preview
+        # Update Preview (only when the tracker published a new frame)
         if self.show_preview_var.get():
-            frame = self.state.get_frame()
-            if frame is not None:
-                # Resize for preview (320x240)
-                frame = cv2.resize(frame, (320, 240))
-                # Convert BGR to RGB
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                # Convert to PIL
-                img = Image.fromarray(frame)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.preview_label.config(image=imgtk)
-                self.preview_label.image = imgtk
-        
-        self.after(30, self.update_ui)
+            frame_version = self.state.frame_version()
+            if frame_version != self.shown_frame_version:
+                frame = self.state.get_frame()
+                if frame is not None:
+                    # Already preview-sized RGB, straight from the frame ring
+                    self.preview_image.paste(Image.fromarray(frame))
+                    self.shown_frame_version = frame_version
+
+        self.notifier.done()
+
+    def set_label(self, label, **options):
+        # Reconfiguring a Tk widget is not free; skip it when nothing changed
+        if self._shown.get(label) != options:
+            self._shown[label] = options
+            label.config(**options)
+
+    def update_latency(self):
+        stats = self.state.timer.stats()
+        if stats:
+            rows = [f"{'stage':<17}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            rows += [f"{stage:<17}{s['p50']:>7.1f}{s['p95']:>7.1f}{s['p99']:>7.1f}" for stage, s in stats.items()]
+            self.latency_label.config(text="\n".join(rows))
+
+        self.after(LATENCY_REFRESH_MS, self.update_latency)
+
+    def export_latency(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Latency Metrics",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")]
+        )
+        if path:
+            export_metrics(self.state.timer, path)
 
     def on_closing(self):
-        self.state.set_calibrating(False) # Stop calibration if running
+        self.state.update_settings(is_calibrating=False) # Stop calibration if running
         self.destroy()
 
+    def destroy(self):
+        self.notifier.stop()
+        super().destroy()
+
 if __name__ == "__main__":
     # Test only
     pass
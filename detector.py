@@ -0,0 +1,201 @@
+import cv2
+import time
+import numpy as np
+
+from config import (
+    FRAME_BUDGET_MS,
+    INFERENCE_LEVELS,
+    ROI_PADDING, ROI_MIN_FRACTION
+)
+from landmarks import bounding_box, from_mediapipe, handedness_from_mediapipe
+from pipeline import StageTimer
+
+
+class AdaptiveInputController:
+    """Picks an inference level (input size, model complexity) for a frame budget.
+
+    Levels are ordered from most accurate to cheapest. The controller keeps an
+    EMA of inference time and steps one level cheaper when it stays over
+    budget, or one level better when it stays comfortably under it. The
+    `patience` frame count keeps it from oscillating.
+    """
+
+    def __init__(self, levels=INFERENCE_LEVELS, budget_ms=FRAME_BUDGET_MS, patience=15, alpha=0.2):
+        self.levels = levels
+        self.budget = budget_ms / 1000.0
+        self.patience = patience
+        self.alpha = alpha
+        self.index = 0
+        self.avg_time = None
+        self._over = 0
+        self._under = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def update(self, elapsed):
+        # Returns True when the level changed
+        if self.avg_time is None:
+            self.avg_time = elapsed
+        else:
+            self.avg_time = self.alpha * elapsed + (1 - self.alpha) * self.avg_time
+
+        if self.avg_time > self.budget:
+            self._over += 1
+            self._under = 0
+        elif self.avg_time < 0.6 * self.budget:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.patience and self.index < len(self.levels) - 1:
+            self.index += 1
+        elif self._under >= self.patience and self.index > 0:
+            self.index -= 1
+        else:
+            return False
+
+        # Start measuring the new level from scratch
+        self._over = self._under = 0
+        self.avg_time = None
+        return True
+
+
+class HandDetector:
+    """MediaPipe Hands with region-of-interest cropping and adaptive input size.
+
+    While a single hand is tracked, the next frame is cropped to a square around the
+    previous landmarks and scaled to the level's ROI size. Once tracking is
+    lost, detection falls back to a downscaled full frame. Landmarks are
+    always returned normalised to the full, unmirrored frame.
+
+    Resize/colour conversion and the MediaPipe graph are timed separately
+    into `timer` as the "convert" and "inference" stages.
+    """
+
+    def __init__(self, max_num_hands=1, controller=None, timer=None):
+        # Imported lazily: loading MediaPipe takes seconds, and the tracker
+        # builds the detector in the background once the UI is up
+        import mediapipe as mp
+        self.mp_hands = mp.solutions.hands
+        self.max_num_hands = max_num_hands
+        self.controller = controller or AdaptiveInputController()
+        self.timer = timer or StageTimer()
+
+        self.model_complexity = None
+        self.hands = None
+        self._apply_level()
+
+        self.roi = None # (x0, y0, x1, y1) in pixels, from the previous frame
+        self.handedness = [] # landmarks.HANDEDNESS_* per hand of the last process()
+        self._buffers = {} # Reusable RGB input buffers keyed by (height, width)
+
+    def _apply_level(self, rebuild=False):
+        _, _, model_complexity = self.controller.level
+        if model_complexity == self.model_complexity and not rebuild:
+            return
+        # A new complexity needs a new graph
+        if self.hands is not None:
+            self.hands.close()
+        self.model_complexity = model_complexity
+        self.hands = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=self.max_num_hands,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7,
+            model_complexity=model_complexity
+        )
+
+    def _buffer(self, height, width):
+        key = (height, width)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = np.empty((height, width, 3), dtype=np.uint8)
+        return buf
+
+    def _prepare(self, image, size):
+        # Scale a BGR image (or crop view) into a reusable buffer and convert
+        # it to RGB in place.
+        width, height = size
+        buf = self._buffer(height, width)
+        cv2.resize(image, (width, height), dst=buf, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(buf, cv2.COLOR_BGR2RGB, dst=buf)
+        return buf
+
+    def process(self, image):
+        # Returns one (21, 3) landmark array per hand found in `image` (BGR).
+        start = time.perf_counter()
+        frame_h, frame_w = image.shape[:2]
+        detect_width, roi_size, _ = self.controller.level
+
+        with self.timer.measure("convert"):
+            if self.roi is not None:
+                x0, y0, x1, y1 = self.roi
+                rgb = self._prepare(image[y0:y1, x0:x1], (roi_size, roi_size))
+            else:
+                x0, y0, x1, y1 = 0, 0, frame_w, frame_h
+                detect_height = max(1, round(detect_width * frame_h / frame_w))
+                rgb = self._prepare(image, (min(detect_width, frame_w), min(detect_height, frame_h)))
+
+        # To improve performance, optionally mark the image as not writeable to
+        # pass by reference.
+        rgb.flags.writeable = False
+        with self.timer.measure("inference"):
+            results = self.hands.process(rgb)
+        rgb.flags.writeable = True
+
+        hands = [from_mediapipe(hand_landmarks) for hand_landmarks in results.multi_hand_landmarks or []]
+        self.handedness = [handedness_from_mediapipe(h) for h in results.multi_handedness or []]
+        if self.roi is not None:
+            # Map crop-normalised coordinates back to the full frame
+            scale = np.array([(x1 - x0) / frame_w, (y1 - y0) / frame_h, (x1 - x0) / frame_w], dtype=np.float32)
+            offset = np.array([x0 / frame_w, y0 / frame_h, 0.0], dtype=np.float32)
+            for landmarks in hands:
+                landmarks *= scale
+                landmarks += offset
+
+        # Next frame: crop around this hand, or search the whole frame again.
+        # Multi-hand detection always sees the whole frame, so a second hand
+        # entering the view is not cropped away.
+        if self.max_num_hands == 1 and len(hands) == 1:
+            self.roi = self._roi_for(hands[0], frame_w, frame_h)
+        else:
+            self.roi = None
+
+        # Adapt the next frame's input size to how long this one took
+        if self.controller.update(time.perf_counter() - start):
+            self._apply_level()
+        return hands
+
+    def _roi_for(self, landmarks, frame_w, frame_h):
+        x_min, y_min, x_max, y_max = bounding_box(landmarks)
+        cx = (x_min + x_max) / 2 * frame_w
+        cy = (y_min + y_max) / 2 * frame_h
+        side = max((x_max - x_min) * frame_w, (y_max - y_min) * frame_h) * ROI_PADDING
+        side = max(side, ROI_MIN_FRACTION * min(frame_w, frame_h))
+        side = int(min(side, frame_w, frame_h))
+        if side < 2:
+            return None
+
+        # Near the edge the square is shifted back inside the frame rather
+        # than clipped: the crop is resized to a square input, and a
+        # clipped (non-square) crop would reach MediaPipe stretched
+        x0 = int(min(max(0, cx - side / 2), frame_w - side))
+        y0 = int(min(max(0, cy - side / 2), frame_h - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def reset(self, graph=False):
+        # Forgets the tracked region; graph=True also drops MediaPipe's own
+        # tracking of the hands of earlier frames. The loaded graph is only
+        # restarted (SolutionBase.reset()), or rebuilt on versions without it.
+        self.roi = None
+        if graph:
+            if hasattr(self.hands, "reset"):
+                self.hands.reset()
+            else:
+                self._apply_level(rebuild=True)
+
+    def close(self):
+        self.hands.close()
@@ -0,0 +1,159 @@
+import collections
+import re
+import subprocess
+import sys
+
+from config import DEFAULT_REFRESH_HZ, DEFAULT_SCREEN_SIZE, DPI_BASE
+
+# Monitor queries that need no extra dependencies. Everything here falls back
+# to a sensible default instead of raising: a dashboard that refreshes at
+# 60 Hz is better than one that does not start.
+
+_VREFRESH = 116 # GetDeviceCaps index for the vertical refresh rate
+
+# One monitor of the virtual desktop: position and size in desktop pixels,
+# and its DPI relative to DPI_BASE (2.0 on a typical "Retina" panel)
+Monitor = collections.namedtuple("Monitor", ["x", "y", "width", "height", "scale", "name"])
+
+
+def refresh_rate(default=DEFAULT_REFRESH_HZ):
+    # Refresh rate of the primary monitor in Hz
+    try:
+        if sys.platform == "win32":
+            rate = _windows_refresh_rate()
+        elif sys.platform.startswith("linux"):
+            rate = _xrandr_refresh_rate()
+        else:
+            rate = None
+    except Exception:
+        rate = None
+    # 0/1 mean "hardware default" on Windows; ignore nonsense values
+    return rate if rate and rate >= 20 else default
+
+
+def screen_size(default=DEFAULT_SCREEN_SIZE):
+    # (width, height) of the whole desktop in pixels
+    try:
+        if sys.platform == "win32":
+            size = _windows_screen_size()
+        elif sys.platform.startswith("linux"):
+            size = _xrandr_screen_size()
+        else:
+            size = None
+    except Exception:
+        size = None
+    return size or default
+
+
+def monitors():
+    # Every active monitor, primary first; None if they cannot be queried
+    try:
+        if sys.platform == "win32":
+            found = _windows_monitors()
+        elif sys.platform.startswith("linux"):
+            found = _xrandr_monitors()
+        else:
+            found = None
+    except Exception:
+        found = None
+    return tuple(found) if found else None
+
+
+def _windows_refresh_rate():
+    import ctypes
+    user32 = ctypes.windll.user32
+    hdc = user32.GetDC(0)
+    try:
+        return ctypes.windll.gdi32.GetDeviceCaps(hdc, _VREFRESH)
+    finally:
+        user32.ReleaseDC(0, hdc)
+
+
+def _windows_screen_size():
+    import ctypes
+    user32 = ctypes.windll.user32
+    return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1) # SM_CXSCREEN, SM_CYSCREEN
+
+
+def _windows_monitors():
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFOEXW(ctypes.Structure):
+        _fields_ = [
+            ("cbSize", wintypes.DWORD),
+            ("rcMonitor", wintypes.RECT),
+            ("rcWork", wintypes.RECT),
+            ("dwFlags", wintypes.DWORD),
+            ("szDevice", wintypes.WCHAR * 32),
+        ]
+
+    user32 = ctypes.windll.user32
+    try:
+        shcore = ctypes.windll.shcore # Windows 8.1+
+    except OSError:
+        shcore = None
+
+    found = []
+    def callback(handle, hdc, rect, data):
+        info = MONITORINFOEXW()
+        info.cbSize = ctypes.sizeof(info)
+        user32.GetMonitorInfoW(handle, ctypes.byref(info))
+        dpi_x, dpi_y = wintypes.UINT(DPI_BASE), wintypes.UINT(DPI_BASE)
+        if shcore is not None:
+            shcore.GetDpiForMonitor(handle, 0, ctypes.byref(dpi_x), ctypes.byref(dpi_y)) # MDT_EFFECTIVE_DPI
+        r = info.rcMonitor
+        monitor = Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top, dpi_x.value / DPI_BASE, info.szDevice)
+        if info.dwFlags & 1: # MONITORINFOF_PRIMARY
+            found.insert(0, monitor)
+        else:
+            found.append(monitor)
+        return True
+
+    enum_proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC, ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    user32.EnumDisplayMonitors(None, None, enum_proc(callback), 0)
+    return found
+
+
+def _xrandr_monitors():
+    # "DP-1 connected primary 2560x1440+1920+0 (normal left ...) 597mm x 336mm"
+    output = subprocess.run(
+        ["xrandr", "--current"], capture_output=True, text=True, timeout=2
+    ).stdout
+    found = []
+    pattern = r"^(\S+) connected (primary )?(\d+)x(\d+)\+(-?\d+)\+(-?\d+)(?:.*? (\d+)mm x \d+mm)?"
+    for match in re.finditer(pattern, output, re.MULTILINE):
+        name, primary, width, height, x, y, width_mm = match.groups()
+        width, height, x, y = int(width), int(height), int(x), int(y)
+        scale = 1.0
+        if width_mm and int(width_mm) > 0:
+            # Physical DPI, in quarter steps (X has no per-monitor scaling setting)
+            dpi = width * 25.4 / int(width_mm)
+            scale = min(4.0, max(0.5, round(dpi / DPI_BASE * 4) / 4))
+        monitor = Monitor(x, y, width, height, scale, name)
+        if primary:
+            found.insert(0, monitor)
+        else:
+            found.append(monitor)
+    return found
+
+
+def _xrandr_screen_size():
+    # "Screen 0: minimum 320 x 200, current 1920 x 1080, maximum ..."
+    output = subprocess.run(
+        ["xrandr", "--current"], capture_output=True, text=True, timeout=2
+    ).stdout
+    match = re.search(r"current (\d+) x (\d+)", output)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _xrandr_refresh_rate():
+    # The current mode is marked with '*' in `xrandr --current`
+    output = subprocess.run(
+        ["xrandr", "--current"], capture_output=True, text=True, timeout=2
+    ).stdout
+    for line in output.splitlines():
+        match = re.search(r"(\d+(?:\.\d+)?)\*", line)
+        if match:
+            return round(float(match.group(1)))
+    return None
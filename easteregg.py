@@ -1,36 +1,38 @@
 import cv2
-import threading
-import time
+
+from eventbus import EVENT_START
 
 def play_video(file_path):
-    def _run():
-        try:
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                print(f"Error: Could not open video {file_path}")
-                return
+    # Blocks until the video ends; run it through the event bus (see
+    # play_on_gesture) to keep it off the tracking threads
+    try:
+        cap = cv2.VideoCapture(file_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video {file_path}")
+            return
 
-            window_name = "Dominion Expansion: Unlimited Void"
-            cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
-            cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        window_name = "Dominion Expansion: Unlimited Void"
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                cv2.imshow(window_name, frame)
-                
-                # Check for 'q' or Esc to close early, though usually we play till end
-                if cv2.waitKey(25) & 0xFF == ord('q'):
-                    break
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
             
-            cap.release()
-            cv2.destroyAllWindows()
+            cv2.imshow(window_name, frame)
             
-        except Exception as e:
-            print(f"Error playing video: {e}")
+            # Check for 'q' or Esc to close early, though usually we play till end
+            if cv2.waitKey(25) & 0xFF == ord('q'):
+                break
+        
+        cap.release()
+        cv2.destroyAllWindows()
+        
+    except Exception as e:
+        print(f"Error playing video: {e}")
 
-    # Run in a separate thread so it doesn't block the tracker or UI
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
+def play_on_gesture(bus, gesture, file_path):
+    # Plays the video whenever `gesture` starts; the bus runs it on its
+    # handler pool, so the tracker and UI never wait for it
+    return bus.subscribe(lambda event: play_video(file_path), kinds=(EVENT_START,), gestures=(gesture,), name="easteregg")
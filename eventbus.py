@@ -0,0 +1,173 @@
+import asyncio
+import collections
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import EVENT_QUEUE_LIMIT, EVENT_WORKERS
+from pipeline import StageTimer
+
+# Event kinds: a gesture starts, continues (one hold per frame while it
+# lasts) and ends, per hand
+EVENT_START = "start"
+EVENT_HOLD = "hold"
+EVENT_END = "end"
+
+# One gesture event. `timestamp` is the capture time (perf_counter) of the
+# frame it happened in, `position` the hand's index fingertip (x, y) in
+# normalised camera coordinates, `primary` whether the hand drives the
+# cursor.
+GestureEvent = collections.namedtuple(
+    "GestureEvent", ["kind", "gesture", "hand_id", "timestamp", "position", "primary"]
+)
+
+
+class Subscription:
+    """One handler and the events it wants (None = all kinds / gestures).
+
+    Events wait in the subscription's own queue and its handler gets them
+    one at a time, in order. While the handler is busy a newer hold event
+    replaces a queued hold of the same hand (counted in `dropped`); starts
+    and ends are always delivered.
+    """
+
+    def __init__(self, handler, kinds=None, gestures=None, name=None):
+        self.handler = handler
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.gestures = frozenset(gestures) if gestures is not None else None
+        self.name = name or getattr(handler, "__qualname__", repr(handler))
+        self.is_async = inspect.iscoroutinefunction(handler)
+        self.queue = collections.deque()
+        self.busy = False
+        self.dropped = 0
+
+    def matches(self, event):
+        return (
+            (self.kinds is None or event.kind in self.kinds)
+            and (self.gestures is None or event.gesture in self.gestures)
+        )
+
+    def deliver(self, event):
+        queue = self.queue
+        if event.kind == EVENT_HOLD and queue:
+            last = queue[-1]
+            if last.kind == EVENT_HOLD and last.hand_id == event.hand_id:
+                queue[-1] = event
+                self.dropped += 1
+                return
+        queue.append(event)
+
+
+class EventBus(threading.Thread):
+    """Delivers gesture events to subscribers off the tracking threads.
+
+    publish() never blocks: it hands the event to the bus's asyncio loop
+    (this thread) and returns. The loop routes it to every matching
+    Subscription; coroutine handlers run on the loop itself, plain functions
+    on a thread pool of `workers`, so a slow handler (a macro, a shortcut,
+    launching a video) only delays its own later events. Past `max_pending`
+    undispatched events, new hold events are dropped at publish().
+
+    Latencies go into `timer`: "event_queue" (publish -> dispatch) and
+    "handler:<name>" (frame capture -> handler finished). stats() reports
+    queue depths and drops.
+    """
+
+    def __init__(self, timer=None, workers=EVENT_WORKERS, max_pending=EVENT_QUEUE_LIMIT):
+        super().__init__(name="event-bus", daemon=True)
+        self.timer = timer or StageTimer()
+        self.max_pending = max_pending
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="event-handler")
+        self.subscriptions = () # Copy-on-write, like SharedState's frame hooks
+        self._lock = threading.Lock() # Writers only
+
+        # Each counter has a single writer, so their difference is the
+        # number of events waiting for the loop without any locking
+        self.published = 0 # Publishing thread
+        self.dispatched = 0 # Loop thread
+        self.dropped = 0 # Publishing thread
+
+    # --- Subscribers ---
+
+    def subscribe(self, handler, kinds=None, gestures=None, name=None):
+        subscription = Subscription(handler, kinds, gestures, name)
+        with self._lock:
+            self.subscriptions = self.subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscriptions = tuple(s for s in self.subscriptions if s is not subscription)
+
+    # --- Publishing ---
+
+    def publish(self, event):
+        if not any(s.matches(event) for s in self.subscriptions):
+            return
+        if event.kind == EVENT_HOLD and self.published - self.dispatched >= self.max_pending:
+            self.dropped += 1
+            return
+        self.published += 1
+        try:
+            self.loop.call_soon_threadsafe(self._dispatch, event, time.perf_counter())
+        except RuntimeError:
+            pass # Bus already stopped
+
+    def _dispatch(self, event, published):
+        self.dispatched += 1
+        self.timer.record("event_queue", time.perf_counter() - published)
+        for subscription in self.subscriptions:
+            if not subscription.matches(event):
+                continue
+            subscription.deliver(event)
+            if not subscription.busy:
+                subscription.busy = True
+                self.loop.create_task(self._drain(subscription))
+
+    async def _drain(self, subscription):
+        try:
+            while subscription.queue:
+                event = subscription.queue.popleft()
+                try:
+                    if subscription.is_async:
+                        await subscription.handler(event)
+                    else:
+                        await self.loop.run_in_executor(self.executor, subscription.handler, event)
+                except Exception as e:
+                    print(f"Event handler {subscription.name} failed: {type(e).__name__}: {e}")
+                self.timer.record(f"handler:{subscription.name}", time.perf_counter() - event.timestamp)
+        finally:
+            subscription.busy = False
+
+    def stats(self):
+        return {
+            "pending": self.published - self.dispatched,
+            "dropped": self.dropped,
+            "handlers": {
+                s.name: {"queued": len(s.queue), "dropped": s.dropped}
+                for s in self.subscriptions
+            },
+        }
+
+    # --- Loop ---
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            # Abandon handlers still queued or running
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        try:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        except RuntimeError:
+            pass # Loop already closed
@@ -0,0 +1,186 @@
+import math
+import numpy as np
+
+# All filters work element-wise on arrays of any shape (typically the
+# (21, 3) landmark array) and take the sample's capture timestamp in
+# seconds. They start from the first sample they see, so there is no snap
+# from (0, 0) when a hand appears.
+
+
+class EmaFilter:
+    """Exponential moving average (the original fixed smoother)."""
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.value = None
+
+    def configure(self, alpha=None):
+        if alpha is not None:
+            self.alpha = alpha
+
+    def __call__(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None:
+            self.value = value.copy()
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value.astype(np.float32)
+
+    def reset(self):
+        self.value = None
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al., CHI 2012).
+
+    A low-pass filter whose cutoff rises with speed: heavy smoothing while
+    the hand is still (no jitter), little smoothing while it moves (no
+    lag). `min_cutoff` is in Hz; `beta` scales the cutoff with speed in
+    normalised units per second.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def configure(self, min_cutoff=None, beta=None, d_cutoff=None):
+        if min_cutoff is not None:
+            self.min_cutoff = min_cutoff
+        if beta is not None:
+            self.beta = beta
+        if d_cutoff is not None:
+            self.d_cutoff = d_cutoff
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None:
+            self.value = value.copy()
+            self.speed = np.zeros_like(value)
+            self.timestamp = timestamp
+            return self.value.astype(np.float32)
+
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.value.astype(np.float32)
+        self.timestamp = timestamp
+
+        # Smoothed derivative drives the cutoff
+        speed = (value - self.value) / dt
+        self.speed += self._alpha(self.d_cutoff, dt) * (speed - self.speed)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.speed)
+        self.value += self._alpha(cutoff, dt) * (value - self.value)
+        return self.value.astype(np.float32)
+
+    def reset(self):
+        self.value = None
+        self.speed = None
+        self.timestamp = None
+
+
+class KalmanFilter:
+    """Constant-velocity Kalman filter, one independent track per element.
+
+    Tracks position and velocity, so steady motion is followed without the
+    lag of a fixed low-pass. `process_noise` is the acceleration noise
+    density (how much the hand is expected to change speed);
+    `measurement_std` is the landmark jitter in normalised units.
+    """
+
+    def __init__(self, process_noise=0.03, measurement_std=0.003):
+        self.process_noise = process_noise
+        self.measurement_std = measurement_std
+        self.reset()
+
+    def configure(self, process_noise=None, measurement_std=None):
+        if process_noise is not None:
+            self.process_noise = process_noise
+        if measurement_std is not None:
+            self.measurement_std = measurement_std
+
+    def __call__(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float64)
+        r = self.measurement_std ** 2
+        if self.value is None:
+            self.value = value.copy()
+            self.velocity = np.zeros_like(value)
+            # Covariance [[p00, p01], [p01, p11]] per element
+            self.p00 = np.full_like(value, r)
+            self.p01 = np.zeros_like(value)
+            self.p11 = np.ones_like(value)
+            self.timestamp = timestamp
+            return self.value.astype(np.float32)
+
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.value.astype(np.float32)
+        self.timestamp = timestamp
+        q = self.process_noise
+
+        # Predict
+        self.value += self.velocity * dt
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        self.p01 += dt * self.p11 + q * dt ** 2 / 2
+        self.p11 += q * dt
+
+        # Update
+        innovation = value - self.value
+        s = self.p00 + r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        self.value += k0 * innovation
+        self.velocity += k1 * innovation
+        self.p11 -= k1 * self.p01
+        self.p01 *= 1 - k0
+        self.p00 *= 1 - k0
+        return self.value.astype(np.float32)
+
+    def reset(self):
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+
+# --- Registry ---
+
+FILTERS = {
+    "ema": EmaFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+FILTER_LABELS = {
+    "ema": "EMA",
+    "one_euro": "One Euro",
+    "kalman": "Kalman",
+}
+
+# The parameter the dashboard slider controls for each filter: (name, min, max)
+FILTER_TUNABLES = {
+    "ema": ("alpha", 0.1, 0.9),
+    "one_euro": ("min_cutoff", 0.1, 3.0),
+    "kalman": ("measurement_std", 0.0005, 0.01),
+}
+
+
+def create_filter(filter_type, params):
+    return FILTERS[filter_type](**params)
+
+
+def tune_for_jitter(jitter_std):
+    # Parameters for every filter, given the landmark jitter (standard
+    # deviation in normalised units) measured while the hand is held still.
+    return {
+        # Steady hand -> high alpha (less smoothing), shaky -> low alpha
+        "ema": {"alpha": float(np.interp(jitter_std, [0.002, 0.01], [0.8, 0.2]))},
+        # Shaky hand -> lower cutoff while still
+        "one_euro": {"min_cutoff": float(np.interp(jitter_std, [0.002, 0.01], [1.5, 0.3]))},
+        "kalman": {"measurement_std": float(max(jitter_std, 0.0005))},
+    }
@@ -0,0 +1,62 @@
+import threading
+import cv2
+import numpy as np
+
+
+class FrameRing:
+    """Preallocated triple buffer for handing preview frames to the UI.
+
+    The producer scales each full-resolution frame straight into a free,
+    preview-sized slot and publishes it by swapping an index. The consumer
+    gets a read-only view of the newest slot. No full-resolution copy is
+    made, and the lock only guards the index swap, never the pixel work.
+
+    Slots hold RGB pixels so the dashboard can hand them to PIL directly.
+    """
+
+    def __init__(self, width, height, slots=3):
+        if slots < 3:
+            raise ValueError("FrameRing needs at least 3 slots")
+
+        self.width = width
+        self.height = height
+        self._slots = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(slots)]
+        self._scratch = np.zeros((height, width, 3), dtype=np.uint8)  # resized BGR
+
+        self._lock = threading.Lock()
+        self._published = None  # slot holding the newest frame
+        self._reading = None    # slot the consumer is looking at
+        self._writing = 0       # slot the producer fills next
+        self.version = 0        # bumped on every publish
+
+    def write(self, frame, annotate=None, mirror=False):
+        # Scale and convert the BGR frame into the back slot, optionally
+        # mirror it for a selfie view, let the caller draw on it (e.g.
+        # landmarks), then publish it.
+        slot = self._slots[self._writing]
+        cv2.resize(frame, (self.width, self.height), dst=self._scratch, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._scratch, cv2.COLOR_BGR2RGB, dst=slot)
+        if mirror:
+            cv2.flip(slot, 1, dst=slot)
+        if annotate is not None:
+            annotate(slot)
+        self._publish()
+
+    def _publish(self):
+        with self._lock:
+            self._published = self._writing
+            self.version += 1
+            # Next back slot: anything not published and not being read
+            busy = (self._published, self._reading)
+            self._writing = next(i for i in range(len(self._slots)) if i not in busy)
+
+    def read(self):
+        # Returns a read-only view of the newest frame, or None before the
+        # first publish. The view stays valid until the next read().
+        with self._lock:
+            if self._published is None:
+                return None
+            self._reading = self._published
+            view = self._slots[self._reading].view()
+        view.flags.writeable = False
+        return view
@@ -1,55 +1,280 @@
-import mediapipe as mp
-import time
-import math
+import collections
 import numpy as np
 
 # Inherit constants
-from config import GESTURE_PINCH, GESTURE_NONE
+from config import (
+    GESTURE_NONE, GESTURE_PINCH, GESTURE_SCROLL, GESTURE_DRAG, GESTURE_RIGHT_CLICK, GESTURE_DOUBLE_CLICK,
+    DEFAULT_SCROLL_THRESHOLD, GESTURE_RELEASE_RATIO, GESTURE_DEBOUNCE_FRAMES,
+    CLICK_MIN_HOLD, CLICK_MAX_SPEED,
+    DRAG_DISTANCE, DOUBLE_CLICK_INTERVAL, SCROLL_SPEED, SCROLL_DEADZONE
+)
+from filters import create_filter
+from hands import palm_center
+from landmarks import (
+    THUMB, INDEX, MIDDLE, RING, FINGER_TIPS, extended_fingers, folded_fingers, hand_scale, tip_distances
+)
+
+# --- Actions ---
+
+# One mouse action for actuation.ActionExecutor. `kind` is "press", "release",
+# "click", "scroll" or "release_all"; `amount` is in scroll clicks (positive
+# scrolls up). `timestamp` is the capture time of the frame that caused it,
+# `onset` that of the frame where the pinch behind a press or click began
+# (earlier when debouncing held it back).
+Action = collections.namedtuple(
+    "Action", ["kind", "button", "amount", "timestamp", "onset"], defaults=("left", 0.0, None, None)
+)
+
+# --- Gesture Table ---
+
+# Every gesture is the thumb pinched against one finger. `threshold` is the
+# thumb-fingertip distance, in hand scales, that starts it: a Settings field
+# or a fixed value. `action` says what the pinch does:
+#   "button"  hold `button` down while pinched (click, drag, double click)
+#   "click"   click `button` once per pinch
+#   "scroll"  scroll with the fingertip's vertical travel
+GestureSpec = collections.namedtuple("GestureSpec", ["name", "finger", "threshold", "action", "button"])
+
+GESTURES = (
+    GestureSpec(GESTURE_PINCH, INDEX, "click_threshold", "button", "left"),
+    GestureSpec(GESTURE_SCROLL, MIDDLE, DEFAULT_SCROLL_THRESHOLD, "scroll", None),
+    GestureSpec(GESTURE_RIGHT_CLICK, RING, "click_threshold", "click", "right"),
+)
+
+# Compact gesture codes for files (batch output, traces): index into GESTURE_NAMES
+GESTURE_NAMES = (
+    GESTURE_NONE, GESTURE_PINCH, GESTURE_DRAG, GESTURE_DOUBLE_CLICK, GESTURE_RIGHT_CLICK, GESTURE_SCROLL
+)
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURE_NAMES)}
+
+
+class ClickStateMachine:
+    """Press/release detection for one pinch.
+
+    update() takes the pinch distance and threshold in hand scales, so the
+    same pinch counts at any distance from the camera, plus the hand's
+    speed in hand scales per second.
+
+    - Released: presses once the distance has stayed below the threshold
+      for `debounce` frames while the hand moved slower than `max_speed`.
+      Fast movement blurs the fingertips into false pinches.
+    - Pressed: releases once the distance has stayed above
+      `release_ratio` times the threshold for `debounce` frames. A pinch
+      wobbling around the threshold thus never bounces, and nothing is
+      released within `min_hold` seconds of the press.
+
+    `onset` is the timestamp of the first frame of the pinch that pressed.
+    """
+
+    def __init__(self, release_ratio=GESTURE_RELEASE_RATIO, min_hold=CLICK_MIN_HOLD,
+                 max_speed=CLICK_MAX_SPEED, debounce=GESTURE_DEBOUNCE_FRAMES):
+        self.release_ratio = release_ratio
+        self.min_hold = min_hold
+        self.max_speed = max_speed
+        self.debounce = debounce
+        self.reset()
+
+    def update(self, distance, threshold, speed, timestamp):
+        # Returns "press", "release" or None
+        if not self.pressed:
+            if distance < threshold and speed <= self.max_speed:
+                if self.frames == 0:
+                    self.onset = timestamp
+                self.frames += 1
+                if self.frames >= self.debounce:
+                    self.pressed, self.pressed_at, self.frames = True, timestamp, 0
+                    self.holding = True
+                    return "press"
+            else:
+                self.frames = 0
+            return None
+
+        self.holding = distance < threshold * self.release_ratio
+        if self.holding or timestamp - self.pressed_at < self.min_hold:
+            self.frames = 0
+            return None
+        self.frames += 1
+        if self.frames >= self.debounce:
+            self.pressed, self.frames = False, 0
+            return "release"
+        return None
+
+    def reset(self):
+        self.pressed = False
+        self.holding = False # Pressed and still within the release threshold
+        self.frames = 0 # Consecutive frames towards the next change
+        self.onset = None
+        self.pressed_at = None
+
 
 class GestureEngine:
-    def __init__(self, shared_state):
+    # All predicates take the (21, 3) landmark array from landmarks.py and
+    # evaluate every finger at once, returning a boolean per finger
+    # (index with landmarks.THUMB ... landmarks.PINKY).
+
+    def __init__(self, shared_state, gestures=GESTURES):
         self.state = shared_state
-        self.mp_hands = mp.solutions.hands
         
-        # Cursor Smoothing State
-        self.prev_x = 0
-        self.prev_y = 0
-        
-    def _dist(self, p1, p2):
-        return math.hypot(p1.x - p2.x, p1.y - p2.y)
+        # Landmark Filtering State
+        self.landmark_filter = None
+        self.filter_type = None
+        self.filter_params = None
 
-    def is_finger_extended(self, landmarks, finger_tip_idx, finger_dip_idx):
-        # A simple check: if tip is higher (smaller y) than DIP joint
-        # Note: This simple logic assumes hand is upright. 
-        # For more robustness, we can check distance from wrist.
-        return landmarks[finger_tip_idx].y < landmarks[finger_dip_idx].y
+        # Gesture Table State
+        self.gestures = gestures
+        self.fingers = np.array([spec.finger for spec in gestures])
+        self.machines = [ClickStateMachine() for _ in gestures]
+        self.thresholds = None # Per-gesture start distance, for `thresholds_for`
+        self.thresholds_for = None
+        self.reset_gestures()
 
-    def is_folded(self, landmarks, finger_tip_idx, finger_pip_idx):
-        # Tip is below PIP (or closer to wrist than PIP)
-        # Using distance to wrist is often more reliable for rotation
-        wrist = landmarks[self.mp_hands.HandLandmark.WRIST]
-        tip_dist = self._dist(landmarks[finger_tip_idx], wrist)
-        pip_dist = self._dist(landmarks[finger_pip_idx], wrist)
-        return tip_dist < pip_dist
+        # Hand Speed State
+        self.last_center = None
+        self.last_time = None
+        self.speed = 0.0
 
+    def is_finger_extended(self, landmarks):
+        return extended_fingers(landmarks)
 
+    def is_folded(self, landmarks):
+        return folded_fingers(landmarks)
 
     def is_pinch(self, landmarks):
-        # Index tip and Thumb tip close
-        INDEX_TIP = self.mp_hands.HandLandmark.INDEX_FINGER_TIP
-        THUMB_TIP = self.mp_hands.HandLandmark.THUMB_TIP
-        
-        dist = self._dist(landmarks[INDEX_TIP], landmarks[THUMB_TIP])
-        return dist < self.state.click_threshold
+        # Thumb tip close to each fingertip (the thumb's own entry is False)
+        distances = tip_distances(landmarks)[THUMB] / max(hand_scale(landmarks), 1e-6)
+        pinched = distances < self.state.settings.click_threshold
+        pinched[THUMB] = False
+        return pinched
 
-    def smooth_coordinates(self, x, y):
-        alpha = self.state.get_smoothing()
-        
-        # Exponential Moving Average
-        smooth_x = alpha * x + (1 - alpha) * self.prev_x
-        smooth_y = alpha * y + (1 - alpha) * self.prev_y
-        
-        self.prev_x = smooth_x
-        self.prev_y = smooth_y
-        
-        return int(smooth_x), int(smooth_y)
+    def filter_landmarks(self, landmarks, timestamp):
+        # Denoise all 21 landmarks at once with the filter chosen in the
+        # settings; the cursor and every gesture then see the same data.
+        settings = self.state.settings
+        params = settings.filter_params.get(settings.filter_type, {})
+
+        if self.landmark_filter is None or settings.filter_type != self.filter_type:
+            self.landmark_filter = create_filter(settings.filter_type, params)
+            self.filter_type = settings.filter_type
+            self.filter_params = params
+        elif params is not self.filter_params:
+            # Retuned (dashboard slider / calibration): keep the filter state
+            self.landmark_filter.configure(**params)
+            self.filter_params = params
+
+        return self.landmark_filter(landmarks, timestamp)
+
+    def reset_filter(self):
+        # Hand lost: the next hand starts from its own first sample
+        if self.landmark_filter is not None:
+            self.landmark_filter.reset()
+
+    # --- Recognition ---
+
+    def recognise(self, landmarks, timestamp):
+        # Evaluates the whole gesture table on one frame of (filtered)
+        # landmarks. Returns the current gesture name and the Actions that
+        # this frame triggers.
+        #
+        # Each gesture's pinch runs its own ClickStateMachine. While none is
+        # pressed all of them see the frame, and if several press at once
+        # the closest pinch (relative to its threshold) wins. Once one is
+        # pressed it is the only one evaluated until it releases.
+        settings = self.state.settings
+        if settings is not self.thresholds_for:
+            self.thresholds = np.array([
+                getattr(settings, spec.threshold) if isinstance(spec.threshold, str) else spec.threshold
+                for spec in self.gestures
+            ])
+            self.thresholds_for = settings
+
+        scale = max(hand_scale(landmarks), 1e-6)
+        distances = tip_distances(landmarks)[THUMB, self.fingers] / scale
+        speed = self.hand_speed(landmarks, timestamp, scale)
+
+        actions = []
+        if self.active is None:
+            pressed = [
+                i for i, machine in enumerate(self.machines)
+                if machine.update(distances[i], self.thresholds[i], speed, timestamp) == "press"
+            ]
+            if pressed:
+                self.active = min(pressed, key=lambda i: distances[i] / self.thresholds[i])
+                for i, machine in enumerate(self.machines):
+                    if i != self.active:
+                        machine.reset() # Start over once the winner releases
+                self.begin(landmarks, timestamp, actions)
+        else:
+            machine = self.machines[self.active]
+            event = machine.update(distances[self.active], self.thresholds[self.active], speed, timestamp)
+            if event == "release":
+                self.end(timestamp, actions)
+                self.active = None
+                self.gesture = GESTURE_NONE
+            elif machine.holding:
+                self.hold(landmarks, timestamp, actions)
+
+        return self.gesture, actions
+
+    def hand_speed(self, landmarks, timestamp, scale):
+        # Palm speed in hand scales per second
+        center = palm_center(landmarks)
+        if self.last_center is not None and timestamp > self.last_time:
+            self.speed = float(np.hypot(*(center - self.last_center))) / (timestamp - self.last_time) / scale
+        self.last_center = center
+        self.last_time = timestamp
+        return self.speed
+
+    def tip(self, landmarks):
+        # (x, y) of the active gesture's fingertip
+        return landmarks[FINGER_TIPS[self.gestures[self.active].finger], :2]
+
+    def begin(self, landmarks, timestamp, actions):
+        spec = self.gestures[self.active]
+        onset = self.machines[self.active].onset
+        self.gesture = spec.name
+        self.anchor = self.tip(landmarks).copy()
+        if spec.action == "button":
+            if timestamp - self.last_release < DOUBLE_CLICK_INTERVAL:
+                # Second pinch in quick succession: the OS turns the two
+                # clicks into a double click, this only names it
+                self.gesture = GESTURE_DOUBLE_CLICK
+            actions.append(Action("press", spec.button, timestamp=timestamp, onset=onset))
+        elif spec.action == "click":
+            actions.append(Action("click", spec.button, timestamp=timestamp, onset=onset))
+
+    def hold(self, landmarks, timestamp, actions):
+        spec = self.gestures[self.active]
+        tip = self.tip(landmarks)
+        if spec.action == "button":
+            if self.gesture == GESTURE_PINCH and np.hypot(*(tip - self.anchor)) > DRAG_DISTANCE:
+                self.gesture = GESTURE_DRAG
+        elif spec.action == "scroll":
+            # Travel accumulates until it leaves the dead zone, so slow
+            # movements still scroll; moving the hand down scrolls up
+            travel = tip[1] - self.anchor[1]
+            if abs(travel) > SCROLL_DEADZONE:
+                actions.append(Action("scroll", None, float(travel) * SCROLL_SPEED, timestamp))
+                self.anchor = tip.copy()
+
+    def end(self, timestamp, actions):
+        spec = self.gestures[self.active]
+        if spec.action == "button":
+            actions.append(Action("release", spec.button, timestamp=timestamp))
+            self.last_release = timestamp
+
+    def cancel(self, timestamp):
+        # Ends whatever gesture is active (hand handed over, cursor switched
+        # off) and returns the Actions that undo it
+        actions = []
+        if self.active is not None:
+            self.end(timestamp, actions)
+        self.reset_gestures()
+        return actions
+
+    def reset_gestures(self):
+        self.active = None # Index into self.gestures
+        self.gesture = GESTURE_NONE
+        self.anchor = None
+        self.last_release = float("-inf")
+        for machine in self.machines:
+            machine.reset()
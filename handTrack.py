@@ -1,3 +1,4 @@
+import collections
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -96,7 +97,7 @@ class ScrollThread(threading.Thread):
     def __init__(self):
         super().__init__()
         self.daemon = True
-        self.scroll_queue = []
+        self.scroll_queue = collections.deque()
         self.scroll_lock = threading.Lock()
         self.running = True
         self.inertia = 0.95  # Slower reduction for rolling stop effect
@@ -107,7 +108,7 @@ class ScrollThread(threading.Thread):
         while self.running:
             if self.scroll_queue:
                 with self.scroll_lock:
-                    scroll_amount = self.scroll_queue.pop(0)
+                    scroll_amount = self.scroll_queue.popleft()
                 pyautogui.scroll(scroll_amount)
                 # Apply inertia effect if the queue is empty
                 if len(self.scroll_queue) == 0 and abs(scroll_amount) > self.inertia_threshold:
@@ -0,0 +1,108 @@
+import collections
+import itertools
+import numpy as np
+
+from config import HAND_MATCH_DISTANCE, HAND_TRACK_TIMEOUT
+from landmarks import HANDEDNESS_UNKNOWN, INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, PINKY_MCP, WRIST
+
+# One hand in one frame, with an ID that stays the same while the hand stays
+# in view. `camera` is the source it was seen by; `gesture` is filled in by
+# the actuation stage; `handedness` is a landmarks.HANDEDNESS_* value.
+TrackedHand = collections.namedtuple(
+    "TrackedHand", ["hand_id", "camera", "landmarks", "gesture", "handedness"],
+    defaults=(None, HANDEDNESS_UNKNOWN)
+)
+
+# Palm points used as the hand's position for matching: steadier than any
+# fingertip, and they barely move when the fingers do.
+PALM = np.array([WRIST, INDEX_FINGER_MCP, MIDDLE_FINGER_MCP, PINKY_MCP])
+
+
+def palm_center(landmarks):
+    return landmarks[PALM, :2].mean(axis=0)
+
+
+class _Track:
+    __slots__ = ("hand_id", "camera", "landmarks", "handedness", "center", "last_seen", "visible")
+
+    def __init__(self, hand_id, camera):
+        self.hand_id = hand_id
+        self.camera = camera
+        self.handedness = HANDEDNESS_UNKNOWN
+        self.visible = False
+
+
+class HandMatcher:
+    """Gives every hand a stable ID across frames and cameras.
+
+    Each update() brings the hands one camera saw in one frame. They are
+    matched to that camera's existing tracks by palm position, nearest pairs
+    first, within `max_distance` (normalised units). Hands left over start
+    new tracks. A track that goes unmatched is hidden but kept for `timeout`
+    seconds, so a hand that drops out for a frame or two gets its old ID
+    back.
+
+    Cameras are never fused spatially (their coordinates are unrelated): two
+    users on two cameras simply get distinct IDs. update() returns every
+    visible hand from every camera, oldest track (lowest ID) first.
+    """
+
+    def __init__(self, max_distance=HAND_MATCH_DISTANCE, timeout=HAND_TRACK_TIMEOUT):
+        self.max_distance = max_distance
+        self.timeout = timeout
+        self.tracks = {} # hand_id -> _Track
+        self._ids = itertools.count(1)
+
+    def update(self, camera, hands, timestamp, handedness=None):
+        # `handedness`, if known, holds one landmarks.HANDEDNESS_* per hand
+        candidates = [t for t in self.tracks.values() if t.camera == camera]
+        for track in candidates:
+            track.visible = False
+
+        unmatched = list(range(len(hands)))
+        if hands and candidates:
+            centers = np.array([palm_center(h) for h in hands])
+            previous = np.array([t.center for t in candidates])
+            distances = np.linalg.norm(centers[:, None, :] - previous[None, :, :], axis=2)
+
+            # Greedy nearest-pair assignment (a handful of hands at most)
+            free_tracks = set(range(len(candidates)))
+            for flat in np.argsort(distances, axis=None):
+                i, j = divmod(int(flat), len(candidates))
+                if distances[i, j] > self.max_distance:
+                    break
+                if i in unmatched and j in free_tracks:
+                    self._see(candidates[j], hands[i], centers[i], timestamp, handedness, i)
+                    unmatched.remove(i)
+                    free_tracks.discard(j)
+
+        for i in unmatched:
+            track = _Track(next(self._ids), camera)
+            self.tracks[track.hand_id] = track
+            self._see(track, hands[i], palm_center(hands[i]), timestamp, handedness, i)
+
+        # Forget tracks that have been gone too long, on any camera
+        for hand_id in [i for i, t in self.tracks.items() if timestamp - t.last_seen > self.timeout]:
+            del self.tracks[hand_id]
+
+        return tuple(
+            TrackedHand(t.hand_id, t.camera, t.landmarks, handedness=t.handedness)
+            for t in sorted(self.tracks.values(), key=lambda t: t.hand_id)
+            if t.visible
+        )
+
+    @staticmethod
+    def _see(track, landmarks, center, timestamp, handedness, i):
+        track.landmarks = landmarks
+        if handedness is not None and i < len(handedness):
+            track.handedness = handedness[i]
+        track.center = center
+        track.last_seen = timestamp
+        track.visible = True
+
+    def live_ids(self):
+        # Every track not yet expired, visible or hidden
+        return frozenset(self.tracks)
+
+    def reset(self):
+        self.tracks.clear()
@@ -0,0 +1,153 @@
+import multiprocessing
+import time
+
+from config import MAX_NUM_HANDS
+from pipeline import StageTimer
+from shm import LandmarkBlock, SharedFrameRing
+
+# Frame slots shared with the worker; two let the next frame be copied in
+# while the worker still reads the previous one
+FRAME_SLOTS = 2
+
+# How long close() waits for the worker to exit before terminating it
+WORKER_JOIN_TIMEOUT = 2.0
+
+
+def inference_worker(conn, block_name, block_lock, max_num_hands):
+    # Runs in its own process: MediaPipe with its own GIL, so the Tk loop,
+    # calibration and the tracker threads no longer compete with it.
+    #
+    # Requests on `conn`:
+    #   ("frames", name, shape, slots)  attach to a (new) SharedFrameRing
+    #   ("process", slot)               run the detector on that slot
+    #   ("reset",)                      forget the tracked region
+    #   None                            exit
+    # Results go into the LandmarkBlock; the reply only carries
+    # (count, convert seconds, inference seconds).
+    from detector import HandDetector
+
+    block = LandmarkBlock(max_num_hands, name=block_name, lock=block_lock)
+    timer = StageTimer(window=1)
+    try:
+        detector = HandDetector(max_num_hands=max_num_hands, timer=timer)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        block.close()
+        return
+    conn.send(("ready",))
+
+    frames = None
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            kind = request[0]
+            if kind == "frames":
+                if frames is not None:
+                    frames.close()
+                _, name, shape, slots = request
+                frames = SharedFrameRing(shape, slots, name=name)
+            elif kind == "process":
+                hands = detector.process(frames.view(request[1]))
+                block.write(time.perf_counter(), hands, detector.handedness)
+                timings = timer.stats()
+                conn.send((
+                    len(hands),
+                    timings["convert"]["mean"] / 1000.0,
+                    timings["inference"]["mean"] / 1000.0
+                ))
+            elif kind == "reset":
+                detector.reset()
+    except EOFError:
+        pass # Parent went away
+    finally:
+        if frames is not None:
+            frames.close()
+        detector.close()
+        block.close()
+
+
+class RemoteHandDetector:
+    """HandDetector running in a separate process, behind the same
+    process() / reset() / close() interface.
+
+    Frames travel through a SharedFrameRing (one copy in, no pickling),
+    landmarks come back through a fixed-size LandmarkBlock, and only a few
+    small tuples cross the pipe. The worker's "convert" and "inference"
+    times are recorded into `timer` like the in-process detector's, and
+    the remaining round-trip overhead as "transfer".
+
+    The constructor blocks until the worker has loaded MediaPipe and raises
+    RuntimeError if it could not.
+    """
+
+    def __init__(self, max_num_hands=MAX_NUM_HANDS, timer=None):
+        self.timer = timer or StageTimer()
+        self.max_num_hands = max_num_hands
+        self.block = LandmarkBlock(max_num_hands)
+        self.frames = None
+        self.handedness = [] # landmarks.HANDEDNESS_* per hand of the last process()
+
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.worker = context.Process(
+            target=inference_worker,
+            args=(child_conn, self.block.name, self.block.lock, max_num_hands),
+            name="inference-worker",
+            daemon=True
+        )
+        self.worker.start()
+        child_conn.close()
+
+        reply = self._receive()
+        if reply[0] != "ready":
+            self.close()
+            raise RuntimeError(f"Inference worker failed: {reply[1]}")
+
+    def _receive(self):
+        try:
+            return self.conn.recv()
+        except EOFError:
+            raise RuntimeError("Inference worker exited unexpectedly")
+
+    def process(self, image):
+        # Returns one (21, 3) landmark array per hand found in `image` (BGR).
+        start = time.perf_counter()
+        if self.frames is None or self.frames.shape != image.shape:
+            # First frame, or the camera changed resolution
+            if self.frames is not None:
+                self.frames.close()
+            self.frames = SharedFrameRing(image.shape, FRAME_SLOTS)
+            self.conn.send(("frames", self.frames.name, self.frames.shape, self.frames.slots))
+
+        slot = self.frames.write(image)
+        self.conn.send(("process", slot))
+        count, convert, inference = self._receive()
+        _, _, hands, self.handedness = self.block.read()
+
+        self.timer.record("convert", convert)
+        self.timer.record("inference", inference)
+        self.timer.record("transfer", time.perf_counter() - start - convert - inference)
+        self.handedness = self.handedness[:count]
+        return hands[:count]
+
+    def reset(self):
+        self.conn.send(("reset",))
+
+    def close(self):
+        if self.worker is None:
+            return
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.worker.join(timeout=WORKER_JOIN_TIMEOUT)
+        if self.worker.is_alive():
+            self.worker.terminate()
+        self.worker = None
+        self.conn.close()
+        if self.frames is not None:
+            self.frames.close()
+            self.frames = None
+        self.block.close()
@@ -0,0 +1,120 @@
+import cv2
+import numpy as np
+
+# --- Landmark Indices (MediaPipe Hands) ---
+
+WRIST = 0
+THUMB_CMC, THUMB_MCP, THUMB_IP, THUMB_TIP = 1, 2, 3, 4
+INDEX_FINGER_MCP, INDEX_FINGER_PIP, INDEX_FINGER_DIP, INDEX_FINGER_TIP = 5, 6, 7, 8
+MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP, MIDDLE_FINGER_DIP, MIDDLE_FINGER_TIP = 9, 10, 11, 12
+RING_FINGER_MCP, RING_FINGER_PIP, RING_FINGER_DIP, RING_FINGER_TIP = 13, 14, 15, 16
+PINKY_MCP, PINKY_PIP, PINKY_DIP, PINKY_TIP = 17, 18, 19, 20
+NUM_LANDMARKS = 21
+
+# --- Fingers ---
+
+# Position of each finger in the per-finger arrays below
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+FINGER_NAMES = ("thumb", "index", "middle", "ring", "pinky")
+
+FINGER_TIPS = np.array([THUMB_TIP, INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP])
+FINGER_DIPS = np.array([THUMB_IP, INDEX_FINGER_DIP, MIDDLE_FINGER_DIP, RING_FINGER_DIP, PINKY_DIP])
+FINGER_PIPS = np.array([THUMB_MCP, INDEX_FINGER_PIP, MIDDLE_FINGER_PIP, RING_FINGER_PIP, PINKY_PIP])
+
+# Same topology as mp.solutions.hands.HAND_CONNECTIONS, as an (N, 2) array
+HAND_CONNECTIONS = np.array([
+    (WRIST, THUMB_CMC), (THUMB_CMC, THUMB_MCP), (THUMB_MCP, THUMB_IP), (THUMB_IP, THUMB_TIP),
+    (WRIST, INDEX_FINGER_MCP), (INDEX_FINGER_MCP, INDEX_FINGER_PIP),
+    (INDEX_FINGER_PIP, INDEX_FINGER_DIP), (INDEX_FINGER_DIP, INDEX_FINGER_TIP),
+    (INDEX_FINGER_MCP, MIDDLE_FINGER_MCP), (MIDDLE_FINGER_MCP, MIDDLE_FINGER_PIP),
+    (MIDDLE_FINGER_PIP, MIDDLE_FINGER_DIP), (MIDDLE_FINGER_DIP, MIDDLE_FINGER_TIP),
+    (MIDDLE_FINGER_MCP, RING_FINGER_MCP), (RING_FINGER_MCP, RING_FINGER_PIP),
+    (RING_FINGER_PIP, RING_FINGER_DIP), (RING_FINGER_DIP, RING_FINGER_TIP),
+    (RING_FINGER_MCP, PINKY_MCP), (WRIST, PINKY_MCP), (PINKY_MCP, PINKY_PIP),
+    (PINKY_PIP, PINKY_DIP), (PINKY_DIP, PINKY_TIP),
+])
+
+# Which hand it is, from the user's point of view
+HANDEDNESS_UNKNOWN, HANDEDNESS_LEFT, HANDEDNESS_RIGHT = -1, 0, 1
+
+# --- Conversion ---
+
+def handedness_from_mediapipe(classification, mirrored=False):
+    # MediaPipe labels hands as if the image were a mirrored selfie view;
+    # on an unmirrored camera frame its "Left" is the user's right hand.
+    left = classification.classification[0].label == "Left"
+    if not mirrored:
+        left = not left
+    return HANDEDNESS_LEFT if left else HANDEDNESS_RIGHT
+
+
+def from_mediapipe(hand_landmarks):
+    # Build the (21, 3) float32 array once per frame; everything downstream
+    # works on it instead of the protobuf.
+    coords = np.fromiter(
+        (value for landmark in hand_landmarks.landmark for value in (landmark.x, landmark.y, landmark.z)),
+        dtype=np.float32,
+        count=NUM_LANDMARKS * 3
+    )
+    return coords.reshape(NUM_LANDMARKS, 3)
+
+
+def mirror(landmarks):
+    # Selfie view, in place: x -> 1 - x
+    landmarks[:, 0] = 1.0 - landmarks[:, 0]
+    return landmarks
+
+
+def freeze(landmarks):
+    # Published landmarks are shared across threads; make accidental writes fail
+    landmarks.flags.writeable = False
+    return landmarks
+
+# --- Vectorized Measurements ---
+
+def tip_distances(landmarks):
+    # (5, 5) matrix of 2D distances between every pair of fingertips
+    tips = landmarks[FINGER_TIPS, :2]
+    diff = tips[:, None, :] - tips[None, :, :]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+def wrist_distances(landmarks, indices):
+    # 2D distance of each landmark in `indices` to the wrist
+    diff = landmarks[indices, :2] - landmarks[WRIST, :2]
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+
+def extended_fingers(landmarks):
+    # Tip higher (smaller y) than the DIP joint, per finger.
+    # Note: assumes the hand is roughly upright.
+    return landmarks[FINGER_TIPS, 1] < landmarks[FINGER_DIPS, 1]
+
+
+def folded_fingers(landmarks):
+    # Tip closer to the wrist than the PIP joint, per finger. More robust to
+    # hand rotation than comparing y coordinates.
+    return wrist_distances(landmarks, FINGER_TIPS) < wrist_distances(landmarks, FINGER_PIPS)
+
+
+def hand_scale(landmarks):
+    # Wrist to middle finger MCP: tracks distance from the camera but, unlike
+    # fingertip-based measures, does not change when fingers fold.
+    return float(wrist_distances(landmarks, [MIDDLE_FINGER_MCP])[0])
+
+
+def bounding_box(landmarks):
+    # (x_min, y_min, x_max, y_max) in normalised coordinates
+    lo = landmarks[:, :2].min(axis=0)
+    hi = landmarks[:, :2].max(axis=0)
+    return float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])
+
+# --- Drawing ---
+
+def draw_landmarks(image, landmarks, line_color, point_color, thickness=2, radius=2):
+    # Draw connections and joints on `image` in place
+    h, w = image.shape[:2]
+    points = np.rint(landmarks[:, :2] * (w, h)).astype(np.int32)
+    cv2.polylines(image, list(points[HAND_CONNECTIONS]), False, line_color, thickness)
+    for x, y in points:
+        cv2.circle(image, (int(x), int(y)), radius, point_color, -1)
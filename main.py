@@ -1,44 +1,128 @@
-import tkinter as tk
+import argparse
+import os
 import sys
 import threading
-from config import SharedState
+from config import CAMERA_INDICES, INFERENCE_MODE, MAX_NUM_HANDS, STREAM_URL, SharedState
+from eventbus import EventBus
 from tracker import HandTracker
-from dashboard import Dashboard
+from manager import TrackingManager
+from metrics import export_metrics
+from mouse import MOUSE_BACKENDS, create_mouse
+from profiles import Profile
+from recorder import SessionRecorder
+from replay import open_replay
+from server import LandmarkServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand tracking mouse control.")
+    parser.add_argument("--record", metavar="DIR", help="Record camera frames and landmarks into DIR")
+    parser.add_argument("--replay", metavar="PATH", help="Replay a recorded video or landmark trace (.trace / .npz) instead of the camera")
+    parser.add_argument("--mouse", choices=sorted(MOUSE_BACKENDS), help="Mouse backend (auto: XTest or uinput on Linux, else pyautogui; default: auto, null when headless)")
+    parser.add_argument("--metrics", metavar="FILE", help="Export latency metrics (.csv or .json) on exit")
+    parser.add_argument("--user", help="Calibration profile name (default: login name)")
+    parser.add_argument("--inference", choices=("inline", "process"), help=f"Run MediaPipe on the tracker thread or in a separate process (default {INFERENCE_MODE}; one camera only)")
+    parser.add_argument("--hands", metavar="N", type=int, default=MAX_NUM_HANDS, help=f"Hands to track per camera (default {MAX_NUM_HANDS}; more than one disables the ROI crop)")
+    parser.add_argument("--cameras", metavar="INDEX", type=int, nargs="+", default=list(CAMERA_INDICES), help="Camera indices; several run one tracking process per camera (no --record or --inference)")
+    parser.add_argument("--headless", action="store_true", help=f"Run without the dashboard until Ctrl-C, streaming landmarks (default {STREAM_URL})")
+    parser.add_argument("--stream", metavar="URL", action="append", help="Stream landmarks and gestures to local subscribers: udp://HOST:PORT or unix:PATH (repeatable)")
+    args = parser.parse_args()
+    if args.hands < 1:
+        parser.error("--hands must be at least 1")
+    if len(args.cameras) > 1 and not args.replay:
+        # Each camera is tracked in its own worker process (manager.py)
+        for flag, value in (("--record", args.record), ("--inference", args.inference)):
+            if value:
+                parser.error(f"{flag} needs a single camera")
+    args.inference = args.inference or INFERENCE_MODE
+    return args
 
 def main():
+    args = parse_args()
     print("Initializing Hand Tracking System...")
-    
+
     # Initialize Shared State
     state = SharedState()
-    
-    # Start Tracking Thread
-    tracker = HandTracker(state)
+
+    # Saved calibration for this user and camera (skips recalibrating)
+    camera_key = os.path.basename(args.replay) if args.replay else "camera" + "+".join(map(str, args.cameras))
+    profile = Profile(args.user, camera=camera_key)
+    if profile.load(state):
+        print(f"Loaded calibration profile {profile.key}.")
+    else:
+        print(f"No calibration profile for {profile.key} yet; run calibration to create one.")
+
+    # Optional Replay / Recording
+    source, detector = open_replay(args.replay, realtime=True) if args.replay else (None, None)
+    recorder = SessionRecorder(args.record) if args.record else None
+
+    # Start Tracking Thread (camera and hand model load in the background)
+    # Without --mouse / --headless the tracker creates the mouse on its own thread
+    mouse = create_mouse(args.mouse or "null") if args.mouse or args.headless else None
+    bus = EventBus(state.timer) # Gesture events for anything besides the mouse
+    bus.start()
+    if len(args.cameras) > 1 and not args.replay:
+        tracker = TrackingManager(state, args.cameras, max_num_hands=args.hands, mouse=mouse, bus=bus)
+    else:
+        tracker = HandTracker(state, source=source, detector=detector, mouse=mouse, recorder=recorder, camera=args.cameras[0], inference_mode=args.inference, max_num_hands=args.hands, bus=bus)
     tracker.start()
     print("Tracker thread started.")
-    
+
+    # Optional Landmark Streaming (other processes consume our tracking)
+    streams = args.stream or ([STREAM_URL] if args.headless else [])
+    server = LandmarkServer(state, streams, max_hands=args.hands) if streams else None
+    if server is not None:
+        server.start()
+
     try:
+        if args.headless:
+            run_headless(tracker)
+            return
+
         # Start Dashboard (Main UI Thread)
-        app = Dashboard(state)
-        
+        from dashboard import Dashboard
+        app = Dashboard(state, profile)
+
         # Override the close button behavior to ensure clean shutdown
         def on_limitless_void():
             print("Shutting down...")
             tracker.stop()
             app.destroy()
-            
+
         app.protocol("WM_DELETE_WINDOW", on_limitless_void)
-        
+
         print("Dashboard launched.")
         app.mainloop()
-        
+
     except KeyboardInterrupt:
         print("Keyboard Interrupt detected.")
     finally:
         print("Cleaning up...")
-        if tracker.is_alive():
-            tracker.stop()
-            tracker.join(timeout=2.0)
+        # stop() waits for the stages that use the mouse, even if the
+        # tracker thread itself has already ended, before it is closed below
+        tracker.stop()
+        tracker.join(timeout=2.0)
+        bus.stop()
+        if server is not None:
+            server.stop()
+            server.join(timeout=2.0)
+            stats = server.stats()
+            print(f"Streamed {stats['sent']} frames ({stats['dropped']} dropped for slow subscribers)")
+        mouse = mouse or getattr(tracker, "mouse", None)
+        if mouse is not None:
+            mouse.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"Recording saved to {args.record}")
+        if args.metrics:
+            export_metrics(state.timer, args.metrics)
+            print(f"Latency metrics saved to {args.metrics}")
         sys.exit(0)
 
+def run_headless(tracker):
+    # No Tk: wait for the tracker (it ends with a replay) or Ctrl-C
+    print("Running headless; press Ctrl-C to stop.")
+    while tracker.is_alive():
+        tracker.join(timeout=0.5)
+
 if __name__ == "__main__":
     main()
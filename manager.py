@@ -0,0 +1,178 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+from config import CAMERA_INDICES, MAX_NUM_HANDS
+from actuation import CursorActuator
+from hands import HandMatcher
+from landmarks import freeze, mirror
+from mouse import create_mouse
+from pipeline import InferenceResult, LatestQueue
+from shm import LandmarkBlock
+from tracker import STAGE_POLL_TIMEOUT, ActuationStage, join_stages
+
+# How long shut_down() waits for a worker to exit before terminating it
+WORKER_JOIN_TIMEOUT = 2.0
+
+
+def camera_worker(camera_index, block_name, block_lock, max_num_hands, notify, stop_event):
+    # Runs in its own process (own interpreter, own GIL): capture and
+    # MediaPipe for one camera. Landmarks go into the shared LandmarkBlock;
+    # `notify` only carries the camera index to wake the manager.
+    from capture import CameraSource
+    from detector import HandDetector
+
+    block = LandmarkBlock(max_num_hands, name=block_name, lock=block_lock)
+    cap = CameraSource(camera_index)
+    cap.open()
+    detector = HandDetector(max_num_hands=max_num_hands)
+    try:
+        while not stop_event.is_set() and cap.isOpened():
+            success, image = cap.read() # Waits by itself when the camera fails
+            if not success:
+                continue
+            hands = detector.process(image)
+            block.write(cap.timestamp, hands, detector.handedness)
+            notify.put(camera_index)
+    finally:
+        cap.release()
+        detector.close()
+        block.close()
+
+
+class TrackingManager(threading.Thread):
+    """Multi-camera tracking with one MediaPipe worker process per camera.
+
+    Each worker captures and runs inference on its own camera, outside this
+    process's GIL, and publishes landmarks through a shared-memory
+    LandmarkBlock. This thread collects them, gives every hand a stable ID
+    across frames and cameras (HandMatcher) and feeds the usual
+    ActuationStage, so each hand gets its own gesture stream and the oldest
+    one drives the cursor.
+
+    Drop-in for HandTracker in main.py; the camera preview is not available
+    in this mode (frames never leave the workers).
+    """
+
+    def __init__(self, shared_state, cameras=CAMERA_INDICES, max_num_hands=MAX_NUM_HANDS, mouse=None, bus=None):
+        super().__init__()
+        self.state = shared_state
+        self.daemon = True
+        self.running = True
+
+        self.timer = shared_state.timer
+        self.cameras = tuple(cameras)
+        self.max_num_hands = max_num_hands
+        self.mouse = mouse
+        self.bus = bus
+        self.matcher = HandMatcher()
+
+        # Workers (created in start_up())
+        self.context = multiprocessing.get_context("spawn") # No fork with live threads
+        self.stop_event = self.context.Event()
+        self.notify = self.context.Queue()
+        self.blocks = {} # camera index -> LandmarkBlock
+        self.workers = {} # camera index -> Process
+        self.sequences = {} # camera index -> last sequence read
+
+        # Actuation
+        self.results = LatestQueue(maxsize=1)
+        self.cursor = None
+        self.actuation_stage = None
+
+    def start_up(self):
+        self.state.update_settings(startup_message=f"Starting {len(self.cameras)} camera workers...")
+        for camera in self.cameras:
+            block = LandmarkBlock(self.max_num_hands)
+            worker = self.context.Process(
+                target=camera_worker,
+                args=(camera, block.name, block.lock, self.max_num_hands, self.notify, self.stop_event),
+                name=f"camera-{camera}",
+                daemon=True
+            )
+            worker.start()
+            self.blocks[camera] = block
+            self.workers[camera] = worker
+
+        if self.mouse is None:
+            self.mouse = create_mouse()
+        self.cursor = CursorActuator(self.mouse, timer=self.timer)
+        self.actuation_stage = ActuationStage(self.state, self.cursor, self.mouse, self.results, self.timer, bus=self.bus)
+        self.state.update_settings(startup_message="Waiting for first frame...")
+        return True
+
+    def run(self):
+        try:
+            if self.start_up() and self.running:
+                self.actuation_stage.start()
+                self.cursor.start()
+                self.collect_loop()
+        finally:
+            self.stop()
+            self.shut_down()
+
+    def collect_loop(self):
+        index = 0
+        while self.running:
+            try:
+                updated = {self.notify.get(timeout=STAGE_POLL_TIMEOUT)}
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self.workers.values()):
+                    self.state.update_settings(startup_message="No camera available")
+                    return
+                continue
+            # Coalesce a backlog: only each camera's newest frame matters
+            while True:
+                try:
+                    updated.add(self.notify.get_nowait())
+                except queue.Empty:
+                    break
+
+            result = self.collect(index, updated)
+            if result is not None:
+                self.results.put(result)
+                index += 1
+
+    def collect(self, index, cameras):
+        tracked = None
+        newest = None
+        for camera in cameras:
+            data = self.blocks[camera].read()
+            if data is None or data[0] == self.sequences.get(camera):
+                continue
+            sequence, timestamp, hands, handedness = data
+            self.sequences[camera] = sequence
+
+            for hand_landmarks in hands:
+                # Selfie view: mirror x instead of flipping the frame
+                freeze(mirror(hand_landmarks))
+            tracked = self.matcher.update(camera, hands, timestamp, handedness)
+            newest = timestamp if newest is None else max(newest, timestamp)
+
+        if tracked is None:
+            return None
+        # Capture (in the worker) -> landmarks available here
+        self.timer.record("worker_latency", time.perf_counter() - newest)
+        primary = tracked[0].landmarks if tracked else None
+        return InferenceResult(index, newest, primary, primary is not None, tracked, self.matcher.live_ids())
+
+    def stop(self):
+        # Workers and shared memory are released by shut_down() on this
+        # thread once it has stopped reading from them
+        self.running = False
+        self.stop_event.set()
+        for stage in (self.actuation_stage, self.cursor):
+            if stage is not None:
+                stage.stop()
+        join_stages(self.actuation_stage, self.cursor)
+
+    def shut_down(self):
+        for worker in self.workers.values():
+            worker.join(timeout=WORKER_JOIN_TIMEOUT)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers.clear()
+        for block in self.blocks.values():
+            block.close()
+        self.blocks.clear()
@@ -0,0 +1,213 @@
+import threading
+import numpy as np
+
+from config import DISPLAY_POLL_SECONDS
+from display import Monitor, monitors
+from landmarks import INDEX_FINGER_TIP
+
+# Where the four calibration points (Settings.mapping_points, camera
+# coordinates) land on the desktop, in calibration order: top-left,
+# top-right, bottom-right, bottom-left of the unit square
+SCREEN_CORNERS = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+
+
+# --- Homographies ---
+
+def fit_homography(src, dst):
+    # 3x3 matrix H with dst ~ H @ (x, y, 1), least squares over four or
+    # more point pairs (direct linear transform on normalised points).
+    # Raises ValueError for degenerate input.
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if src.shape != dst.shape or src.ndim != 2 or src.shape[1] != 2 or len(src) < 4:
+        raise ValueError("Need at least four (x, y) point pairs")
+
+    src_norm, dst_norm = _normaliser(src), _normaliser(dst)
+    x, y = apply_homography(src_norm, src).T
+    u, v = apply_homography(dst_norm, dst).T
+    ones, zeros = np.ones_like(x), np.zeros_like(x)
+    system = np.empty((2 * len(src), 9))
+    system[0::2] = np.column_stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y, -u])
+    system[1::2] = np.column_stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y, -v])
+    _, singular, vt = np.linalg.svd(system)
+    if singular[-2] < 1e-9:
+        raise ValueError("Points do not determine a homography")
+
+    matrix = np.linalg.inv(dst_norm) @ vt[-1].reshape(3, 3) @ src_norm
+    if abs(matrix[2, 2]) < 1e-12:
+        raise ValueError("Degenerate homography")
+    return matrix / matrix[2, 2]
+
+
+def _normaliser(points):
+    # Moves the centroid to the origin and the mean distance to sqrt(2)
+    center = points.mean(axis=0)
+    spread = np.linalg.norm(points - center, axis=1).mean()
+    if spread < 1e-12:
+        raise ValueError("Points coincide")
+    s = np.sqrt(2.0) / spread
+    return np.array([[s, 0.0, -s * center[0]], [0.0, s, -s * center[1]], [0.0, 0.0, 1.0]])
+
+
+def apply_homography(matrix, points):
+    # (..., 2) points -> (..., 2), in one vectorised step
+    points = np.asarray(points, dtype=np.float64)
+    projected = points @ matrix[:, :2].T + matrix[:, 2]
+    return projected[..., :2] / projected[..., 2:]
+
+
+def is_convex(quad):
+    # Corners in order, turning the same way at every corner
+    quad = np.asarray(quad, dtype=np.float64)
+    edges = np.roll(quad, -1, axis=0) - quad
+    turns = edges[:, 0] * np.roll(edges, -1, axis=0)[:, 1] - edges[:, 1] * np.roll(edges, -1, axis=0)[:, 0]
+    return bool(np.all(turns > 0) or np.all(turns < 0))
+
+
+# --- Desktop Layout ---
+
+class DesktopLayout:
+    """The monitors of the virtual desktop, in pixels and in logical units.
+
+    Logical units are pixels divided by each monitor's DPI scale, so equal
+    hand movements cover equal physical distances on every monitor. Logical
+    rectangles keep the monitors' arrangement: one starts where the
+    monitors entirely to its left (above it) end. to_pixels() takes logical
+    points to desktop pixels, clamped into the nearest monitor.
+    """
+
+    def __init__(self, monitors):
+        self.monitors = tuple(monitors)
+        pixels = np.array([(m.x, m.y, m.width, m.height) for m in self.monitors], dtype=np.float64)
+        self.scales = np.array([m.scale for m in self.monitors], dtype=np.float64)
+        self.pixel_origins = pixels[:, :2]
+        self.pixel_limits = pixels[:, :2] + pixels[:, 2:] - 1 # Last pixel, inclusive
+        sizes = pixels[:, 2:] / self.scales[:, None]
+
+        origins = np.zeros_like(sizes)
+        for axis in (0, 1):
+            start, end = pixels[:, axis], pixels[:, axis] + pixels[:, axis + 2]
+            for i in np.argsort(start, kind="stable"):
+                before = [origins[j, axis] + sizes[j, axis] for j in range(len(start)) if end[j] <= start[i]]
+                origins[i, axis] = max(before) if before else (start[i] - start.min()) / self.scales[i]
+        self.logical_min = origins
+        self.logical_max = origins + sizes
+
+        # Bounding boxes: logical (x, y, width, height) and pixel (x0, y0, x1, y1)
+        low, high = self.logical_min.min(axis=0), self.logical_max.max(axis=0)
+        self.bounds = tuple(float(v) for v in (low[0], low[1], high[0] - low[0], high[1] - low[1]))
+        self.pixel_bounds = tuple(int(v) for v in np.concatenate([self.pixel_origins.min(axis=0), self.pixel_limits.max(axis=0)]))
+
+    def to_pixels(self, points):
+        # (..., 2) logical points -> (..., 2) desktop pixels
+        points = np.asarray(points, dtype=np.float64)
+        if len(self.monitors) == 1:
+            nearest = 0
+        else:
+            p = points[..., None, :]
+            outside = np.maximum(self.logical_min - p, 0.0) + np.maximum(p - self.logical_max, 0.0)
+            nearest = np.argmin((outside ** 2).sum(axis=-1), axis=-1)
+        low = self.logical_min[nearest]
+        clamped = np.clip(points, low, self.logical_max[nearest])
+        scale = self.scales[nearest]
+        if np.ndim(scale):
+            scale = scale[..., None]
+        pixels = self.pixel_origins[nearest] + (clamped - low) * scale
+        return np.minimum(pixels, self.pixel_limits[nearest])
+
+
+def desktop_layout(size):
+    # The monitor layout if it matches the mouse's coordinate space of
+    # `size` (the whole desktop, or the primary monitor for backends that
+    # only report that), else one monitor of that size
+    found = monitors()
+    if found:
+        layout = DesktopLayout(found)
+        x0, y0, x1, y1 = layout.pixel_bounds
+        primary = found[0]
+        if (x1 - x0 + 1, y1 - y0 + 1) == tuple(size) or (primary.width, primary.height) == tuple(size):
+            return layout
+    return DesktopLayout([Monitor(0, 0, size[0], size[1], 1.0, "default")])
+
+
+# --- Camera To Screen ---
+
+class ScreenMapper:
+    """Camera coordinates (normalised, as the app sees them) to desktop
+    pixels.
+
+    Camera to logical desktop is a single 3x3 matrix: a homography fitted to
+    the calibration corners (Settings.mapping_points) when there are four
+    that form a convex quad, else the margin rectangle, scaled to the
+    layout's logical bounds. It is recomputed only when the margin, the
+    corners or the layout change; per frame mapping is one matrix product
+    plus the per-monitor DPI step (DesktopLayout.to_pixels), for one point
+    or for whole traces at once.
+
+    `layout` may be replaced from another thread (see LayoutWatcher).
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.matrix = None
+        self._key = None
+        self._layout = None
+
+    def matrix_for(self, settings):
+        # Returns (matrix, layout), recomputing the matrix if outdated
+        layout = self.layout
+        key = (settings.margin, settings.mapping_points)
+        if key != self._key or layout is not self._layout:
+            x, y, width, height = layout.bounds
+            to_desktop = np.array([[width, 0.0, x], [0.0, height, y], [0.0, 0.0, 1.0]])
+            self.matrix = to_desktop @ self.camera_homography(settings)
+            self._key = key
+            self._layout = layout
+        return self.matrix, self._layout
+
+    @staticmethod
+    def camera_homography(settings):
+        # Camera -> unit square of the desktop
+        points = settings.mapping_points
+        if points is not None and len(points) == 4 and is_convex(points):
+            try:
+                return fit_homography(points, SCREEN_CORNERS)
+            except ValueError:
+                pass
+        m = settings.margin
+        scale = 1.0 / (1.0 - 2.0 * m)
+        return np.array([[scale, 0.0, -m * scale], [0.0, scale, -m * scale], [0.0, 0.0, 1.0]])
+
+    def map(self, points, settings):
+        # (..., 2) camera points -> (..., 2) desktop pixels
+        matrix, layout = self.matrix_for(settings)
+        return layout.to_pixels(apply_homography(matrix, points))
+
+    def map_landmarks(self, landmarks, settings, landmark=INDEX_FINGER_TIP):
+        # Cursor positions for (..., 21, 3) landmarks, e.g. a whole trace.
+        # Trace landmarks are in detector space: mirror them first.
+        return self.map(np.asarray(landmarks)[..., landmark, :2], settings)
+
+
+class LayoutWatcher(threading.Thread):
+    """Re-reads the monitor layout every `interval` seconds and gives
+    `mapper` a new DesktopLayout when monitors were added, removed, moved or
+    rescaled. Querying takes a subprocess on Linux, so it never runs on the
+    tracking threads."""
+
+    def __init__(self, mapper, size, interval=DISPLAY_POLL_SECONDS):
+        super().__init__(name="layout-watcher", daemon=True)
+        self.mapper = mapper
+        self.size = size
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            layout = desktop_layout(self.size)
+            if layout.monitors != self.mapper.layout.monitors:
+                print(f"Display layout changed: {len(layout.monitors)} monitor(s)")
+                self.mapper.layout = layout
+
+    def stop(self):
+        self.stop_event.set()
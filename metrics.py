@@ -0,0 +1,44 @@
+import csv
+import json
+import time
+
+# Exporters for the per-stage latency metrics in SharedState.timer (see
+# pipeline.StageTimer). All durations are in milliseconds.
+#
+# Stages recorded by the pipeline:
+#   capture          camera read
+#   convert          resize + BGR->RGB for MediaPipe
+#   inference        MediaPipe graph
+#   draw             preview annotation (only while the preview is open)
+#   gesture          landmark filtering + gesture evaluation
+#   mouse            each mouse backend call (move / press / release)
+#   press_latency    frame capture -> button down
+#   click_latency    capture of the frame a pinch began in -> button down
+#   frame_latency    frame capture -> tracking snapshot published
+#   motion_to_cursor frame capture -> first cursor move reflecting it
+#   event_queue      gesture event published -> dispatched by the event bus
+#   handler:<name>   frame capture -> that event handler finished
+
+STAT_FIELDS = ("count", "mean", "p50", "p95", "p99", "max")
+
+
+def export_csv(timer, path):
+    stats = timer.stats()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("stage",) + STAT_FIELDS)
+        for stage, values in stats.items():
+            writer.writerow([stage] + [values[field] for field in STAT_FIELDS])
+
+
+def export_json(timer, path):
+    with open(path, "w") as f:
+        json.dump({"exported_at": time.time(), "stages": timer.stats()}, f, indent=2)
+
+
+def export_metrics(timer, path):
+    # Format follows the file extension (.json, anything else is CSV)
+    if path.lower().endswith(".json"):
+        export_json(timer, path)
+    else:
+        export_csv(timer, path)
@@ -0,0 +1,319 @@
+import functools
+import os
+import struct
+import sys
+import threading
+import time
+
+# Mouse backends. All of them offer size(), move_to(x, y), press(button),
+# release(button), scroll(clicks), flush() and close(). Calls may be queued
+# until flush(): the cursor and action threads flush once per batch (one
+# cursor tick, or a drained action queue), so a backend that talks to a
+# server sends each batch in a single write.
+
+
+class PyAutoGuiMouse:
+    """Mouse backend that drives the real cursor through pyautogui."""
+
+    def __init__(self):
+        # Imported lazily: pyautogui needs a display as soon as it loads
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def size(self):
+        width, height = self.pyautogui.size()
+        return int(width), int(height)
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def press(self, button="left"):
+        self.pyautogui.mouseDown(button=button, _pause=False)
+
+    def release(self, button="left"):
+        self.pyautogui.mouseUp(button=button, _pause=False)
+
+    def scroll(self, clicks):
+        # Whole wheel clicks, positive scrolls up
+        self.pyautogui.scroll(clicks, _pause=False)
+
+    def flush(self):
+        pass # Every call is sent (and synced) immediately
+
+    def close(self):
+        pass
+
+
+def _load_library(name):
+    import ctypes
+    import ctypes.util
+    path = ctypes.util.find_library(name)
+    if path is None:
+        raise OSError(f"lib{name} not found")
+    return ctypes.CDLL(path)
+
+
+class XTestMouse:
+    """Injects pointer events with the X11 XTest extension.
+
+    Uses libX11/libXtst directly through ctypes over one display connection
+    that stays open. Events are only queued in Xlib's output buffer until
+    flush(), which writes them without waiting for a reply. pyautogui goes
+    through python-xlib and waits for a server round trip after every call.
+    Works on any X server, including Xvfb for tests.
+    """
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+    WHEEL_UP, WHEEL_DOWN = 4, 5
+
+    def __init__(self, display_name=None):
+        import ctypes
+        self.x11 = _load_library("X11")
+        self.xtst = _load_library("Xtst")
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+
+        self.display = self.x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError(f"Cannot open X display {display_name or os.environ.get('DISPLAY')}")
+        ints = [ctypes.c_int() for _ in range(4)]
+        if not self.xtst.XTestQueryExtension(self.display, *[ctypes.byref(i) for i in ints]):
+            self.x11.XCloseDisplay(self.display)
+            raise RuntimeError("X server has no XTest extension")
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.width = self.x11.XDisplayWidth(self.display, screen)
+        self.height = self.x11.XDisplayHeight(self.display, screen)
+        self._lock = threading.Lock() # Xlib is not thread-safe without XInitThreads
+
+    def size(self):
+        return self.width, self.height
+
+    # Every call is a no-op once close() has run: Xlib would dereference the
+    # NULL display of a late call from a stage that is still shutting down
+
+    def move_to(self, x, y):
+        with self._lock:
+            if self.display:
+                # Screen -1: the one the pointer is on
+                self.xtst.XTestFakeMotionEvent(self.display, -1, int(x), int(y), 0)
+
+    def press(self, button="left"):
+        with self._lock:
+            if self.display:
+                self.xtst.XTestFakeButtonEvent(self.display, self.BUTTONS[button], True, 0)
+
+    def release(self, button="left"):
+        with self._lock:
+            if self.display:
+                self.xtst.XTestFakeButtonEvent(self.display, self.BUTTONS[button], False, 0)
+
+    def scroll(self, clicks):
+        # X reports wheel clicks as presses of buttons 4 (up) and 5 (down)
+        button = self.WHEEL_UP if clicks > 0 else self.WHEEL_DOWN
+        with self._lock:
+            if not self.display:
+                return
+            for _ in range(abs(int(clicks))):
+                self.xtst.XTestFakeButtonEvent(self.display, button, True, 0)
+                self.xtst.XTestFakeButtonEvent(self.display, button, False, 0)
+
+    def flush(self):
+        with self._lock:
+            if self.display:
+                self.x11.XFlush(self.display)
+
+    def close(self):
+        with self._lock:
+            if self.display:
+                self.x11.XCloseDisplay(self.display)
+                self.display = None
+
+
+# linux/input-event-codes.h and linux/uinput.h
+EV_SYN, EV_KEY, EV_REL, EV_ABS = 0x00, 0x01, 0x02, 0x03
+SYN_REPORT = 0
+BTN_LEFT, BTN_RIGHT, BTN_MIDDLE = 0x110, 0x111, 0x112
+REL_WHEEL = 0x08
+ABS_X, ABS_Y = 0x00, 0x01
+BUS_VIRTUAL = 0x06
+UI_SET_EVBIT, UI_SET_KEYBIT, UI_SET_RELBIT, UI_SET_ABSBIT = 0x40045564, 0x40045565, 0x40045566, 0x40045567
+UI_DEV_CREATE, UI_DEV_DESTROY = 0x5501, 0x5502
+ABS_CNT = 64
+INPUT_EVENT = struct.Struct("llHHi") # struct input_event: timeval, type, code, value
+
+
+class UInputMouse:
+    """Virtual absolute pointer created through the kernel's /dev/uinput.
+
+    Works below the display server, so under Wayland as well as X11. The
+    pointer's coordinate range is the screen size, which the compositor
+    maps onto the whole desktop. Each flush() writes all queued events,
+    ending in one SYN_REPORT, with a single write() call. Needs write
+    access to /dev/uinput (e.g. a udev rule for the user's group).
+    """
+
+    BUTTONS = {"left": BTN_LEFT, "middle": BTN_MIDDLE, "right": BTN_RIGHT}
+
+    def __init__(self, width=None, height=None, path="/dev/uinput"):
+        import fcntl
+        if width is None or height is None:
+            from display import screen_size
+            width, height = screen_size()
+        self.width, self.height = width, height
+
+        self.fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_KEY)
+            for code in self.BUTTONS.values():
+                fcntl.ioctl(self.fd, UI_SET_KEYBIT, code)
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_REL)
+            fcntl.ioctl(self.fd, UI_SET_RELBIT, REL_WHEEL)
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_ABS)
+            fcntl.ioctl(self.fd, UI_SET_ABSBIT, ABS_X)
+            fcntl.ioctl(self.fd, UI_SET_ABSBIT, ABS_Y)
+
+            # struct uinput_user_dev: name, input_id, ff_effects_max, then
+            # absmax / absmin / absfuzz / absflat for every axis
+            absmax = [0] * ABS_CNT
+            absmax[ABS_X], absmax[ABS_Y] = width - 1, height - 1
+            device = struct.pack(
+                f"80sHHHHi{ABS_CNT * 4}i",
+                b"handtrack virtual pointer", BUS_VIRTUAL, 0x1, 0x1, 1, 0,
+                *absmax, *([0] * ABS_CNT * 3)
+            )
+            os.write(self.fd, device)
+            fcntl.ioctl(self.fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+        self._events = []
+        self._lock = threading.Lock()
+
+    def size(self):
+        return self.width, self.height
+
+    def _queue(self, kind, code, value):
+        with self._lock:
+            self._events.append((kind, code, value))
+
+    def move_to(self, x, y):
+        with self._lock:
+            self._events.append((EV_ABS, ABS_X, int(x)))
+            self._events.append((EV_ABS, ABS_Y, int(y)))
+
+    def press(self, button="left"):
+        self._queue(EV_KEY, self.BUTTONS[button], 1)
+
+    def release(self, button="left"):
+        self._queue(EV_KEY, self.BUTTONS[button], 0)
+
+    def scroll(self, clicks):
+        self._queue(EV_REL, REL_WHEEL, int(clicks))
+
+    def flush(self):
+        # A no-op once closed, like XTestMouse; events queued after close()
+        # are dropped
+        with self._lock:
+            if not self._events or self.fd is None:
+                self._events = []
+                return
+            events = self._events
+            self._events = []
+            events.append((EV_SYN, SYN_REPORT, 0))
+            os.write(self.fd, b"".join(INPUT_EVENT.pack(0, 0, kind, code, value) for kind, code, value in events))
+
+    def close(self):
+        with self._lock:
+            if self.fd is not None:
+                import fcntl
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+                os.close(self.fd)
+                self.fd = None
+
+
+class NullMouse:
+    """Mouse backend that touches nothing, for replay and benchmarks.
+
+    Counts moves and scroll clicks and, with `record=True`, keeps
+    (perf_counter, kind, x, y) for every button and scroll event so gesture
+    timing can be measured offline. Left button events are "press" and
+    "release", other buttons' are prefixed ("right_press").
+    """
+
+    def __init__(self, width=1920, height=1080, record=False):
+        self.width = width
+        self.height = height
+        self.record = record
+        self.moves = 0
+        self.scrolled = 0
+        self.flushes = 0
+        self.events = []
+        self.position = (0, 0)
+
+    def size(self):
+        return self.width, self.height
+
+    def move_to(self, x, y):
+        self.moves += 1
+        self.position = (x, y)
+
+    def press(self, button="left"):
+        self._event("press", button)
+
+    def release(self, button="left"):
+        self._event("release", button)
+
+    def scroll(self, clicks):
+        self.scrolled += clicks
+        self._event("scroll", "left")
+
+    def _event(self, kind, button):
+        if self.record:
+            if button != "left":
+                kind = f"{button}_{kind}"
+            self.events.append((time.perf_counter(), kind) + self.position)
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        pass
+
+
+def auto_mouse():
+    # The fastest backend that works here: uinput under Wayland (XTest only
+    # reaches X clients there), XTest on X11, pyautogui everywhere else
+    if sys.platform.startswith("linux"):
+        candidates = [UInputMouse, XTestMouse] if os.environ.get("WAYLAND_DISPLAY") else [XTestMouse, UInputMouse]
+        for backend in candidates:
+            if backend is XTestMouse and not os.environ.get("DISPLAY"):
+                continue
+            try:
+                return backend()
+            except (OSError, RuntimeError) as e:
+                print(f"{backend.__name__} unavailable ({e}); trying the next mouse backend.")
+    return PyAutoGuiMouse()
+
+
+MOUSE_BACKENDS = {
+    "auto": auto_mouse,
+    "xtest": XTestMouse,
+    "uinput": UInputMouse,
+    "pyautogui": PyAutoGuiMouse,
+    "null": NullMouse,
+    "record": functools.partial(NullMouse, record=True),
+}
+
+
+def create_mouse(name="auto"):
+    return MOUSE_BACKENDS[name]()
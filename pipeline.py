@@ -0,0 +1,170 @@
+import collections
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Pipeline Packets ---
+
+# A camera frame on its way from the capture stage to the inference stage.
+# `timestamp` is the perf_counter() value taken right after the grab.
+FramePacket = collections.namedtuple("FramePacket", ["index", "timestamp", "image"])
+
+# Marks the end of a finite source (replayed video or trace)
+END_OF_STREAM = object()
+
+# Landmarks on their way from the inference stage to the actuation stage.
+# `hands` holds every visible tracked hand (hands.TrackedHand), oldest
+# first; `landmarks` is the oldest hand's. `tracked_ids` holds the IDs of
+# every track still alive, including hands missed in this frame.
+InferenceResult = collections.namedtuple(
+    "InferenceResult", ["index", "timestamp", "landmarks", "hand_detected", "hands", "tracked_ids"]
+)
+
+
+class LatestQueue:
+    """Bounded hand-off between two pipeline stages.
+
+    When the queue is full the oldest item is discarded, so a slow consumer
+    always picks up the newest frame instead of working through a backlog.
+    With `lossless=True` a full queue makes put() wait instead, which offline
+    replay uses so that every recorded frame is processed.
+    """
+
+    def __init__(self, maxsize=1, lossless=False):
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.lossless = lossless
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self.lossless:
+                self._cond.wait_for(lambda: len(self._items) < self._items.maxlen)
+            elif len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        # Returns None on timeout so callers can re-check their running flag.
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+
+class ActionQueue:
+    """Unbounded FIFO of gesture actions (presses, releases, scrolls).
+
+    Unlike frames, actions must never be dropped: a lost release would leave
+    a button held down. Both ends are O(1) (a deque, where a list would shift
+    on every pop(0)); get() blocks until an action arrives or `timeout`
+    passes.
+    """
+
+    def __init__(self):
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        # Returns None on timeout
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageTimer:
+    """Rolling window of durations for each named pipeline stage.
+
+    `window=None` keeps every sample (benchmarks).
+    """
+
+    def __init__(self, window=120):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    @contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def summary(self):
+        # Mean duration per stage in milliseconds
+        with self._lock:
+            return {
+                stage: 1000.0 * sum(samples) / len(samples)
+                for stage, samples in self._samples.items()
+                if samples
+            }
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        # Nearest-rank percentiles per stage in milliseconds
+        with self._lock:
+            ordered = {stage: sorted(samples) for stage, samples in self._samples.items() if samples}
+        return {
+            stage: tuple(1000.0 * _nearest_rank(samples, q) for q in quantiles)
+            for stage, samples in ordered.items()
+        }
+
+    def stats(self):
+        # Everything the dashboard and exporters show, in milliseconds:
+        # {stage: {"count", "mean", "p50", "p95", "p99", "max"}}
+        with self._lock:
+            ordered = {stage: sorted(samples) for stage, samples in self._samples.items() if samples}
+        return {
+            stage: {
+                "count": len(samples),
+                "mean": 1000.0 * sum(samples) / len(samples),
+                "p50": 1000.0 * _nearest_rank(samples, 50),
+                "p95": 1000.0 * _nearest_rank(samples, 95),
+                "p99": 1000.0 * _nearest_rank(samples, 99),
+                "max": 1000.0 * samples[-1],
+            }
+            for stage, samples in ordered.items()
+        }
+
+    def counts(self):
+        with self._lock:
+            return {stage: len(samples) for stage, samples in self._samples.items()}
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def _nearest_rank(ordered, q):
+    # The smallest sample with at least q% of all samples at or below it
+    rank = math.ceil(q * len(ordered) / 100.0)
+    return ordered[max(rank, 1) - 1]
@@ -0,0 +1,81 @@
+import getpass
+import json
+import os
+import time
+
+from config import DEFAULT_FILTER_PARAMS, PROFILE_PATH
+from filters import FILTERS
+
+# Calibration results worth keeping between runs, by Settings field name
+PROFILE_FIELDS = ("margin", "mapping_points", "click_threshold", "filter_type", "filter_params")
+
+# File format version. Version 1 stored click_threshold as an absolute
+# distance rather than in hand scales, so it is not carried over.
+PROFILE_VERSION = 2
+
+
+class Profile:
+    """Calibration results for one user on one camera, kept on disk.
+
+    All profiles live in one JSON file (PROFILE_PATH) keyed by
+    "user@camera", so the same person gets separate results for, say, the
+    laptop webcam and an external camera.
+    """
+
+    def __init__(self, user=None, camera="camera0", path=PROFILE_PATH):
+        self.user = user or getpass.getuser()
+        self.camera = camera
+        self.path = path
+
+    @property
+    def key(self):
+        return f"{self.user}@{self.camera}"
+
+    def _read_all(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable profile file {self.path}: {e}")
+            return {}
+        profiles = data.get("profiles", {})
+        if data.get("version", 1) < 2:
+            for stored in profiles.values():
+                stored.pop("click_threshold", None)
+        return profiles
+
+    def load(self, state):
+        # Apply the stored calibration to `state`; False if there is none
+        stored = self._read_all().get(self.key)
+        if not stored:
+            return False
+        changes = {field: stored[field] for field in PROFILE_FIELDS if field in stored}
+        if changes.get("mapping_points") is not None:
+            # Stored as JSON lists; Settings keep hashable tuples
+            changes["mapping_points"] = tuple(tuple(point) for point in changes["mapping_points"])
+        if changes.get("filter_type") not in FILTERS:
+            changes.pop("filter_type", None)
+        if "filter_params" in changes:
+            # Defaults fill in filters/parameters added since it was saved
+            changes["filter_params"] = {
+                filter_type: dict(params, **changes["filter_params"].get(filter_type, {}))
+                for filter_type, params in DEFAULT_FILTER_PARAMS.items()
+            }
+        state.update_settings(**changes)
+        return True
+
+    def save(self, settings):
+        # Write atomically so a crash never leaves a truncated file behind
+        profiles = self._read_all()
+        profiles[self.key] = dict(
+            {field: getattr(settings, field) for field in PROFILE_FIELDS},
+            saved_at=time.time()
+        )
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": PROFILE_VERSION, "profiles": profiles}, f, indent=2)
+        os.replace(tmp_path, self.path)
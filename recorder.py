@@ -0,0 +1,83 @@
+import os
+import queue
+import threading
+import cv2
+
+from config import TRACE_LANDMARK_DTYPE
+from gestures import GESTURE_CODES
+from landmarks import mirror
+from traces import TraceWriter
+
+
+class SessionRecorder:
+    """Records what the tracker sees, for offline replay and benchmarks.
+
+    Writes into `directory`:
+      frames.mp4       - the camera frames that reached inference
+      landmarks.trace  - one record per tracked hand per frame that reached
+                         the actuation stage: landmarks in detector space
+                         (unmirrored), hand ID, handedness and gesture (see
+                         traces.py), with its frame index landmarks.trace.index
+
+    record_frame() is called from the inference stage and record_hands()
+    from the actuation stage, and neither blocks: video frames go to a
+    writer thread through a bounded queue and are dropped (and counted) if
+    the encoder falls behind, trace records go to the TraceWriter's thread.
+    """
+
+    def __init__(self, directory, video=True, trace=True, fps=30.0):
+        os.makedirs(directory, exist_ok=True)
+        self.video_path = os.path.join(directory, "frames.mp4") if video else None
+        self.trace_path = os.path.join(directory, "landmarks.trace") if trace else None
+        self.fps = fps
+
+        # Landmark Trace
+        self.trace = TraceWriter(self.trace_path, TRACE_LANDMARK_DTYPE) if trace else None
+
+        # Video Writer
+        self.dropped_frames = 0
+        self._frames = queue.Queue(maxsize=64)
+        self._writer = None
+        if self.video_path:
+            self._writer = threading.Thread(target=self._write_frames, daemon=True)
+            self._writer.start()
+
+    def record_hands(self, timestamp, frame, hands):
+        # `hands` are the frame's TrackedHands, mirrored and with gestures
+        if self.trace is not None:
+            self.trace.write(
+                timestamp, frame,
+                [mirror(hand.landmarks.copy()) for hand in hands], # Back to detector space
+                hand_ids=[hand.hand_id for hand in hands],
+                handedness=[hand.handedness for hand in hands],
+                gestures=[GESTURE_CODES.get(hand.gesture, 0) for hand in hands]
+            )
+
+    def record_frame(self, image):
+        if self.video_path and image is not None:
+            try:
+                self._frames.put_nowait(image)
+            except queue.Full:
+                self.dropped_frames += 1
+
+    def _write_frames(self):
+        writer = None
+        while True:
+            image = self._frames.get()
+            if image is None:
+                break
+            if writer is None:
+                h, w = image.shape[:2]
+                writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (w, h))
+            writer.write(image)
+        if writer is not None:
+            writer.release()
+
+    def close(self):
+        if self._writer is not None:
+            self._frames.put(None)
+            self._writer.join()
+            self._writer = None
+
+        if self.trace is not None:
+            self.trace.close()
@@ -0,0 +1,160 @@
+import collections
+import time
+import cv2
+import numpy as np
+
+from landmarks import HANDEDNESS_UNKNOWN
+from traces import TraceReader
+
+# Sources stand in for cv2.VideoCapture(CAMERA_INDEX) in HandTracker. They
+# expose the same isOpened()/read()/release() trio, plus:
+#   finite     - the source ends (replay queues become lossless and the
+#                tracker shuts down by itself at the end)
+#   has_frames - read() returns images (False for landmark traces)
+#   timestamp  - capture time of the frame last read: the recorded timeline,
+#                shifted to start at the first read (perf_counter). Frame
+#                spacing is the recording's even when replaying faster than
+#                real time, so timestamp-driven stages (filters, gesture
+#                timing) behave the same on every run.
+
+
+class VideoFileSource:
+    """Replays a recorded video file as if it were the camera."""
+
+    finite = True
+    has_frames = True
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.period = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self.realtime = realtime # Pace reads at the file's frame rate
+        self.loop = loop
+        self._next_time = None
+        self.timestamp = None
+        self._base = None # perf_counter of the first frame
+        self._loop_offset = 0.0 # Seconds of the file already played (looping)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        if self.realtime:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            elif self._next_time > now:
+                time.sleep(self._next_time - now)
+            self._next_time += self.period
+
+        success, image = self.cap.read()
+        if not success and self.loop:
+            self._loop_offset = self.timestamp - self._base + self.period if self.timestamp is not None else 0.0
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, image = self.cap.read()
+        if not success:
+            # End of file: closing ends the capture stage
+            self.cap.release()
+            return success, image
+
+        if self._base is None:
+            self._base = time.perf_counter()
+        self.timestamp = self._base + self._loop_offset + self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        return success, image
+
+    def release(self):
+        self.cap.release()
+
+
+# What TraceSource.read() yields instead of an image: the landmarks and
+# handedness of every hand recorded in one frame
+TraceFrame = collections.namedtuple("TraceFrame", ["hands", "handedness"])
+
+
+class TraceSource:
+    """Replays a recorded landmark trace (see recorder.SessionRecorder).
+
+    Reads binary .trace files (see traces.py) through a memory map, so even
+    hours of recording open instantly, and the single-hand .npz traces of
+    older recordings. Each read() yields a TraceFrame instead of an image;
+    pair it with TraceDetector, which passes the hands through untouched, so
+    the tracker runs without MediaPipe or a camera.
+    """
+
+    finite = True
+    has_frames = False
+
+    def __init__(self, path, realtime=False):
+        self.reader = None
+        if path.endswith(".npz"):
+            with np.load(path) as data:
+                self.timestamps = data["timestamps"]
+                self.landmarks = data["landmarks"]
+                self.present = data["present"]
+        else:
+            self.reader = TraceReader(path)
+            self.timestamps = self.reader.records["timestamp"][self.reader.frame_starts[:-1]]
+        self.realtime = realtime # Pace reads by the recorded timestamps
+        self.index = 0
+        self._start = None
+        self.timestamp = None
+
+    def isOpened(self):
+        return self.index < len(self.timestamps)
+
+    def read(self):
+        if not self.isOpened():
+            return False, None
+        i = self.index
+        self.index += 1
+
+        if self._start is None:
+            self._start = time.perf_counter()
+        self.timestamp = self._start + float(self.timestamps[i] - self.timestamps[0])
+        if self.realtime:
+            delay = self.timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        return True, self.frame_at(i)
+
+    def frame_at(self, i):
+        if self.reader is None:
+            if not self.present[i]:
+                return TraceFrame((), ())
+            return TraceFrame((self.landmarks[i].copy(),), (HANDEDNESS_UNKNOWN,))
+
+        records = self.reader.frame(i)
+        records = records[records["hand_id"] >= 0] # Frames without hands have one empty record
+        return TraceFrame(
+            tuple(records["landmarks"].astype(np.float32)), # Writable copies
+            tuple(int(h) for h in records["handedness"])
+        )
+
+    def release(self):
+        self.index = len(self.timestamps)
+
+
+class TraceDetector:
+    """Detector for TraceSource: the 'frame' already holds the landmarks."""
+
+    def __init__(self):
+        self.handedness = []
+
+    def process(self, frame):
+        self.handedness = list(frame.handedness)
+        return list(frame.hands)
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_replay(path, realtime=False):
+    # (source, detector) for a recorded video or a .trace / .npz landmark
+    # trace; detector None means "use the normal MediaPipe detector".
+    if path.endswith((".trace", ".npz")):
+        return TraceSource(path, realtime), TraceDetector()
+    return VideoFileSource(path, realtime), None
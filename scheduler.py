@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+from config import (
+    MOTION_SIZE, MOTION_PIXEL_DELTA, MOTION_FRACTION,
+    MAX_REUSE_SECONDS, PROBE_INTERVAL
+)
+
+# Scheduler modes
+MODE_TRACKING = "tracking" # Hand in view: infer on motion
+MODE_PROBE = "probe" # No hand: low-rate presence checks (and on motion)
+MODE_IDLE = "idle" # Cursor off: low-rate presence checks only
+MODE_FULL = "full" # Calibrating: every frame
+
+
+class InferenceScheduler:
+    """Decides, frame by frame, whether MediaPipe has to run at all.
+
+    Each frame is shrunk to a tiny grey thumbnail and compared with the
+    thumbnail of the last frame that was inferred. If too few pixels changed
+    (nothing moved), the tracker reuses the last landmarks instead. Even
+    then, inference runs at least every `max_reuse` seconds while a hand is
+    tracked, and every `probe_interval` seconds when no hand is in view or
+    the cursor is switched off. Calibration always gets every frame.
+    """
+
+    def __init__(self, size=MOTION_SIZE, pixel_delta=MOTION_PIXEL_DELTA, motion_fraction=MOTION_FRACTION,
+                 max_reuse=MAX_REUSE_SECONDS, probe_interval=PROBE_INTERVAL):
+        self.size = size
+        self.pixel_delta = pixel_delta
+        self.min_changed = max(1, int(motion_fraction * size[0] * size[1]))
+        self.max_reuse = max_reuse
+        self.probe_interval = probe_interval
+
+        width, height = size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._grey = np.empty((height, width), dtype=np.uint8)
+        self._reference = np.empty((height, width), dtype=np.uint8) # Last inferred frame
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._has_reference = False
+        self.last_inference = None
+
+        self.mode = MODE_PROBE
+        self.inferred = 0
+        self.reused = 0
+
+    def should_infer(self, image, now, settings, hand_present):
+        cv2.resize(image, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._grey)
+
+        if settings.is_calibrating:
+            self.mode = MODE_FULL
+        elif not settings.cursor_active:
+            self.mode = MODE_IDLE
+        elif hand_present:
+            self.mode = MODE_TRACKING
+        else:
+            self.mode = MODE_PROBE
+
+        if self.mode == MODE_FULL or not self._has_reference:
+            infer = True
+        else:
+            age = now - self.last_inference
+            if self.mode == MODE_TRACKING:
+                infer = age >= self.max_reuse or self.moved()
+            elif self.mode == MODE_PROBE:
+                infer = age >= self.probe_interval or self.moved()
+            else:
+                infer = age >= self.probe_interval
+
+        if infer:
+            # This frame becomes the reference for the next comparisons
+            self._grey, self._reference = self._reference, self._grey
+            self._has_reference = True
+            self.last_inference = now
+            self.inferred += 1
+        else:
+            self.reused += 1
+        return infer
+
+    def moved(self):
+        cv2.absdiff(self._grey, self._reference, dst=self._diff)
+        return np.count_nonzero(self._diff > self.pixel_delta) >= self.min_changed
+
+    def reset(self):
+        self._has_reference = False
@@ -0,0 +1,460 @@
+import argparse
+import os
+import selectors
+import socket
+import threading
+import time
+import numpy as np
+
+from config import MAX_NUM_HANDS, STREAM_HEARTBEAT, STREAM_SEND_FRAMES, STREAM_SUBSCRIBER_TIMEOUT, STREAM_URL
+from gestures import GESTURE_CODES
+from landmarks import NUM_LANDMARKS
+
+# Landmark stream: one fixed-size message per published snapshot, the same
+# layout on every transport:
+#
+#   header  magic "HTRK", version u2, max_hands u1, count u1 (hands in this
+#           frame), sequence u4 (snapshot version), captured f8 and
+#           published f8 (perf_counter at capture / publish), fps f4,
+#           gesture i1 (primary hand, gestures.GESTURE_CODES; -1 = no hand),
+#           reserved (3 bytes)
+#   hands   max_hands slots of: hand_id i2, handedness i1
+#           (landmarks.HANDEDNESS_*), gesture i1, landmarks (21, 3) f4
+#           (normalised, selfie-mirrored as the app sees them); slots past
+#           `count` are zero
+#
+# All little-endian and unpadded (36 + 256 * max_hands bytes). perf_counter
+# is a system-wide clock on Linux and Windows, so a consumer on the same
+# machine can compare the timestamps with its own.
+#
+# Transports:
+#   udp://HOST:PORT  subscribers send SUBSCRIBE to the port (and again every
+#                    STREAM_HEARTBEAT seconds) and get every frame as one
+#                    datagram; UNSUBSCRIBE or silence ends the subscription
+#   unix:PATH        subscribers connect and read fixed-size frames
+
+STREAM_MAGIC = b"HTRK"
+STREAM_VERSION = 1
+SUBSCRIBE = b"HTRK+"
+UNSUBSCRIBE = b"HTRK-"
+NO_GESTURE = -1
+
+# Seconds the server loop sleeps at most between subscriber expiry checks
+STREAM_POLL = 0.5
+
+
+def hand_dtype():
+    return np.dtype([
+        ("hand_id", "<i2"),
+        ("handedness", "i1"),
+        ("gesture", "i1"),
+        ("landmarks", "<f4", (NUM_LANDMARKS, 3)),
+    ])
+
+
+def frame_dtype(max_hands=MAX_NUM_HANDS):
+    return np.dtype([
+        ("magic", "S4"),
+        ("version", "<u2"),
+        ("max_hands", "u1"),
+        ("count", "u1"),
+        ("sequence", "<u4"),
+        ("captured", "<f8"),
+        ("published", "<f8"),
+        ("fps", "<f4"),
+        ("gesture", "i1"),
+        ("reserved", "u1", (3,)),
+        ("hands", hand_dtype(), (max_hands,)),
+    ])
+
+
+HEADER_SIZE = frame_dtype(0).itemsize
+
+
+def parse_frame(data):
+    # One received message as a numpy record (fields as in frame_dtype)
+    if len(data) < HEADER_SIZE or bytes(data[:4]) != STREAM_MAGIC:
+        raise ValueError("Not a landmark stream frame")
+    return np.frombuffer(data, dtype=frame_dtype(data[6]), count=1)[0]
+
+
+def parse_url(url):
+    # ("udp", (host, port)) or ("unix", path)
+    if url.startswith("udp://"):
+        host, _, port = url[len("udp://"):].rpartition(":")
+        return "udp", (host or "127.0.0.1", int(port))
+    if url.startswith("unix:"):
+        return "unix", url[len("unix:"):]
+    raise ValueError(f"Unsupported stream URL {url!r} (use udp://HOST:PORT or unix:PATH)")
+
+
+class FramePacker:
+    """Serialises snapshots into stream frames, reusing one record."""
+
+    def __init__(self, max_hands=MAX_NUM_HANDS):
+        self.max_hands = max_hands
+        self.frame = np.zeros((), dtype=frame_dtype(max_hands))
+        self.frame["magic"] = STREAM_MAGIC
+        self.frame["version"] = STREAM_VERSION
+        self.frame["max_hands"] = max_hands
+
+    def pack(self, snapshot):
+        frame = self.frame
+        hands = snapshot.hands[:self.max_hands]
+        frame["count"] = len(hands)
+        frame["sequence"] = snapshot.version & 0xFFFFFFFF
+        frame["captured"] = snapshot.captured
+        frame["published"] = snapshot.timestamp
+        frame["fps"] = snapshot.fps
+        frame["gesture"] = GESTURE_CODES.get(snapshot.gesture, NO_GESTURE)
+        slots = frame["hands"]
+        slots[len(hands):] = 0
+        for slot, hand in zip(slots, hands):
+            slot["hand_id"] = hand.hand_id
+            slot["handedness"] = hand.handedness
+            slot["gesture"] = GESTURE_CODES.get(hand.gesture, NO_GESTURE)
+            slot["landmarks"] = hand.landmarks
+        return frame.tobytes()
+
+
+class _StreamSubscriber:
+    """A connected stream socket, sent to without ever blocking.
+
+    At most one frame is in flight: if the socket cannot take a whole frame,
+    the rest waits for it to become writable and newer frames replace each
+    other in `latest` meanwhile (counted as dropped), so a slow consumer
+    gets fewer but current frames instead of a growing backlog.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.pending = None # Rest of the frame in flight
+        self.latest = None # Newest frame waiting behind it
+        self.stalled_since = None
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, payload, now):
+        if self.pending is not None:
+            if self.latest is not None:
+                self.dropped += 1
+            self.latest = payload
+            return
+        self._write(memoryview(payload), now)
+
+    def flush(self, now):
+        # Socket writable again: finish the frame in flight, then the newest
+        self._write(self.pending, now)
+        if self.pending is None and self.latest is not None:
+            payload, self.latest = self.latest, None
+            self._write(memoryview(payload), now)
+
+    def _write(self, view, now):
+        try:
+            sent = self.sock.send(view)
+        except BlockingIOError:
+            sent = 0
+        if sent == len(view):
+            self.pending = None
+            self.stalled_since = None
+            self.sent += 1
+        else:
+            self.pending = view[sent:]
+            if self.stalled_since is None:
+                self.stalled_since = now
+
+
+class LandmarkServer(threading.Thread):
+    """Publishes every tracking snapshot to local subscribers.
+
+    A frame hook hands each new snapshot to this thread, which serialises it
+    once (FramePacker) and sends the same bytes to every subscriber with
+    non-blocking sockets, so neither the tracker nor other subscribers ever
+    wait for a slow one: UDP frames that do not fit are dropped, stream
+    subscribers get latest-wins delivery (see _StreamSubscriber). A stream
+    subscriber stalled for `timeout` seconds is disconnected; a UDP
+    subscriber that has not renewed within `timeout` is forgotten.
+    """
+
+    def __init__(self, shared_state, urls=(STREAM_URL,), max_hands=MAX_NUM_HANDS,
+                 timeout=STREAM_SUBSCRIBER_TIMEOUT, send_frames=STREAM_SEND_FRAMES):
+        super().__init__(name="landmark-server", daemon=True)
+        self.state = shared_state
+        self.timeout = timeout
+        self.packer = FramePacker(max_hands)
+        self.frame_size = self.packer.frame.itemsize
+        self.send_frames = send_frames
+        self.running = True
+
+        self.selector = selectors.DefaultSelector()
+        self.udp_subscribers = {} # (sock, address) -> last renewal
+        self.streams = {} # sock -> _StreamSubscriber
+        self.listeners = []
+        self.unix_paths = []
+        self.sent = 0
+        self.dropped = 0
+
+        # Newest snapshot from the frame hook, handed over under a lock; the
+        # wake-up socket pair lets the hook interrupt select()
+        self._latest = None
+        self._latest_lock = threading.Lock()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        for sock in (self._wake_recv, self._wake_send):
+            sock.setblocking(False)
+        self.selector.register(self._wake_recv, selectors.EVENT_READ, self._on_wake)
+
+        for url in urls:
+            self.listen(url)
+
+    def listen(self, url):
+        kind, address = parse_url(url)
+        if kind == "udp":
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(address)
+            callback = self._on_datagram
+        else:
+            if not hasattr(socket, "AF_UNIX"):
+                raise ValueError("Unix sockets are not supported on this platform")
+            if os.path.exists(address):
+                os.unlink(address) # Left over from a previous run
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(address)
+            sock.listen()
+            self.unix_paths.append(address)
+            callback = self._on_accept
+        sock.setblocking(False)
+        self.selector.register(sock, selectors.EVENT_READ, callback)
+        self.listeners.append(sock)
+        print(f"Streaming landmarks on {url}")
+
+    def run(self):
+        self.state.add_frame_hook(self.on_frame)
+        try:
+            while self.running:
+                for key, events in self.selector.select(timeout=STREAM_POLL):
+                    key.data(key.fileobj, events)
+                self.expire(time.perf_counter())
+        finally:
+            self.state.remove_frame_hook(self.on_frame)
+            self.close_sockets()
+
+    def on_frame(self, snapshot):
+        # Frame hook (tracker thread): keep only the newest, wake the loop
+        with self._latest_lock:
+            self._latest = snapshot
+        try:
+            self._wake_send.send(b"\0")
+        except OSError:
+            pass # Buffer full: a wake-up is pending anyway
+
+    def _on_wake(self, sock, events):
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        # Take and clear it in one step: a snapshot the hook sets in between
+        # would otherwise be cleared without being sent
+        with self._latest_lock:
+            snapshot, self._latest = self._latest, None
+        if snapshot is not None:
+            self.broadcast(self.packer.pack(snapshot))
+
+    def broadcast(self, payload):
+        now = time.perf_counter()
+        for sock, address in list(self.udp_subscribers):
+            try:
+                sock.sendto(payload, address)
+                self.sent += 1
+            except (BlockingIOError, ConnectionRefusedError):
+                self.dropped += 1
+            except OSError:
+                del self.udp_subscribers[(sock, address)]
+        for subscriber in list(self.streams.values()):
+            was_pending = subscriber.pending is not None
+            try:
+                subscriber.send(payload, now)
+            except OSError:
+                self.disconnect(subscriber.sock)
+                continue
+            if subscriber.pending is not None and not was_pending:
+                self.selector.modify(subscriber.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, self._on_stream)
+
+    # --- Subscribers ---
+
+    def _on_datagram(self, sock, events):
+        while True:
+            try:
+                message, address = sock.recvfrom(64)
+            except BlockingIOError:
+                return
+            except OSError:
+                continue # ICMP error from an earlier send; keep reading
+            key = (sock, address)
+            if message.startswith(SUBSCRIBE):
+                if key not in self.udp_subscribers:
+                    print(f"Stream subscriber {address[0]}:{address[1]} joined")
+                self.udp_subscribers[key] = time.perf_counter()
+            elif message.startswith(UNSUBSCRIBE):
+                self.udp_subscribers.pop(key, None)
+
+    def _on_accept(self, sock, events):
+        try:
+            conn, _ = sock.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        # A small send buffer keeps a slow consumer's backlog (and latency)
+        # to a few frames (the kernel may round it up); anything older is
+        # replaced instead of queued
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.frame_size * self.send_frames)
+        self.streams[conn] = _StreamSubscriber(conn)
+        self.selector.register(conn, selectors.EVENT_READ, self._on_stream)
+
+    def _on_stream(self, sock, events):
+        subscriber = self.streams.get(sock)
+        if subscriber is None:
+            return
+        if events & selectors.EVENT_READ:
+            try:
+                if not sock.recv(4096):
+                    self.disconnect(sock) # Subscriber closed the connection
+                    return
+            except BlockingIOError:
+                pass
+            except OSError:
+                self.disconnect(sock)
+                return
+        if events & selectors.EVENT_WRITE and subscriber.pending is not None:
+            try:
+                subscriber.flush(time.perf_counter())
+            except OSError:
+                self.disconnect(sock)
+                return
+            if subscriber.pending is None:
+                self.selector.modify(sock, selectors.EVENT_READ, self._on_stream)
+
+    def expire(self, now):
+        for key, renewed in list(self.udp_subscribers.items()):
+            if now - renewed > self.timeout:
+                del self.udp_subscribers[key]
+        for sock, subscriber in list(self.streams.items()):
+            if subscriber.stalled_since is not None and now - subscriber.stalled_since > self.timeout:
+                print("Disconnecting stalled stream subscriber")
+                self.disconnect(sock)
+
+    def disconnect(self, sock):
+        subscriber = self.streams.pop(sock, None)
+        if subscriber is None:
+            return
+        self.sent += subscriber.sent
+        self.dropped += subscriber.dropped
+        self.selector.unregister(sock)
+        sock.close()
+
+    def stats(self):
+        return {
+            "subscribers": len(self.udp_subscribers) + len(self.streams),
+            "sent": self.sent + sum(s.sent for s in self.streams.values()),
+            "dropped": self.dropped + sum(s.dropped for s in self.streams.values()),
+        }
+
+    def stop(self):
+        self.running = False
+        try:
+            self._wake_send.send(b"\0")
+        except OSError:
+            pass
+
+    def close_sockets(self):
+        for sock in list(self.streams):
+            self.disconnect(sock)
+        for sock in self.listeners + [self._wake_recv, self._wake_send]:
+            sock.close()
+        for path in self.unix_paths:
+            if os.path.exists(path):
+                os.unlink(path)
+        self.selector.close()
+
+
+class StreamClient:
+    """Minimal subscriber, for consumers written in Python and for testing:
+    receive() returns the next frame as a numpy record (see frame_dtype),
+    or None on timeout."""
+
+    def __init__(self, url=STREAM_URL, heartbeat=STREAM_HEARTBEAT):
+        self.kind, self.address = parse_url(url)
+        self.heartbeat = heartbeat
+        if self.kind == "udp":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Like the server's stream sockets: queue a few frames, not seconds of them
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, frame_dtype().itemsize * STREAM_SEND_FRAMES)
+            self.sock.connect(self.address)
+            self._subscribe()
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.address)
+
+    def _subscribe(self):
+        self.sock.send(SUBSCRIBE)
+        self.renewed = time.perf_counter()
+
+    def receive(self, timeout=1.0):
+        self.sock.settimeout(timeout)
+        try:
+            if self.kind == "udp":
+                if time.perf_counter() - self.renewed > self.heartbeat:
+                    self._subscribe()
+                return parse_frame(self.sock.recv(65536))
+            header = self._read(HEADER_SIZE)
+            if header is None:
+                return None
+            body = self._read(frame_dtype(header[6]).itemsize - HEADER_SIZE)
+            return None if body is None else parse_frame(header + body)
+        except (socket.timeout, ConnectionRefusedError):
+            return None
+
+    def _read(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Stream closed by the server")
+            data += chunk
+        return data
+
+    def close(self):
+        if self.kind == "udp":
+            try:
+                self.sock.send(UNSUBSCRIBE)
+            except OSError:
+                pass
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the rate and latency of a landmark stream.")
+    parser.add_argument("url", nargs="?", default=STREAM_URL, help="udp://HOST:PORT or unix:PATH")
+    args = parser.parse_args()
+
+    client = StreamClient(args.url)
+    frames, latency, started = 0, 0.0, time.perf_counter()
+    try:
+        while True:
+            frame = client.receive()
+            if frame is not None:
+                frames += 1
+                latency += time.perf_counter() - float(frame["captured"])
+            elapsed = time.perf_counter() - started
+            if elapsed >= 1.0:
+                mean = latency / frames * 1000.0 if frames else 0.0
+                print(f"{frames / elapsed:5.1f} frames/s, {mean:5.1f} ms capture-to-client")
+                frames, latency, started = 0, 0.0, time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+
+from landmarks import HANDEDNESS_UNKNOWN, NUM_LANDMARKS
+
+# How long LandmarkBlock.read() waits for a write in progress (or a writer
+# that died holding the lock) before giving up
+READ_TIMEOUT = 0.1
+
+
+def landmark_block_dtype(max_hands):
+    return np.dtype([
+        ("sequence", np.uint64), # Writes so far
+        ("timestamp", np.float64), # perf_counter() at capture (system-wide clock)
+        ("count", np.int32), # Hands in this frame
+        ("landmarks", np.float32, (max_hands, NUM_LANDMARKS, 3)),
+        ("handedness", np.int8, (max_hands,)), # landmarks.HANDEDNESS_* per hand
+    ])
+
+
+def _attach(name, size):
+    # Attach to an existing block without registering it with this process's
+    # resource tracker (which would unlink it when the worker exits).
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=size)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+class LandmarkBlock:
+    """The newest landmarks of one producer process, in shared memory.
+
+    Fixed size: up to `max_hands` (21, 3) float32 arrays with their
+    handedness, plus a timestamp and a count of the writes so far.
+    The writer and the readers copy in and out under a multiprocessing
+    lock, held only for the copy. Plain stores to shared memory carry no
+    ordering guarantee between processes (a seqlock without fences can
+    show a torn block on ARM); the lock's semaphore is a full barrier on
+    every platform. No pickling is involved.
+
+    The process that creates the block (name=None) owns it, along with the
+    lock, and unlinks it on close(); others attach by `name` and `lock`.
+    """
+
+    def __init__(self, max_hands, name=None, lock=None):
+        self.max_hands = max_hands
+        self.dtype = landmark_block_dtype(max_hands)
+        self.owner = name is None
+        if lock is None:
+            if not self.owner:
+                raise ValueError("Attaching to a LandmarkBlock needs the owner's lock")
+            # Spawn context: the lock can be handed to spawned workers
+            lock = multiprocessing.get_context("spawn").Lock()
+        self.lock = lock
+        self.shm = _attach(name, self.dtype.itemsize)
+        self.block = np.ndarray((), dtype=self.dtype, buffer=self.shm.buf)
+        if self.owner:
+            self.block[()] = np.zeros((), dtype=self.dtype)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, timestamp, hands, handedness=None):
+        block = self.block
+        count = min(len(hands), self.max_hands)
+        with self.lock:
+            for i in range(count):
+                block["landmarks"][i] = hands[i]
+                block["handedness"][i] = handedness[i] if handedness is not None and i < len(handedness) else HANDEDNESS_UNKNOWN
+            block["count"] = count
+            block["timestamp"] = timestamp
+            block["sequence"] += 1
+
+    def read(self, timeout=READ_TIMEOUT):
+        # (sequence, timestamp, [landmarks, ...], [handedness, ...]) of the
+        # last write, or None if the lock stayed taken for `timeout` seconds
+        block = self.block
+        if not self.lock.acquire(timeout=timeout):
+            return None
+        try:
+            sequence = int(block["sequence"])
+            count = int(block["count"])
+            timestamp = float(block["timestamp"])
+            landmarks = block["landmarks"][:count].copy()
+            handedness = block["handedness"][:count].tolist()
+        finally:
+            self.lock.release()
+        return sequence, timestamp, list(landmarks), handedness
+
+    def close(self):
+        self.block = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedFrameRing:
+    """Fixed-shape uint8 frames in shared memory, for handing camera frames
+    to another process without pickling them.
+
+    The producer writes slot after slot (wrapping around); the consumer is
+    told which slot to read. With at least two slots the producer can fill
+    the next frame while the previous one is still being read. The creator
+    (name=None) owns the memory and unlinks it on close().
+    """
+
+    def __init__(self, shape, slots=2, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = name is None
+        size = int(np.prod(self.shape)) * slots
+        self.shm = _attach(name, size)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.next_slot = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, image):
+        # Copy `image` into the next slot and return the slot index
+        slot = self.next_slot
+        np.copyto(self.frames[slot], image)
+        self.next_slot = (slot + 1) % self.slots
+        return slot
+
+    def view(self, slot):
+        return self.frames[slot]
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
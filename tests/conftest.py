@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The modules live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landmarks import (
+    WRIST, THUMB_TIP, INDEX_FINGER_MCP, INDEX_FINGER_TIP, MIDDLE_FINGER_MCP, MIDDLE_FINGER_TIP,
+    RING_FINGER_TIP, PINKY_MCP, PINKY_TIP
+)
+from traces import TraceWriter
+
+# Recorded traces: 30 fps, starting at an arbitrary perf_counter() value
+TRACE_FPS = 30.0
+TRACE_START = 1000.0
+
+
+def make_hand(distance, shift=0.0):
+    # (21, 3) landmarks with a hand scale of 0.1, the index fingertip
+    # `distance` hand scales from the thumb tip and every other fingertip
+    # far from it, moved right by `shift`
+    landmarks = np.full((21, 3), 0.5, dtype=np.float32)
+    landmarks[WRIST, :2] = (0.5, 0.7)
+    landmarks[MIDDLE_FINGER_MCP, :2] = (0.5, 0.6)
+    landmarks[INDEX_FINGER_MCP, :2] = (0.45, 0.6)
+    landmarks[PINKY_MCP, :2] = (0.58, 0.62)
+    landmarks[THUMB_TIP, :2] = (0.5, 0.5)
+    landmarks[INDEX_FINGER_TIP, :2] = (0.5 + distance * 0.1, 0.5)
+    landmarks[MIDDLE_FINGER_TIP, :2] = (0.5, 0.3)
+    landmarks[RING_FINGER_TIP, :2] = (0.3, 0.5)
+    landmarks[PINKY_TIP, :2] = (0.7, 0.7)
+    landmarks[:, 0] += shift
+    return landmarks
+
+
+@pytest.fixture
+def hand():
+    return make_hand
+
+
+@pytest.fixture
+def record_trace(tmp_path):
+    # Writes one hand per frame, its thumb-index distance and sideways
+    # shift given per frame, and returns the trace's path
+    def record(distances, shifts=None, name="session.trace"):
+        path = str(tmp_path / name)
+        writer = TraceWriter(path)
+        for i, distance in enumerate(distances):
+            shift = shifts[i] if shifts is not None else 0.0
+            writer.write(TRACE_START + i / TRACE_FPS, i, [make_hand(distance, shift)], [1], [-1])
+        writer.close()
+        return path
+    return record
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from actuation import CursorActuator
+from mouse import NullMouse
+
+
+def test_estimate_needs_a_sample():
+    cursor = CursorActuator(NullMouse())
+    assert cursor.estimate(1.0) is None
+    cursor.push(100.0, 50.0, 1.0)
+    assert cursor.estimate(5.0) == (100.0, 50.0)
+
+
+def test_estimate_interpolates_behind_the_newest_sample():
+    # Half a frame interval behind, on top of 30 ms of pipeline latency
+    cursor = CursorActuator(NullMouse(), delay=0.5)
+    cursor.push(100.0, 100.0, 1.0)
+    cursor.push(200.0, 300.0, 1.1)
+    cursor.latency = 0.03
+    assert cursor.estimate(1.13) == pytest.approx((150.0, 200.0))
+    assert cursor.estimate(0.0) == pytest.approx((100.0, 100.0)) # Never before the older sample
+
+
+def test_push_tracks_the_pipeline_latency():
+    cursor = CursorActuator(NullMouse())
+    now = time.perf_counter()
+    cursor.push(100.0, 100.0, now - 0.05)
+    assert cursor.latency == pytest.approx(0.05, abs=0.01)
+    cursor.push(100.0, 100.0, time.perf_counter() - 0.15)
+    assert 0.05 < cursor.latency < 0.15 # Smoothed
+
+
+def test_estimate_extrapolates_a_bounded_distance():
+    cursor = CursorActuator(NullMouse(), delay=0.0, max_extrapolation=0.05)
+    cursor.push(100.0, 100.0, 1.0)
+    cursor.push(200.0, 100.0, 1.1)
+    cursor.latency = 0.0
+    assert cursor.estimate(1.12) == pytest.approx((220.0, 100.0))
+    assert cursor.estimate(2.0) == pytest.approx((250.0, 100.0))
+
+
+def test_deactivate_forgets_the_samples():
+    cursor = CursorActuator(NullMouse())
+    cursor.push(100.0, 100.0, 1.0)
+    assert cursor.active
+    cursor.deactivate()
+    assert not cursor.active
+    assert cursor.estimate(1.0) is None
+
+
+def test_move_skips_unchanged_pixels():
+    cursor = CursorActuator(NullMouse())
+    cursor.move(10.2, 20.4)
+    cursor.move(9.8, 19.6) # Rounds to the same pixel
+    cursor.move(11.0, 20.0)
+    assert (cursor.moves, cursor.coalesced) == (2, 1)
+    assert cursor.mouse.position == (11, 20)
+
+
+def test_move_clamps_to_the_screen():
+    cursor = CursorActuator(NullMouse(width=800, height=600))
+    cursor.move(-50.0, 900.0)
+    assert cursor.mouse.position == (0, 599)
@@ -0,0 +1,97 @@
+import queue
+import threading
+
+import numpy as np
+
+import batch
+from batch import BatchLabeller, read_batches
+from config import SharedState
+from gestures import GESTURE_NAMES
+from shm import SharedFrameRing
+
+OPEN = 2.0 # Thumb-index distance of an open hand, in hand scales
+PINCHED = 0.1
+
+
+class FakeCapture:
+    # Just enough of cv2.VideoCapture for read_batches
+    def __init__(self, frames, fps=30.0):
+        self.frames = frames
+        self.fps = fps
+        self.index = 0
+
+    def read(self):
+        if self.index >= self.frames:
+            return False, None
+        self.index += 1
+        return True, np.full((4, 4, 3), self.index, dtype=np.uint8)
+
+    def get(self, prop):
+        return 1000.0 * (self.index - 1) / self.fps
+
+
+class FakeDetector:
+    # Reports each frame's first pixel; counts graph restarts
+    def __init__(self):
+        self.restarts = 0
+
+    def reset(self, graph=False):
+        self.restarts += graph
+
+    def process(self, image):
+        return int(image[0, 0, 0])
+
+
+def test_read_batches_splits_the_video_in_order():
+    batches = queue.Queue()
+    read_batches(FakeCapture(10), batches, 4, threading.Event())
+
+    items = []
+    while (item := batches.get()) is not None:
+        items.append(item)
+    assert [(index, len(frames)) for index, _, frames in items] == [(0, 4), (4, 4), (8, 2)]
+    assert items[1][1][0] == 4 / 30.0
+    assert int(items[2][2][-1][0, 0, 0]) == 10
+
+
+def test_workers_read_frames_from_the_ring_and_restart_only_between_gaps(monkeypatch):
+    detector = FakeDetector()
+    monkeypatch.setattr(batch, "_detector", detector)
+    monkeypatch.setattr(batch, "_ring", None)
+    monkeypatch.setattr(batch, "_next_frame", None)
+    ring = SharedFrameRing((4, 4, 3), slots=8)
+    try:
+        def submit(index, count):
+            slots = [ring.write(np.full((4, 4, 3), index + i, dtype=np.uint8)) for i in range(count)]
+            return batch._process_batch(ring.name, ring.shape, ring.slots, slots, index)
+
+        assert submit(0, 4) == [0, 1, 2, 3]
+        assert submit(4, 4) == [4, 5, 6, 7] # Carries on: same tracking state
+        assert detector.restarts == 1
+        assert submit(12, 4) == [12, 13, 14, 15] # Wrapped around the ring
+        assert detector.restarts == 2
+    finally:
+        batch._ring.close()
+        ring.close()
+
+
+def test_labeller_writes_columnar_arrays(hand, tmp_path):
+    labeller = BatchLabeller(SharedState(), max_num_hands=2)
+    distances = [OPEN] * 5 + [PINCHED] * 10 + [OPEN] * 5
+    for i, distance in enumerate(distances):
+        labeller.add(i / 30.0, [hand(distance)])
+    labeller.add(20 / 30.0, [])
+
+    path = str(tmp_path / "labels.npz")
+    labeller.save(path)
+    with np.load(path) as data:
+        assert data["timestamps"].shape == (21,)
+        assert data["hand_ids"].shape == (21, 2)
+        assert data["landmarks"].shape == (21, 2, 21, 3)
+        assert (data["hand_ids"][:20, 0] == 1).all() and (data["hand_ids"][:, 1] == -1).all()
+        assert np.isnan(data["landmarks"][20]).all()
+        assert list(data["event_kind"]) == ["press", "release"]
+        assert list(data["event_button"]) == ["left", "left"]
+        names = list(data["gesture_names"])
+        assert names == list(GESTURE_NAMES)
+        assert names[data["gestures"][10, 0]] != names[data["gestures"][0, 0]]
@@ -0,0 +1,18 @@
+from benchmark import run_benchmark
+
+OPEN = 2.0 # Thumb-index distance of an open hand, in hand scales
+PINCHED = 0.1
+
+
+def test_benchmark_replays_every_frame_of_a_trace(record_trace):
+    # Five slow pinches over ten seconds of recording
+    distances = [PINCHED if i % 60 >= 20 and i % 60 < 40 else OPEN for i in range(300)]
+    report = run_benchmark(record_trace(distances))
+
+    assert report["frames"] == 300
+    assert report["dropped_frames"] == 0
+    assert not report["realtime"]
+    assert report["gestures"]["presses"] == 5
+    assert report["gestures"]["releases"] == 5
+    assert report["cursor_moves"] > 0
+    assert "frame_latency" in report["stages"]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from calibration import (
+    PROMPT_SECONDS, RESULT_SECONDS, CalibrationWizard, RangeStep, RunningStats, StabilityStep
+)
+from config import SharedState
+
+FPS = 30.0
+
+
+def test_running_stats_match_numpy():
+    values = np.random.default_rng(0).normal(0.5, 0.1, 200)
+    stats = RunningStats()
+    for value in values:
+        stats.add(float(value))
+
+    assert stats.count == 200
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(values.std(ddof=1))
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_frame_hooks_see_every_published_snapshot():
+    state = SharedState()
+    seen = []
+    state.add_frame_hook(seen.append)
+    first = state.publish(fps=1.0)
+    state.remove_frame_hook(seen.append)
+    state.publish(fps=2.0)
+    assert seen == [first]
+
+
+def run_wizard(hand_at, seconds=60.0, on_complete=None):
+    # Feeds the wizard one snapshot per frame, `hand_at(t)` giving the
+    # landmarks `t` seconds in; returns the state, the step messages seen and
+    # when it finished
+    state = SharedState()
+    wizard = CalibrationWizard(state, dashboard=None, on_complete=on_complete)
+    wizard.start()
+    messages = []
+    for i in range(int(seconds * FPS)):
+        t = i / FPS
+        wizard.on_frame(state.snapshot()._replace(timestamp=100.0 + t, landmarks=hand_at(t)))
+        message = state.settings.calibration_message
+        if message and (not messages or messages[-1] != message):
+            messages.append(message)
+        if not wizard.running:
+            return state, messages, t
+    return state, messages, None
+
+
+def test_range_step_finishes_once_the_extremes_hold(hand):
+    # Sweep 0.2 -> 0.8 in one second, then rest at the right edge
+    step = RangeStep()
+    for i in range(60):
+        t = i / FPS
+        step.add(hand(2.0, shift=min(t, 1.0) * 0.6 - 0.3), t)
+    assert not step.converged(1.5)
+    assert step.converged(2.0)
+
+
+def test_wizard_runs_every_step_and_finishes(hand):
+    completed = []
+    state, messages, finished = run_wizard(lambda t: hand(2.0), on_complete=completed.append)
+
+    assert finished is not None
+    assert [m.split("!")[0] for m in messages if "Set!" in m] == (
+        ["Range Set"] + ["Corner Set"] * 4 + ["Pinch Set", "Stability Set"]
+    )
+    assert messages[-1] == "Calibration Complete!"
+    # Seven prompts and results plus the collection time
+    assert finished >= 7 * (PROMPT_SECONDS + RESULT_SECONDS)
+    assert len(state.settings.mapping_points) == 4
+    assert not state.settings.is_calibrating
+    assert state.settings.calibration_step == 0
+    assert completed == [state.settings]
+
+
+def test_wizard_fails_steps_without_a_hand():
+    _, messages, finished = run_wizard(lambda t: None)
+    assert finished is not None
+    assert "Step 1 Failed: No hand detected" in messages
+
+
+def test_stability_step_accepts_exactly_min_samples(hand):
+    state = SharedState()
+    step = StabilityStep()
+    for i in range(step.min_samples):
+        step.add(hand(2.0, shift=0.001 * (i % 2)), i / FPS)
+    assert step.apply(state).startswith("Stability Set!")
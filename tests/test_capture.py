@@ -0,0 +1,104 @@
+import threading
+
+import cv2
+import numpy as np
+
+import capture
+from capture import CameraSource, fourcc_name
+
+
+class FlakyCapture:
+    # Stands in for cv2.VideoCapture: `frames` good grabs, then failures
+    opened = []
+
+    def __init__(self, *args, frames=2):
+        self.frames = frames
+        self.released = False
+        FlakyCapture.opened.append(self)
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        assert not self.released
+        self.frames -= 1
+        return self.frames >= 0
+
+    def retrieve(self):
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+def test_fourcc_name():
+    assert fourcc_name(cv2.VideoWriter_fourcc(*"MJPG")) == "MJPG"
+
+
+def test_video_file_source_reads_with_grab_timestamps(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    source = CameraSource(path)
+    assert source.open() and source.isOpened()
+    success, image = source.read()
+    assert success and image.shape == (48, 64, 3)
+    assert source.timestamp is not None
+    source.release()
+    assert not source.isOpened()
+
+
+def test_reconnects_after_repeated_failures(monkeypatch):
+    FlakyCapture.opened = []
+    monkeypatch.setattr(capture.cv2, "VideoCapture", FlakyCapture)
+    monkeypatch.setattr(capture, "CAMERA_RETRY_DELAY", 0.0)
+    source = CameraSource("fake", max_failures=3)
+    assert source.open()
+
+    results = [source.read()[0] for _ in range(5)]
+    assert results == [True, True, False, False, False]
+    assert FlakyCapture.opened[0].released and source.cap is None
+    assert source.isOpened() # The pipeline keeps waiting
+
+    assert source.read()[0] # Reopened straight away, then backs off
+    assert source.reconnects == 1 and len(FlakyCapture.opened) == 2
+
+
+class SlowCapture(FlakyCapture):
+    # A grab that blocks until the test lets it finish
+    def __init__(self, *args):
+        super().__init__(*args, frames=10)
+        self.grabbing = threading.Event()
+        self.finish = threading.Event()
+
+    def grab(self):
+        self.grabbing.set()
+        self.finish.wait(timeout=5.0)
+        return super().grab()
+
+
+def test_release_waits_for_a_read_in_progress(monkeypatch):
+    FlakyCapture.opened = []
+    monkeypatch.setattr(capture.cv2, "VideoCapture", SlowCapture)
+    source = CameraSource("fake")
+    assert source.open()
+    cap = source.cap
+
+    results = []
+    reader = threading.Thread(target=lambda: results.append(source.read()[0]))
+    reader.start()
+    assert cap.grabbing.wait(timeout=5.0)
+    releaser = threading.Thread(target=source.release)
+    releaser.start()
+    releaser.join(timeout=0.1)
+    assert releaser.is_alive() and not cap.released # Still grabbing
+
+    cap.finish.set()
+    reader.join(timeout=5.0)
+    releaser.join(timeout=5.0)
+    assert results == [True] and cap.released
+    assert source.read() == (False, None) # No reconnect once released
+    assert len(FlakyCapture.opened) == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from config import ROI_MIN_FRACTION
+from detector import AdaptiveInputController, HandDetector
+
+LEVELS = ((640, 256, 1), (480, 224, 1), (320, 192, 0))
+
+
+# --- Adaptive Input Size ---
+
+def test_controller_steps_down_after_patience_frames_over_budget():
+    controller = AdaptiveInputController(levels=LEVELS, budget_ms=10.0, patience=3, alpha=1.0)
+    assert [controller.update(0.02) for _ in range(3)] == [False, False, True]
+    assert controller.level == LEVELS[1]
+
+    # Measuring starts over at the new level
+    assert controller.avg_time is None
+    assert [controller.update(0.02) for _ in range(3)] == [False, False, True]
+    assert controller.level == LEVELS[2]
+    assert not any(controller.update(0.02) for _ in range(10)) # Cheapest already
+
+
+def test_controller_steps_back_up_when_comfortably_under_budget():
+    controller = AdaptiveInputController(levels=LEVELS, budget_ms=10.0, patience=2, alpha=1.0)
+    controller.index = 2
+    assert [controller.update(0.004) for _ in range(2)] == [False, True]
+    assert controller.level == LEVELS[1]
+
+
+def test_controller_holds_its_level_inside_the_band():
+    controller = AdaptiveInputController(levels=LEVELS, budget_ms=10.0, patience=2, alpha=1.0)
+    controller.index = 1
+    assert not any(controller.update(0.008) for _ in range(20))
+    assert controller.level == LEVELS[1]
+
+
+# --- Region Of Interest ---
+
+def hand_at(xs, ys):
+    return np.array([(x, y, 0.0) for x, y in zip(xs, ys)], dtype=np.float32)
+
+
+@pytest.fixture
+def detector():
+    pytest.importorskip("mediapipe") # MediaPipe is only loaded with the detector
+    detector = HandDetector()
+    yield detector
+    detector.close()
+
+
+def test_roi_is_a_padded_square_around_the_hand(detector):
+    hand = hand_at([0.4, 0.5, 0.45], [0.4, 0.6, 0.5])
+    x0, y0, x1, y1 = detector._roi_for(hand, 640, 480)
+
+    assert x1 - x0 == pytest.approx(y1 - y0, abs=1)
+    assert (x0 + x1) / 2 == pytest.approx(0.45 * 640, abs=1)
+    assert (y0 + y1) / 2 == pytest.approx(0.5 * 480, abs=1)
+    assert y1 - y0 > 0.2 * 480 # Padded beyond the landmarks
+
+
+def test_roi_has_a_minimum_size(detector):
+    hand = hand_at([0.5, 0.501], [0.5, 0.501])
+    x0, y0, x1, y1 = detector._roi_for(hand, 640, 480)
+    assert x1 - x0 == pytest.approx(ROI_MIN_FRACTION * 480, abs=1)
+
+
+def test_roi_at_the_edge_stays_square_inside_the_frame(detector):
+    hand = hand_at([0.97, 0.99, 0.98], [0.02, 0.1, 0.05])
+    x0, y0, x1, y1 = detector._roi_for(hand, 640, 480)
+
+    assert x1 - x0 == y1 - y0
+    assert 0 <= x0 and x1 <= 640 and 0 <= y0 and y1 <= 480
+    assert x1 == 640 and y0 == 0 # Shifted back in, not clipped
+
+
+def test_reset_restarts_the_graph_only_when_asked(detector, monkeypatch):
+    hands = detector.hands
+    restarts = []
+    monkeypatch.setattr(hands, "reset", lambda: restarts.append(True), raising=False)
+    detector.reset()
+    assert detector.hands is hands and detector.roi is None and restarts == []
+    detector.reset(graph=True)
+    assert detector.hands is hands and restarts == [True] # Same graph, new run
@@ -0,0 +1,21 @@
+import display
+
+
+def test_refresh_rate_falls_back_to_the_default(monkeypatch):
+    def fail():
+        raise OSError("no display")
+    monkeypatch.setattr(display, "_xrandr_refresh_rate", fail)
+    monkeypatch.setattr(display, "_windows_refresh_rate", fail)
+    assert display.refresh_rate(default=60) == 60
+
+
+def test_xrandr_current_mode(monkeypatch):
+    output = "HDMI-1 connected 1920x1080+0+0\n   1920x1080     60.00 +  143.98*\n   1280x720      59.94\n"
+    monkeypatch.setattr(display.subprocess, "run", lambda *a, **kw: type("Result", (), {"stdout": output})())
+    assert display._xrandr_refresh_rate() == 144
+
+
+def test_xrandr_screen_size(monkeypatch):
+    output = "Screen 0: minimum 320 x 200, current 3840 x 1080, maximum 16384 x 16384\n"
+    monkeypatch.setattr(display.subprocess, "run", lambda *a, **kw: type("Result", (), {"stdout": output})())
+    assert display._xrandr_screen_size() == (3840, 1080)
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from eventbus import EVENT_END, EVENT_HOLD, EVENT_START, EventBus, GestureEvent, Subscription
+
+
+def event(kind, hand_id=1, gesture="Pinch", timestamp=0.0):
+    return GestureEvent(kind, gesture, hand_id, timestamp, (0.5, 0.5), True)
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus(workers=2)
+    bus.start()
+    yield bus
+    bus.stop()
+    bus.join(timeout=2.0)
+
+
+def test_queued_holds_are_replaced_but_starts_and_ends_kept():
+    subscription = Subscription(print)
+    for e in [event(EVENT_START), event(EVENT_HOLD), event(EVENT_HOLD), event(EVENT_HOLD, hand_id=2),
+              event(EVENT_HOLD), event(EVENT_END)]:
+        subscription.deliver(e)
+    assert [(e.kind, e.hand_id) for e in subscription.queue] == [
+        (EVENT_START, 1), (EVENT_HOLD, 1), (EVENT_HOLD, 2), (EVENT_HOLD, 1), (EVENT_END, 1)
+    ]
+    assert subscription.dropped == 1
+
+
+def test_subscriptions_filter_by_kind_and_gesture():
+    subscription = Subscription(print, kinds=[EVENT_START], gestures=["Pinch"])
+    assert subscription.matches(event(EVENT_START))
+    assert not subscription.matches(event(EVENT_HOLD))
+    assert not subscription.matches(event(EVENT_START, gesture="Scroll"))
+
+
+def test_function_and_coroutine_handlers_get_events_in_order(bus):
+    seen, done = {"sync": [], "async": []}, threading.Event()
+
+    def on_sync(e):
+        seen["sync"].append(e.kind)
+
+    async def on_async(e):
+        await asyncio.sleep(0)
+        seen["async"].append(e.kind)
+        if e.kind == EVENT_END:
+            done.set()
+
+    bus.subscribe(on_sync, kinds=[EVENT_START, EVENT_END], name="sync")
+    bus.subscribe(on_async, name="async")
+    for kind in (EVENT_START, EVENT_HOLD, EVENT_END):
+        bus.publish(event(kind))
+
+    assert done.wait(2.0)
+    # The sync handler runs on the pool; wait for it to catch up too
+    for _ in range(200):
+        if len(seen["sync"]) == 2:
+            break
+        time.sleep(0.01)
+    assert seen == {"sync": [EVENT_START, EVENT_END], "async": [EVENT_START, EVENT_HOLD, EVENT_END]}
+    assert "handler:async" in bus.timer.counts()
+
+
+def test_failing_handler_does_not_stop_delivery(bus):
+    done = threading.Event()
+
+    def handler(e):
+        if e.kind == EVENT_START:
+            raise ValueError("boom")
+        done.set()
+
+    bus.subscribe(handler)
+    bus.publish(event(EVENT_START))
+    bus.publish(event(EVENT_END))
+    assert done.wait(2.0)
+
+
+def test_unmatched_events_are_not_queued():
+    bus = EventBus() # Not started: nothing would dispatch
+    bus.subscribe(print, kinds=[EVENT_END])
+    bus.publish(event(EVENT_HOLD))
+    assert bus.stats()["pending"] == 0
+    bus.loop.close()
+
+
+def test_holds_are_dropped_past_max_pending():
+    bus = EventBus(max_pending=2) # Not started, so nothing is dispatched
+    bus.subscribe(print)
+    for _ in range(4):
+        bus.publish(event(EVENT_HOLD))
+    bus.publish(event(EVENT_END))
+    assert bus.stats()["pending"] == 3
+    assert bus.stats()["dropped"] == 2
+    bus.loop.close()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from filters import FILTERS, EmaFilter, KalmanFilter, OneEuroFilter, create_filter, tune_for_jitter
+
+
+@pytest.mark.parametrize("filter_type", sorted(FILTERS))
+def test_filters_start_from_the_first_sample(filter_type):
+    landmarks = np.random.RandomState(0).rand(21, 3).astype(np.float32)
+    smoother = create_filter(filter_type, {})
+    filtered = smoother(landmarks, 1.0)
+
+    assert filtered.shape == (21, 3) and filtered.dtype == np.float32
+    assert np.allclose(filtered, landmarks)
+
+    smoother.reset()
+    assert np.allclose(smoother(landmarks + 0.5, 2.0), landmarks + 0.5)
+
+
+@pytest.mark.parametrize("filter_type", sorted(FILTERS))
+def test_filters_converge_on_a_still_hand(filter_type):
+    smoother = create_filter(filter_type, {})
+    smoother(np.zeros(3), 0.0)
+    for i in range(1, 120):
+        filtered = smoother(np.ones(3), i / 30)
+    assert np.allclose(filtered, 1.0, atol=1e-2)
+
+
+def test_ema_steps_by_alpha():
+    smoother = EmaFilter(alpha=0.25)
+    smoother(np.zeros(2), 0.0)
+    assert np.allclose(smoother(np.ones(2), 0.1), 0.25)
+    smoother.configure(alpha=0.5)
+    assert np.allclose(smoother(np.ones(2), 0.2), 0.625)
+
+
+def test_one_euro_smooths_jitter_but_follows_motion():
+    rng = np.random.RandomState(1)
+    still, moving = OneEuroFilter(), OneEuroFilter()
+    still_out, moving_out = [], []
+    for i in range(60):
+        t = i / 30
+        still_out.append(still(0.5 + rng.normal(0, 0.003, 1), t)[0])
+        moving_out.append(moving(np.array([t]), t)[0]) # One unit per second
+    assert np.std(still_out[10:]) < 0.003
+    assert moving_out[-1] == pytest.approx(59 / 30, abs=0.05)
+
+
+def test_kalman_tracks_constant_velocity_without_lag():
+    smoother = KalmanFilter()
+    for i in range(90):
+        t = i / 30
+        filtered = smoother(np.array([0.2 * t]), t)
+    assert filtered[0] == pytest.approx(0.2 * 89 / 30, abs=1e-3)
+
+
+def test_filters_ignore_repeated_timestamps():
+    smoother = OneEuroFilter()
+    first = smoother(np.zeros(2), 1.0)
+    assert np.allclose(smoother(np.ones(2), 1.0), first)
+
+
+def test_tune_for_jitter_smooths_shaky_hands_more():
+    steady, shaky = tune_for_jitter(0.002), tune_for_jitter(0.01)
+    assert set(steady) == set(FILTERS)
+    assert shaky["ema"]["alpha"] < steady["ema"]["alpha"]
+    assert shaky["one_euro"]["min_cutoff"] < steady["one_euro"]["min_cutoff"]
+    assert shaky["kalman"]["measurement_std"] > steady["kalman"]["measurement_std"]
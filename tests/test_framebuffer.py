@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from framebuffer import FrameRing
+
+
+def bgr(value, width=64, height=48):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_frame_ring_needs_three_slots():
+    with pytest.raises(ValueError):
+        FrameRing(32, 24, slots=2)
+
+
+def test_frame_ring_reads_the_newest_frame_scaled():
+    ring = FrameRing(32, 24)
+    assert ring.read() is None
+
+    ring.write(bgr(3))
+    ring.write(bgr(7))
+    view = ring.read()
+
+    assert view.shape == (24, 32, 3)
+    assert ring.version == 2
+    assert (view == 7).all()
+    assert not view.flags.writeable
+
+
+def test_frame_ring_converts_bgr_to_rgb():
+    ring = FrameRing(32, 24)
+    image = bgr(0)
+    image[..., 0] = 255 # Blue
+    ring.write(image)
+    assert ring.read()[0, 0].tolist() == [0, 0, 255]
+
+
+def test_frame_ring_annotates_the_scaled_frame():
+    ring = FrameRing(32, 24)
+    ring.write(bgr(0), annotate=lambda slot: slot.__setitem__((0, 0), 200))
+    view = ring.read()
+    assert view[0, 0].tolist() == [200, 200, 200]
+    assert view[1, 1].tolist() == [0, 0, 0]
+
+
+def test_frame_ring_never_writes_into_the_frame_being_read():
+    ring = FrameRing(32, 24)
+    ring.write(bgr(1))
+    view = ring.read()
+    for value in range(2, 10):
+        ring.write(bgr(value))
+        assert (view == 1).all()
+    assert (ring.read() == 9).all()
+
+
+def test_frame_ring_mirrors_before_annotating():
+    ring = FrameRing(32, 24)
+    image = bgr(0)
+    image[:, :32] = 255 # Left half white
+    drawn = []
+    ring.write(image, annotate=lambda slot: drawn.append(slot[0, 0].tolist()), mirror=True)
+
+    view = ring.read()
+    assert view[0, 0].tolist() == [0, 0, 0]
+    assert view[0, -1].tolist() == [255, 255, 255]
+    assert drawn == [[0, 0, 0]] # The annotation sees the mirrored frame
@@ -0,0 +1,211 @@
+import math
+
+import pytest
+
+from actuation import ActionExecutor
+from config import (
+    CLICK_MIN_HOLD, GESTURE_DRAG, GESTURE_NONE, GESTURE_PINCH, GESTURE_RELEASE_RATIO, GESTURE_SCROLL,
+    SharedState
+)
+from gestures import Action, ClickStateMachine, GestureEngine
+from landmarks import MIDDLE_FINGER_TIP, RING_FINGER_TIP, THUMB_TIP
+from mouse import NullMouse
+from replay import TraceSource
+
+OPEN = 2.0 # Thumb-index distance of an open hand, in hand scales
+PINCHED = 0.1
+THRESHOLD = 0.35 # Settings.click_threshold default
+
+
+def replay(path):
+    # Runs a recorded trace through one GestureEngine with the recorded
+    # timestamps; returns (frame, action) for every action it triggers
+    source = TraceSource(path)
+    engine = GestureEngine(SharedState())
+    actions = []
+    for i in range(len(source.timestamps)):
+        frame = source.frame_at(i)
+        _, triggered = engine.recognise(frame.hands[0], float(source.timestamps[i]))
+        actions.extend((i, action) for action in triggered)
+    return source.timestamps, actions
+
+
+def kinds(actions):
+    return [(i, action.kind) for i, action in actions]
+
+
+# --- Replayed Sessions ---
+
+def test_recorded_pinches_press_and_release_once_each(record_trace):
+    # Five pinches of 20 frames; each press waits for the second pinched
+    # frame (debounce) and reports the first one as its onset
+    distances = [PINCHED if i % 60 >= 20 and i % 60 < 40 else OPEN for i in range(300)]
+    timestamps, actions = replay(record_trace(distances))
+
+    expected = []
+    for start in range(20, 300, 60):
+        expected += [(start + 1, "press"), (start + 21, "release")]
+    assert kinds(actions) == expected
+    for i, action in actions:
+        assert action.timestamp == timestamps[i]
+        if action.kind == "press":
+            assert action.onset == timestamps[i - 1]
+
+
+def test_pinch_wobbling_between_the_thresholds_stays_pressed(record_trace):
+    # Hysteresis: once pressed, distances above the press threshold but
+    # below release_ratio times it keep the button down
+    wobble = [THRESHOLD * 0.9, THRESHOLD * (GESTURE_RELEASE_RATIO - 0.05)] * 15
+    distances = [OPEN] * 10 + [PINCHED] * 5 + wobble + [OPEN] * 10
+    _, actions = replay(record_trace(distances))
+
+    assert kinds(actions) == [(11, "press"), (46, "release")]
+
+
+def test_single_frame_glitches_are_debounced(record_trace):
+    # A one-frame pinch never presses, a one-frame opening never releases
+    distances = [OPEN] * 10 + [PINCHED] + [OPEN] * 10 + [PINCHED] * 10 + [OPEN] + [PINCHED] * 10 + [OPEN] * 5
+    _, actions = replay(record_trace(distances))
+
+    assert kinds(actions) == [(22, "press"), (43, "release")]
+
+
+def test_quick_pinch_is_held_for_min_hold(record_trace):
+    # Released right after pressing: the release waits out min_hold
+    distances = [OPEN] * 10 + [PINCHED] * 2 + [OPEN] * 10
+    timestamps, actions = replay(record_trace(distances))
+
+    (press, _), (release, _) = actions
+    assert kinds(actions) == [(11, "press"), (15, "release")]
+    assert timestamps[release] - timestamps[press] >= CLICK_MIN_HOLD
+    assert timestamps[release - 2] - timestamps[press] < CLICK_MIN_HOLD
+
+
+def test_no_pinch_starts_while_the_hand_moves_fast(record_trace):
+    # 0.04 per frame at 30 fps is 12 hand scales per second; the pinch
+    # only presses once the hand has stopped
+    shifts = [0.04 * min(i, 20) for i in range(30)]
+    distances = [OPEN] * 5 + [PINCHED] * 25
+    _, actions = replay(record_trace(distances, shifts))
+
+    assert kinds(actions) == [(22, "press")]
+
+
+def pinched_with(hand, tip, shift=0.0, lift=0.0):
+    # An open hand with `tip` touching the thumb, both moved down by `lift`
+    landmarks = hand(OPEN, shift)
+    landmarks[tip, :2] = landmarks[THUMB_TIP, :2] + (0.005, 0.0)
+    landmarks[[THUMB_TIP, tip], 1] += lift
+    return landmarks
+
+
+def run(frames):
+    # Recognises one frame per 1/30 s; returns the gesture names and the
+    # (frame, kind, button) of every action
+    engine = GestureEngine(SharedState())
+    gestures, actions = [], []
+    for i, landmarks in enumerate(frames):
+        gesture, triggered = engine.recognise(landmarks, i / 30.0)
+        gestures.append(gesture)
+        actions.extend((i, action.kind, action.button) for action in triggered)
+    return gestures, actions
+
+
+# --- Gesture Table ---
+
+def test_pinch_presses_and_releases_after_debounce(hand):
+    frames = [hand(OPEN)] * 5 + [hand(PINCHED)] * 5 + [hand(OPEN)] * 5
+    gestures, actions = run(frames)
+    assert actions == [(6, "press", "left"), (11, "release", "left")]
+    assert gestures[6] == GESTURE_PINCH and gestures[-1] == GESTURE_NONE
+
+
+def test_one_frame_changes_are_ignored(hand):
+    frames = [hand(OPEN)] * 5 + [hand(PINCHED)] + [hand(OPEN)] * 5
+    assert run(frames)[1] == []
+
+
+def test_moving_while_pinched_is_a_drag(hand):
+    frames = [hand(OPEN)] * 3 + [hand(PINCHED, shift=0.01 * i) for i in range(10)]
+    gestures, actions = run(frames)
+    assert actions == [(4, "press", "left")]
+    assert gestures[-1] == GESTURE_DRAG
+
+
+def test_ring_pinch_right_clicks_once(hand):
+    frames = [hand(OPEN)] * 3 + [pinched_with(hand, RING_FINGER_TIP)] * 10 + [hand(OPEN)] * 3
+    assert run(frames)[1] == [(4, "click", "right")]
+
+
+def test_middle_pinch_scrolls_with_vertical_travel(hand):
+    frames = [hand(OPEN)] * 3 + [pinched_with(hand, MIDDLE_FINGER_TIP, lift=0.01 * i) for i in range(10)]
+    gestures, actions = run(frames)
+    assert gestures[-1] == GESTURE_SCROLL
+    assert actions and all(kind == "scroll" for _, kind, _ in actions)
+
+
+def test_cancel_releases_a_held_button(hand):
+    engine = GestureEngine(SharedState())
+    for i in range(3):
+        engine.recognise(hand(PINCHED), i / 30.0)
+    assert [action.kind for action in engine.cancel(1.0)] == ["release"]
+    assert engine.cancel(1.1) == []
+
+
+# --- State Machine ---
+
+def test_state_machine_debounce_and_onset():
+    machine = ClickStateMachine(debounce=3, min_hold=0.0)
+    assert machine.update(PINCHED, THRESHOLD, 0.0, 1.0) is None
+    assert machine.update(PINCHED, THRESHOLD, 0.0, 1.1) is None
+    assert machine.update(PINCHED, THRESHOLD, 0.0, 1.2) == "press"
+    assert machine.onset == 1.0
+
+    assert machine.update(OPEN, THRESHOLD, 0.0, 1.3) is None
+    assert machine.update(OPEN, THRESHOLD, 0.0, 1.4) is None
+    assert machine.update(OPEN, THRESHOLD, 0.0, 1.5) == "release"
+
+
+@pytest.mark.parametrize("speed, pressed", [(1.0, True), (8.0, True), (8.5, False)])
+def test_state_machine_speed_gate(speed, pressed):
+    machine = ClickStateMachine(max_speed=8.0, debounce=1)
+    assert (machine.update(PINCHED, THRESHOLD, speed, 1.0) == "press") is pressed
+
+
+def test_state_machine_speed_gate_does_not_release():
+    # The gate only holds back new presses
+    machine = ClickStateMachine(max_speed=8.0, debounce=1, min_hold=0.0)
+    assert machine.update(PINCHED, THRESHOLD, 0.0, 1.0) == "press"
+    assert machine.update(PINCHED, THRESHOLD, 50.0, 1.1) is None
+    assert machine.pressed
+
+
+# --- Executor ---
+
+def test_executor_runs_actions_and_releases_on_stop():
+    mouse = NullMouse(record=True)
+    executor = ActionExecutor(mouse)
+    executor.start()
+    executor.actions.put(Action("press", "left", timestamp=0.0))
+    executor.actions.put(Action("press", "left", timestamp=0.0)) # Already down
+    executor.actions.put(Action("click", "right"))
+    executor.actions.put(Action("press", "middle"))
+    executor.stop()
+    executor.join(timeout=2.0)
+
+    kinds = [event[1] for event in mouse.events]
+    assert kinds[:4] == ["press", "right_press", "right_release", "middle_press"]
+    assert sorted(kinds[4:]) == ["middle_release", "release"]
+
+
+def test_scroll_keeps_momentum_and_stops():
+    mouse = NullMouse()
+    executor = ActionExecutor(mouse, friction=5.0, min_velocity=1.0, rate_hz=60)
+    executor.execute(Action("scroll", None, 2.0, timestamp=0.0))
+    scrolled = mouse.scrolled
+    for _ in range(200):
+        executor.coast()
+    assert mouse.scrolled > scrolled # Coasted after the hand stopped
+    assert executor.velocity == 0.0
+    # The first tick scrolls the frame's travel, the rest decay geometrically
+    assert mouse.scrolled == pytest.approx(2.0 / (1 - math.exp(-5.0 / 60)), rel=0.2)
@@ -0,0 +1,52 @@
+from hands import HandMatcher
+
+
+def test_ids_follow_moving_hands(hand):
+    matcher = HandMatcher(max_distance=0.15, timeout=0.5)
+    left, right = hand(2.0, shift=-0.3), hand(2.0, shift=0.3)
+    first = matcher.update(0, [left, right], 0.0)
+    assert [t.hand_id for t in first] == [1, 2]
+
+    # Listed the other way round and moved a little: same IDs, oldest first
+    tracked = matcher.update(0, [hand(2.0, shift=0.32), hand(2.0, shift=-0.28)], 0.1)
+    assert [t.hand_id for t in tracked] == [1, 2]
+    assert tracked[0].landmarks[0, 0] < tracked[1].landmarks[0, 0]
+
+
+def test_jump_beyond_max_distance_starts_a_new_track(hand):
+    matcher = HandMatcher(max_distance=0.15, timeout=0.5)
+    matcher.update(0, [hand(2.0)], 0.0)
+    tracked = matcher.update(0, [hand(2.0, shift=0.4)], 0.1)
+    assert [t.hand_id for t in tracked] == [2]
+
+
+def test_hidden_hand_keeps_its_id_until_timeout(hand):
+    matcher = HandMatcher(max_distance=0.15, timeout=0.5)
+    matcher.update(0, [hand(2.0)], 0.0)
+
+    assert matcher.update(0, [], 0.2) == ()
+    assert matcher.live_ids() == {1}
+    assert [t.hand_id for t in matcher.update(0, [hand(2.0)], 0.4)] == [1]
+
+    matcher.update(0, [], 0.5)
+    matcher.update(0, [], 1.0) # Last seen 0.6 ago
+    assert matcher.live_ids() == set()
+    assert [t.hand_id for t in matcher.update(0, [hand(2.0)], 1.1)] == [2]
+
+
+def test_cameras_never_share_ids(hand):
+    matcher = HandMatcher()
+    matcher.update(0, [hand(2.0)], 0.0)
+    tracked = matcher.update(1, [hand(2.0)], 0.0)
+    assert [(t.hand_id, t.camera) for t in tracked] == [(1, 0), (2, 1)]
+
+    # An update from one camera leaves the other camera's hands visible
+    tracked = matcher.update(0, [hand(2.0)], 0.1)
+    assert [t.hand_id for t in tracked] == [1, 2]
+
+
+def test_handedness_is_kept_when_unknown(hand):
+    matcher = HandMatcher()
+    matcher.update(0, [hand(2.0)], 0.0, handedness=[1])
+    tracked = matcher.update(0, [hand(2.0)], 0.1)
+    assert tracked[0].handedness == 1
@@ -0,0 +1,63 @@
+import types
+
+import numpy as np
+import pytest
+
+from landmarks import (
+    INDEX, MIDDLE, THUMB, NUM_LANDMARKS,
+    bounding_box, draw_landmarks, extended_fingers, folded_fingers, freeze, from_mediapipe,
+    hand_scale, mirror, tip_distances
+)
+
+
+def test_from_mediapipe_builds_one_float32_array():
+    protobuf = types.SimpleNamespace(landmark=[
+        types.SimpleNamespace(x=i / 100, y=i / 50, z=-i / 1000) for i in range(NUM_LANDMARKS)
+    ])
+    landmarks = from_mediapipe(protobuf)
+
+    assert landmarks.shape == (NUM_LANDMARKS, 3)
+    assert landmarks.dtype == np.float32
+    assert np.allclose(landmarks[7], (0.07, 0.14, -0.007))
+
+
+def test_mirror_and_freeze_work_in_place(hand):
+    landmarks = hand(2.0)
+    x = landmarks[:, 0].copy()
+    assert mirror(landmarks) is landmarks
+    assert np.allclose(landmarks[:, 0], 1.0 - x)
+
+    freeze(landmarks)
+    with pytest.raises(ValueError):
+        landmarks[0, 0] = 0.0
+
+
+def test_tip_distances_is_a_symmetric_matrix(hand):
+    distances = tip_distances(hand(1.0))
+    assert distances.shape == (5, 5)
+    assert np.allclose(distances, distances.T)
+    assert np.allclose(np.diag(distances), 0.0)
+    assert distances[THUMB, INDEX] == pytest.approx(0.1)
+
+
+def test_hand_scale_and_bounding_box(hand):
+    landmarks = hand(1.0)
+    assert hand_scale(landmarks) == pytest.approx(0.1)
+    x0, y0, x1, y1 = bounding_box(landmarks)
+    assert (x0, y0) == pytest.approx((0.3, 0.3))
+    assert (x1, y1) == pytest.approx((0.7, 0.7))
+
+
+def test_finger_predicates_give_one_flag_per_finger(hand):
+    landmarks = hand(2.0)
+    extended = extended_fingers(landmarks)
+    assert extended.shape == (5,) and extended.dtype == bool
+    assert extended[MIDDLE] # Middle tip at y 0.3, above its DIP joint at 0.5
+    assert folded_fingers(landmarks).shape == (5,)
+
+
+def test_draw_landmarks_draws_on_the_image(hand):
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    draw_landmarks(image, hand(2.0), (0, 255, 0), (255, 255, 255))
+    assert image[:, :, 1].any()
+    assert image[int(0.7 * 48), int(0.5 * 64)].tolist() == [255, 255, 255] # Wrist
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from config import SharedState
+from display import Monitor
+from mapping import DesktopLayout, ScreenMapper, apply_homography, fit_homography, is_convex
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def layout(*monitors):
+    return DesktopLayout(monitors or [Monitor(0, 0, WIDTH, HEIGHT, 1.0, "default")])
+
+
+def test_fit_homography_recovers_a_known_matrix():
+    matrix = np.array([[1.2, 0.1, 0.05], [-0.05, 0.9, 0.1], [0.2, -0.1, 1.0]])
+    src = np.array([(0.1, 0.1), (0.9, 0.15), (0.85, 0.9), (0.2, 0.8), (0.5, 0.5)])
+    fitted = fit_homography(src, apply_homography(matrix, src))
+
+    assert np.allclose(fitted, matrix, atol=1e-9)
+
+
+@pytest.mark.parametrize("src", [
+    [(0, 0), (1, 0), (1, 1)], # Too few
+    [(0, 0), (1, 0), (2, 0), (3, 0)], # Collinear
+    [(0.5, 0.5)] * 4, # Coincident
+])
+def test_fit_homography_rejects_degenerate_points(src):
+    with pytest.raises(ValueError):
+        fit_homography(src, [(0, 0), (1, 0), (1, 1), (0, 1)][:len(src)])
+
+
+def test_is_convex():
+    assert is_convex([(0.1, 0.1), (0.9, 0.1), (0.9, 0.9), (0.1, 0.9)])
+    assert not is_convex([(0.1, 0.1), (0.9, 0.9), (0.9, 0.1), (0.1, 0.9)]) # Crossed
+
+
+@pytest.mark.parametrize("margin", [0.0, 0.1, 0.25])
+def test_margin_mapping_matches_linear_interpolation(margin):
+    state = SharedState()
+    state.update_settings(margin=margin, mapping_points=None)
+    mapper = ScreenMapper(layout())
+
+    x = np.linspace(-0.1, 1.1, 49)
+    points = np.column_stack([x, x[::-1]])
+    pixels = mapper.map(points, state.settings)
+
+    expected_x = np.minimum(np.interp(x, [margin, 1 - margin], [0, WIDTH]), WIDTH - 1)
+    expected_y = np.minimum(np.interp(x[::-1], [margin, 1 - margin], [0, HEIGHT]), HEIGHT - 1)
+    assert np.allclose(pixels[:, 0], expected_x)
+    assert np.allclose(pixels[:, 1], expected_y)
+
+
+def test_calibration_corners_map_to_screen_corners():
+    state = SharedState()
+    corners = ((0.2, 0.15), (0.85, 0.2), (0.8, 0.9), (0.15, 0.8))
+    state.update_settings(mapping_points=corners)
+    mapper = ScreenMapper(layout())
+
+    pixels = mapper.map(np.array(corners), state.settings)
+    assert np.allclose(pixels, [(0, 0), (WIDTH - 1, 0), (WIDTH - 1, HEIGHT - 1), (0, HEIGHT - 1)], atol=1e-6)
+
+
+def test_matrix_is_cached_until_settings_or_layout_change():
+    state = SharedState()
+    mapper = ScreenMapper(layout())
+    matrix, _ = mapper.matrix_for(state.settings)
+    assert mapper.matrix_for(state.settings)[0] is matrix
+
+    state.update_settings(margin=state.settings.margin + 0.05)
+    changed, _ = mapper.matrix_for(state.settings)
+    assert changed is not matrix
+
+    mapper.layout = layout(Monitor(0, 0, 1280, 720, 1.0, "other"))
+    assert mapper.matrix_for(state.settings)[0] is not changed
+
+
+def test_scaled_monitors_are_laid_out_in_logical_units():
+    # A 2x monitor to the right of a 1x one: equal logical widths
+    desktop = layout(Monitor(0, 0, 1920, 1080, 1.0, "left"), Monitor(1920, 0, 3840, 2160, 2.0, "right"))
+    assert desktop.bounds == (0.0, 0.0, 3840.0, 1080.0)
+
+    pixels = desktop.to_pixels(np.array([(960.0, 540.0), (2880.0, 540.0), (5000.0, 5000.0)]))
+    assert np.allclose(pixels, [(960, 540), (1920 + 1920, 1080), (1920 + 3839, 2159)])
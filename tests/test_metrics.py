@@ -0,0 +1,62 @@
+import csv
+import json
+
+import pytest
+
+from actuation import CursorActuator
+from metrics import STAT_FIELDS, export_metrics
+from mouse import NullMouse
+from pipeline import StageTimer
+
+
+@pytest.fixture
+def timer():
+    timer = StageTimer(window=None)
+    for ms in range(1, 101):
+        timer.record("inference", ms / 1000.0)
+    timer.record("capture", 0.002)
+    return timer
+
+
+def test_stats_per_stage(timer):
+    stats = timer.stats()
+    inference = stats["inference"]
+    assert set(inference) == set(STAT_FIELDS)
+    assert inference["count"] == 100
+    assert inference["mean"] == pytest.approx(50.5)
+    assert inference["max"] == pytest.approx(100.0)
+    assert inference["p50"] <= inference["p95"] <= inference["p99"] <= inference["max"]
+    assert stats["capture"]["p99"] == pytest.approx(2.0)
+
+
+def test_clear_forgets_every_stage(timer):
+    timer.clear()
+    assert timer.stats() == {}
+
+
+def test_export_csv(timer, tmp_path):
+    path = str(tmp_path / "metrics.csv")
+    export_metrics(timer, path)
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["stage"] for row in rows] == ["inference", "capture"]
+    assert float(rows[0]["mean"]) == pytest.approx(50.5)
+
+
+def test_export_json(timer, tmp_path):
+    path = str(tmp_path / "metrics.json")
+    export_metrics(timer, path)
+    with open(path) as f:
+        report = json.load(f)
+    assert report["stages"]["inference"]["count"] == 100
+
+
+def test_cursor_records_motion_to_cursor_once_per_sample():
+    timer = StageTimer()
+    cursor = CursorActuator(NullMouse(), timer=timer)
+    cursor.push(100.0, 100.0, 1.0)
+    cursor.move(100.0, 100.0)
+    cursor.move(101.0, 100.0) # Same sample, moved again
+    counts = timer.counts()
+    assert counts["mouse"] == 2
+    assert counts["motion_to_cursor"] == 1
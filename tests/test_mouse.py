@@ -0,0 +1,78 @@
+import os
+import threading
+
+from actuation import CursorActuator
+from mouse import (
+    ABS_X, ABS_Y, BTN_LEFT, EV_ABS, EV_KEY, EV_REL, EV_SYN, INPUT_EVENT, MOUSE_BACKENDS, REL_WHEEL,
+    SYN_REPORT, NullMouse, UInputMouse, create_mouse
+)
+
+
+def test_null_mouse_counts_moves_and_records_buttons():
+    mouse = NullMouse(width=800, height=600, record=True)
+    assert mouse.size() == (800, 600)
+    mouse.move_to(10, 20)
+    mouse.press()
+    mouse.move_to(30, 40)
+    mouse.release()
+
+    assert mouse.moves == 2
+    assert [(kind, x, y) for _, kind, x, y in mouse.events] == [("press", 10, 20), ("release", 30, 40)]
+
+
+def test_null_mouse_records_nothing_by_default():
+    mouse = NullMouse()
+    mouse.press()
+    assert mouse.events == []
+
+
+def test_create_mouse_by_name():
+    assert isinstance(create_mouse("null"), NullMouse)
+    assert set(MOUSE_BACKENDS) >= {"null", "pyautogui"}
+
+
+def test_record_backend_keeps_events():
+    mouse = create_mouse("record")
+    mouse.press("right")
+    assert [kind for _, kind, _, _ in mouse.events] == ["right_press"]
+
+
+def test_uinput_flush_writes_one_batch_ending_in_syn_report():
+    # Skips the device setup (needs /dev/uinput); flush() only writes to fd
+    read_fd, write_fd = os.pipe()
+    mouse = UInputMouse.__new__(UInputMouse)
+    mouse.fd, mouse._events, mouse._lock = write_fd, [], threading.Lock()
+    try:
+        mouse.move_to(100.4, 200)
+        mouse.press()
+        mouse.scroll(-2)
+        mouse.flush()
+        mouse.flush() # Nothing queued: no write
+
+        data = os.read(read_fd, 4096)
+        size = INPUT_EVENT.size
+        events = [INPUT_EVENT.unpack(data[i:i + size])[2:] for i in range(0, len(data), size)]
+        assert events == [
+            (EV_ABS, ABS_X, 100), (EV_ABS, ABS_Y, 200), (EV_KEY, BTN_LEFT, 1),
+            (EV_REL, REL_WHEEL, -2), (EV_SYN, SYN_REPORT, 0)
+        ]
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_uinput_drops_events_once_closed():
+    # A stage still shutting down must not write to a closed (or reused) fd
+    mouse = UInputMouse.__new__(UInputMouse)
+    mouse.fd, mouse._events, mouse._lock = None, [], threading.Lock()
+    mouse.press()
+    mouse.flush()
+    assert mouse._events == []
+
+
+def test_cursor_flushes_once_per_move():
+    mouse = NullMouse()
+    cursor = CursorActuator(mouse)
+    cursor.move(10, 20)
+    cursor.move(10, 20) # Coalesced: nothing to send
+    assert (mouse.moves, mouse.flushes) == (1, 1)
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import LatestQueue, StageTimer
+
+
+# --- LatestQueue ---
+
+def test_latest_queue_drops_the_oldest_item():
+    frames = LatestQueue(maxsize=2)
+    for i in range(5):
+        frames.put(i)
+    assert frames.dropped == 3
+    assert [frames.get(timeout=0), frames.get(timeout=0)] == [3, 4]
+
+
+def test_latest_queue_get_times_out_with_none():
+    frames = LatestQueue()
+    start = time.perf_counter()
+    assert frames.get(timeout=0.05) is None
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_latest_queue_wakes_a_waiting_consumer():
+    frames = LatestQueue()
+    threading.Timer(0.02, frames.put, args=("frame",)).start()
+    assert frames.get(timeout=2.0) == "frame"
+
+
+def test_latest_queue_clear():
+    frames = LatestQueue()
+    frames.put("frame")
+    frames.clear()
+    assert frames.get(timeout=0) is None
+
+
+# --- StageTimer ---
+
+def test_stage_timer_keeps_a_rolling_window():
+    timer = StageTimer(window=2)
+    for seconds in (0.010, 0.002, 0.004):
+        timer.record("inference", seconds)
+    assert timer.summary() == {"inference": pytest.approx(3.0)}
+
+
+def test_stage_timer_measures_blocks():
+    timer = StageTimer()
+    with timer.measure("capture"):
+        time.sleep(0.01)
+    assert timer.summary()["capture"] >= 9.0
+
+
+def test_lossless_queue_waits_instead_of_dropping():
+    frames = LatestQueue(maxsize=1, lossless=True)
+    frames.put(0)
+    producer = threading.Thread(target=lambda: [frames.put(i) for i in range(1, 4)])
+    producer.start()
+
+    received = [frames.get(timeout=2.0) for _ in range(4)]
+    producer.join(timeout=2.0)
+    assert received == [0, 1, 2, 3]
+    assert frames.dropped == 0
+
+
+def test_stage_timer_without_a_window_keeps_every_sample():
+    timer = StageTimer(window=None)
+    for ms in range(1, 1001):
+        timer.record("inference", ms / 1000.0)
+    assert timer.counts() == {"inference": 1000}
+
+    assert timer.percentiles()["inference"] == pytest.approx((500.0, 950.0, 990.0))
+
+
+@pytest.mark.parametrize("samples, expected", [
+    ([7], (7.0, 7.0, 7.0)),
+    ([4, 1, 3, 2], (2.0, 4.0, 4.0)), # p50: the 2nd of 4, not an interpolated 2.5
+    (range(1, 21), (10.0, 19.0, 20.0)),
+])
+def test_percentiles_are_nearest_rank(samples, expected):
+    timer = StageTimer(window=None)
+    for ms in samples:
+        timer.record("inference", ms / 1000.0)
+    assert timer.percentiles()["inference"] == pytest.approx(expected)
+    stats = timer.stats()["inference"]
+    assert (stats["p50"], stats["p95"], stats["p99"]) == pytest.approx(expected)
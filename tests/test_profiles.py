@@ -0,0 +1,76 @@
+import json
+
+from config import SharedState
+from profiles import Profile
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "handtrack" / "profiles.json")
+    state = SharedState()
+    state.update_settings(margin=0.22, click_threshold=0.3, filter_type="kalman")
+    state.update_filter_params("kalman", process_noise=0.5)
+    Profile("ada", "camera1", path).save(state.settings)
+
+    fresh = SharedState()
+    assert Profile("ada", "camera1", path).load(fresh)
+    settings = fresh.settings
+    assert (settings.margin, settings.click_threshold, settings.filter_type) == (0.22, 0.3, "kalman")
+    assert settings.filter_params["kalman"]["process_noise"] == 0.5
+
+
+def test_profiles_are_kept_per_user_and_camera(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    state = SharedState()
+    Profile("ada", "camera0", path).save(state.settings._replace(margin=0.1))
+    Profile("ada", "camera1", path).save(state.settings._replace(margin=0.3))
+
+    with open(path) as f:
+        assert set(json.load(f)["profiles"]) == {"ada@camera0", "ada@camera1"}
+    assert not Profile("bob", "camera0", path).load(state)
+    assert Profile("ada", "camera0", path).load(state)
+    assert state.settings.margin == 0.1
+
+
+def test_missing_filter_params_fall_back_to_defaults(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"version": 1, "profiles": {
+        "ada@camera0": {"filter_type": "gone", "filter_params": {"ema": {"alpha": 0.9}}}
+    }}))
+    state = SharedState()
+    default_type, default_params = state.settings.filter_type, state.settings.filter_params
+
+    assert Profile("ada", "camera0", str(path)).load(state)
+    assert state.settings.filter_type == default_type
+    assert state.settings.filter_params["ema"]["alpha"] == 0.9
+    assert set(state.settings.filter_params) == set(default_params)
+
+
+def test_unreadable_profile_file_is_ignored(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text("{not json")
+    assert not Profile("ada", "camera0", str(path)).load(SharedState())
+
+
+def test_version_1_click_threshold_is_dropped(tmp_path):
+    # Version 1 stored the threshold in image units, not hand scales
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"version": 1, "profiles": {
+        "ada@camera0": {"margin": 0.2, "click_threshold": 0.05}
+    }}))
+    state = SharedState()
+    default = state.settings.click_threshold
+
+    assert Profile("ada", "camera0", str(path)).load(state)
+    assert (state.settings.margin, state.settings.click_threshold) == (0.2, default)
+
+
+def test_mapping_points_come_back_as_tuples(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    corners = ((0.1, 0.2), (0.9, 0.2), (0.9, 0.8), (0.1, 0.8))
+    state = SharedState()
+    state.update_settings(mapping_points=corners)
+    Profile("ada", "camera0", path).save(state.settings)
+
+    fresh = SharedState()
+    assert Profile("ada", "camera0", path).load(fresh)
+    assert fresh.settings.mapping_points == corners
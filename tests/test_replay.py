@@ -0,0 +1,100 @@
+import time
+
+import cv2
+import numpy as np
+
+from config import GESTURE_PINCH
+from hands import TrackedHand
+from landmarks import mirror
+from recorder import SessionRecorder
+from replay import TraceDetector, TraceSource, VideoFileSource, open_replay
+from traces import TraceReader
+
+
+def tracked(hand_id, landmarks, gesture=None, handedness=-1):
+    # The actuation stage hands the recorder mirrored landmarks
+    return TrackedHand(hand_id, 0, mirror(landmarks.copy()), gesture, handedness)
+
+
+def test_recorded_trace_replays_frame_by_frame(tmp_path, hand):
+    recorder = SessionRecorder(str(tmp_path), video=False)
+    recorder.record_hands(10.0, 0, [tracked(1, hand(0.1), GESTURE_PINCH, 1), tracked(2, hand(2.0))])
+    recorder.record_hands(10.5, 1, [])
+    recorder.record_hands(11.0, 2, [tracked(1, hand(1.0))])
+    recorder.close()
+
+    records = TraceReader(recorder.trace_path)
+    assert records["hand_id"].tolist() == [1, 2, -1, 1]
+    assert records["gesture"][0] != 0
+
+    source, detector = open_replay(recorder.trace_path)
+    assert isinstance(source, TraceSource) and isinstance(detector, TraceDetector)
+    assert not source.has_frames
+
+    replayed = []
+    while source.isOpened():
+        success, frame = source.read()
+        assert success
+        replayed.append(detector.process(frame))
+    assert source.read() == (False, None)
+
+    assert [len(hands) for hands in replayed] == [2, 0, 1]
+    # Back in detector space; float16 on disk
+    assert np.allclose(replayed[0][0], hand(0.1), atol=1e-3)
+    assert np.allclose(replayed[2][0], hand(1.0), atol=1e-3)
+
+
+def test_single_hand_npz_traces_still_replay(tmp_path, hand):
+    path = str(tmp_path / "landmarks.npz")
+    np.savez(path, timestamps=np.array([1.0, 2.0]), landmarks=np.stack([hand(0.1), hand(2.0)]),
+             present=np.array([True, False]))
+
+    source, detector = open_replay(path)
+    frames = [detector.process(source.read()[1]) for _ in range(2)]
+    assert [len(hands) for hands in frames] == [1, 0]
+    assert np.array_equal(frames[0][0], hand(0.1))
+    assert detector.handedness == []
+
+
+def test_realtime_trace_keeps_the_recorded_pace(record_trace):
+    source = TraceSource(record_trace([2.0] * 4), realtime=True)
+    start = time.perf_counter()
+    while source.isOpened():
+        source.read()
+    assert time.perf_counter() - start >= 3 / 30 - 0.01
+
+
+def test_recorded_video_replays_every_frame(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), trace=False)
+    for i in range(5):
+        recorder.record_frame(np.full((48, 64, 3), 40 * i, dtype=np.uint8))
+    recorder.close()
+    assert recorder.dropped_frames == 0
+
+    source, detector = open_replay(recorder.video_path)
+    assert isinstance(source, VideoFileSource) and detector is None
+    frames = []
+    while True:
+        success, image = source.read()
+        if not success:
+            break
+        frames.append(int(image.mean()))
+    assert len(frames) == 5
+    assert frames == sorted(frames)
+
+
+def test_looped_video_starts_over(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (64, 48))
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    source = VideoFileSource(path, loop=True)
+    timestamps = []
+    for _ in range(7):
+        assert source.read()[0]
+        timestamps.append(source.timestamp)
+    source.release()
+    # The recorded timeline keeps going across the loop
+    assert np.allclose(np.diff(timestamps), 1 / 30.0, atol=1e-3)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from config import SharedState
+from scheduler import MODE_FULL, MODE_IDLE, MODE_PROBE, MODE_TRACKING, InferenceScheduler
+
+STILL = np.full((480, 640, 3), 100, dtype=np.uint8)
+
+
+def moved():
+    frame = STILL.copy()
+    frame[100:300, 200:400] = 220 # A hand-sized patch changed
+    return frame
+
+
+@pytest.fixture
+def settings():
+    return SharedState().settings
+
+
+@pytest.fixture
+def scheduler():
+    return InferenceScheduler(max_reuse=0.5, probe_interval=1.0)
+
+
+def test_first_frame_is_always_inferred(scheduler, settings):
+    assert scheduler.should_infer(STILL, 0.0, settings, hand_present=True)
+
+
+def test_still_frames_reuse_until_max_reuse(scheduler, settings):
+    scheduler.should_infer(STILL, 0.0, settings, hand_present=True)
+    assert not scheduler.should_infer(STILL, 0.1, settings, hand_present=True)
+    assert scheduler.mode == MODE_TRACKING
+    assert scheduler.should_infer(STILL, 0.5, settings, hand_present=True)
+    assert (scheduler.inferred, scheduler.reused) == (2, 1)
+
+
+def test_motion_is_inferred_and_becomes_the_reference(scheduler, settings):
+    scheduler.should_infer(STILL, 0.0, settings, hand_present=True)
+    assert scheduler.should_infer(moved(), 0.1, settings, hand_present=True)
+    assert not scheduler.should_infer(moved(), 0.2, settings, hand_present=True)
+
+
+def test_without_a_hand_it_probes(scheduler, settings):
+    scheduler.should_infer(STILL, 0.0, settings, hand_present=False)
+    assert not scheduler.should_infer(STILL, 0.9, settings, hand_present=False)
+    assert scheduler.mode == MODE_PROBE
+    assert scheduler.should_infer(STILL, 1.0, settings, hand_present=False)
+
+
+def test_cursor_off_ignores_motion(scheduler, settings):
+    idle = settings._replace(cursor_active=False)
+    scheduler.should_infer(STILL, 0.0, idle, hand_present=True)
+    assert not scheduler.should_infer(moved(), 0.1, idle, hand_present=True)
+    assert scheduler.mode == MODE_IDLE
+
+
+def test_calibration_gets_every_frame(scheduler, settings):
+    calibrating = settings._replace(is_calibrating=True)
+    assert all(scheduler.should_infer(STILL, i / 30, calibrating, hand_present=True) for i in range(5))
+    assert scheduler.mode == MODE_FULL
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pytest
+
+from config import GESTURE_PINCH, SharedState
+from gestures import GESTURE_CODES
+from hands import TrackedHand
+from server import HEADER_SIZE, NO_GESTURE, FramePacker, LandmarkServer, StreamClient, parse_frame, parse_url
+
+
+def published(state, hand, hands=1):
+    tracked = tuple(
+        TrackedHand(i + 1, 0, hand(0.1, shift=0.1 * i), GESTURE_PINCH, i % 2) for i in range(hands)
+    )
+    return state.publish(captured=5.0, fps=30.0, gesture=GESTURE_PINCH, hands=tracked)
+
+
+def test_parse_url():
+    assert parse_url("udp://:9000") == ("udp", ("127.0.0.1", 9000))
+    assert parse_url("unix:/tmp/hands.sock") == ("unix", "/tmp/hands.sock")
+    with pytest.raises(ValueError):
+        parse_url("ws://localhost:9000")
+
+
+def test_pack_round_trip(hand):
+    snapshot = published(SharedState(), hand, hands=2)
+    packer = FramePacker(max_hands=2)
+    payload = packer.pack(snapshot)
+    assert len(payload) == HEADER_SIZE + 2 * 256
+
+    frame = parse_frame(payload)
+    assert (frame["count"], frame["sequence"], frame["captured"]) == (2, snapshot.version, 5.0)
+    assert frame["gesture"] == GESTURE_CODES[GESTURE_PINCH]
+    assert frame["hands"]["hand_id"].tolist() == [1, 2]
+    assert frame["hands"]["handedness"].tolist() == [0, 1]
+    assert np.array_equal(frame["hands"][1]["landmarks"], hand(0.1, shift=0.1))
+
+    # Fewer hands: the unused slots are zeroed
+    frame = parse_frame(packer.pack(snapshot._replace(hands=snapshot.hands[:1], gesture="?")))
+    assert frame["count"] == 1 and frame["gesture"] == NO_GESTURE
+    assert not frame["hands"][1]["landmarks"].any()
+
+
+def test_parse_rejects_other_data():
+    with pytest.raises(ValueError):
+        parse_frame(b"HELLO" * 10)
+
+
+def receive_published(server, url, state, hand):
+    # Subscribes, publishes until a frame arrives (the subscription races
+    # the first publish) and returns it
+    server.start()
+    client = StreamClient(url)
+    try:
+        deadline = time.perf_counter() + 5.0
+        while time.perf_counter() < deadline:
+            snapshot = published(state, hand)
+            frame = client.receive(timeout=0.1)
+            if frame is not None:
+                return snapshot, frame
+    finally:
+        client.close()
+        server.stop()
+        server.join(timeout=2.0)
+    pytest.fail("No frame received")
+
+
+def test_udp_subscriber_receives_snapshots(hand):
+    state = SharedState()
+    server = LandmarkServer(state, urls=("udp://127.0.0.1:0",), max_hands=2)
+    port = server.listeners[0].getsockname()[1]
+    snapshot, frame = receive_published(server, f"udp://127.0.0.1:{port}", state, hand)
+    assert frame["count"] == 1
+    assert frame["sequence"] <= snapshot.version
+
+
+def test_unix_subscriber_receives_snapshots(hand, tmp_path):
+    url = f"unix:{tmp_path / 'hands.sock'}"
+    state = SharedState()
+    server = LandmarkServer(state, urls=(url,), max_hands=2)
+    _, frame = receive_published(server, url, state, hand)
+    assert frame["hands"][0]["hand_id"] == 1
+    assert not (tmp_path / "hands.sock").exists() # Removed on shutdown
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from landmarks import HANDEDNESS_UNKNOWN
+from shm import LandmarkBlock, SharedFrameRing
+
+
+def test_landmark_block_round_trip(hand):
+    block = LandmarkBlock(max_hands=2)
+    try:
+        assert block.read()[2] == [] # Zeroed on creation
+        hands = [hand(0.1), hand(2.0, shift=0.2), hand(1.0)]
+        block.write(12.5, hands, handedness=[1, 0, 1])
+
+        reader = LandmarkBlock(max_hands=2, name=block.name, lock=block.lock)
+        sequence, timestamp, landmarks, handedness = reader.read()
+        assert sequence == 1
+        assert timestamp == 12.5
+        assert len(landmarks) == 2 # Capped at max_hands
+        np.testing.assert_array_equal(landmarks[1], hands[1])
+        assert handedness == [1, 0]
+
+        block.write(13.0, [hand(0.1)]) # Handedness unknown
+        assert reader.read()[0] == 2
+        assert reader.read()[3] == [HANDEDNESS_UNKNOWN]
+        reader.close()
+    finally:
+        block.close()
+
+
+def test_reader_gives_up_while_a_write_is_in_progress():
+    block = LandmarkBlock(max_hands=1)
+    try:
+        with block.lock: # Writer stalled half-way
+            assert block.read(timeout=0.01) is None
+        assert block.read() is not None
+    finally:
+        block.close()
+
+
+def test_attaching_needs_the_owners_lock():
+    block = LandmarkBlock(max_hands=1)
+    try:
+        with pytest.raises(ValueError):
+            LandmarkBlock(max_hands=1, name=block.name)
+    finally:
+        block.close()
+
+
+def test_frame_ring_cycles_through_its_slots():
+    ring = SharedFrameRing((4, 6, 3), slots=2)
+    try:
+        frames = [np.full((4, 6, 3), value, dtype=np.uint8) for value in (1, 2, 3)]
+        assert [ring.write(frame) for frame in frames] == [0, 1, 0]
+
+        other = SharedFrameRing((4, 6, 3), slots=2, name=ring.name)
+        assert (other.view(0) == 3).all() and (other.view(1) == 2).all()
+        other.close()
+    finally:
+        ring.close()
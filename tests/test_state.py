@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+
+from config import SharedState
+
+
+def test_publish_builds_a_new_snapshot():
+    state = SharedState()
+    first = state.snapshot()
+    published = state.publish(gesture="Scroll", fps=30.0)
+
+    assert state.snapshot() is published
+    assert published.version == first.version + 1
+    assert (published.gesture, published.fps) == ("Scroll", 30.0)
+    assert published.hand_detected == first.hand_detected
+    assert first.gesture != "Scroll" # Never mutated
+
+
+def test_wait_for_version_wakes_on_publish():
+    state = SharedState()
+    version = state.snapshot().version
+    threading.Timer(0.02, state.publish, kwargs={"fps": 25.0}).start()
+
+    snapshot = state.wait_for_version(version, timeout=2.0)
+    assert snapshot.version == version + 1
+    assert snapshot.fps == 25.0
+
+
+def test_wait_for_version_times_out_with_the_current_snapshot():
+    state = SharedState()
+    assert state.wait_for_version(state.snapshot().version, timeout=0.01) is state.snapshot()
+
+
+def test_settings_are_copy_on_write():
+    state = SharedState()
+    before = state.settings
+    after = state.update_settings(margin=0.2, cursor_active=False)
+
+    assert state.settings is after
+    assert (after.margin, after.cursor_active) == (0.2, False)
+    assert before.margin != 0.2 and before.cursor_active
+
+
+def test_preview_is_off_until_someone_watches():
+    state = SharedState()
+    assert state.settings.preview_fps == 0
+
+
+def test_wait_for_update_wakes_on_settings_change():
+    state = SharedState()
+    snapshot, settings = state.snapshot(), state.settings
+    threading.Timer(0.02, state.update_settings, kwargs={"margin": 0.25}).start()
+
+    woken, latest = state.wait_for_update(snapshot.version, settings, timeout=2.0)
+    assert woken is snapshot
+    assert latest.margin == 0.25
+
+
+def test_wait_for_update_times_out_without_changes():
+    state = SharedState()
+    snapshot, settings = state.wait_for_update(state.snapshot().version, state.settings, timeout=0.01)
+    assert (snapshot, settings) == (state.snapshot(), state.settings)
+
+
+def test_frame_version_changes_with_each_preview_frame():
+    state = SharedState()
+    version = state.frame_version()
+    state.update_frame(np.zeros((480, 640, 3), dtype=np.uint8))
+    assert state.frame_version() != version
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+
+from replay import TraceSource
+from traces import HEADER_DTYPE, INDEX_DTYPE, INDEX_SUFFIX, TraceReader, TraceWriter
+
+
+def write_session(path, hand):
+    # Frame 0: two hands, frame 1: none, frame 2: one
+    writer = TraceWriter(path)
+    writer.write(10.0, 0, [hand(0.1), hand(2.0)], [3, 4], [0, 1], [1, 0])
+    writer.write(10.5, 1)
+    writer.write(11.0, 2, [hand(1.0)], [3])
+    writer.close()
+    return writer
+
+
+def test_round_trip(tmp_path, hand):
+    path = str(tmp_path / "session.trace")
+    writer = write_session(path, hand)
+    reader = TraceReader(path)
+
+    assert writer.records == len(reader) == 4
+    assert reader.frame_count == 3
+    assert reader["timestamp"].tolist() == [10.0, 10.0, 10.5, 11.0]
+    assert reader["hand_id"].tolist() == [3, 4, -1, 3]
+    assert reader["handedness"].tolist() == [0, 1, -1, -1]
+    assert reader["gesture"].tolist() == [1, 0, 0, 0]
+    assert np.array_equal(reader.frame(0)["landmarks"][1], hand(2.0))
+    assert np.array_equal(reader.frame(2)["landmarks"][0], hand(1.0))
+
+
+def test_float16_round_trip(tmp_path, hand):
+    path = str(tmp_path / "session.trace")
+    writer = TraceWriter(path, landmark_dtype=np.float16)
+    writer.write(10.0, 0, [hand(0.1)])
+    writer.close()
+
+    landmarks = TraceReader(path)[0]["landmarks"]
+    assert landmarks.dtype == np.float16
+    assert np.allclose(landmarks, hand(0.1), atol=1e-3)
+
+
+def test_truncated_last_record_is_ignored(tmp_path, hand):
+    # A crash mid-write leaves part of a record at the end of the file
+    path = str(tmp_path / "session.trace")
+    write_session(path, hand)
+    record_size = TraceReader(path).dtype.itemsize
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (record_size // 2))
+
+    reader = TraceReader(path)
+    assert len(reader) == 4
+    assert reader.frame_count == 3
+    assert reader["hand_id"].tolist() == [3, 4, -1, 3]
+
+
+def test_frame_boundaries_come_from_the_index(tmp_path, hand):
+    path = str(tmp_path / "session.trace")
+    write_session(path, hand)
+    assert np.fromfile(path + INDEX_SUFFIX, dtype=INDEX_DTYPE).tolist() == [0, 2, 3]
+
+    # Frame numbers before the last indexed frame are never read
+    records = np.memmap(path, dtype=TraceReader(path).dtype, mode="r+", offset=HEADER_DTYPE.itemsize)
+    records["frame"][:3] = 7
+    records.flush()
+    assert TraceReader(path).frame_starts.tolist() == [0, 2, 3, 4]
+
+
+def test_frames_missing_from_the_index_are_scanned(tmp_path, hand):
+    # A crash before the index caught up, or no index at all
+    path = str(tmp_path / "session.trace")
+    write_session(path, hand)
+    with open(path + INDEX_SUFFIX, "r+b") as f:
+        f.truncate(INDEX_DTYPE.itemsize + 3) # Frame 0, then part of an entry
+    assert TraceReader(path).frame_starts.tolist() == [0, 2, 3, 4]
+
+    os.remove(path + INDEX_SUFFIX)
+    assert TraceReader(path).frame_starts.tolist() == [0, 2, 3, 4]
+
+
+def test_header_only_trace_is_empty(tmp_path):
+    path = str(tmp_path / "empty.trace")
+    TraceWriter(path).close()
+
+    reader = TraceReader(path)
+    assert len(reader) == 0
+    assert reader.frame_count == 0
+
+
+def test_trace_source_replays_frames_with_recorded_spacing(tmp_path, hand):
+    path = str(tmp_path / "session.trace")
+    write_session(path, hand)
+    source = TraceSource(path)
+
+    frames, timestamps = [], []
+    while source.isOpened():
+        success, frame = source.read()
+        assert success
+        frames.append(frame)
+        timestamps.append(source.timestamp)
+
+    assert [len(frame.hands) for frame in frames] == [2, 0, 1]
+    assert frames[0].handedness == (0, 1)
+    assert np.allclose(np.diff(timestamps), [0.5, 0.5])
@@ -0,0 +1,82 @@
+import time
+
+from config import SharedState
+from hands import TrackedHand
+from mouse import NullMouse
+from pipeline import InferenceResult
+from replay import open_replay
+from tracker import ActuationStage, HandTracker
+
+
+class FakeCursor:
+    # Records what the actuation stage asks of the cursor thread
+    bounds = None
+
+    def __init__(self):
+        self.pushes = 0
+        self.deactivated = 0
+
+    def push(self, x, y, timestamp):
+        self.pushes += 1
+
+    def deactivate(self):
+        self.deactivated += 1
+
+
+class SlowMouse(NullMouse):
+    # Takes a while to let go of a button, like a backend stuck on a busy
+    # display; longer than stop() waits for the capture stage
+    def release(self, button="left"):
+        time.sleep(1.5)
+        super().release(button)
+
+
+def result(timestamp, hands, tracked_ids):
+    return InferenceResult(0, timestamp, None, bool(hands), tuple(hands), frozenset(tracked_ids))
+
+
+def test_hidden_primary_keeps_the_cursor_until_its_track_expires(hand):
+    state = SharedState()
+    state.update_settings(cursor_active=True)
+    stage = ActuationStage(state, FakeCursor(), NullMouse(), None, state.timer)
+    actions = []
+    stage.actions.put = actions.append
+
+    first, second = TrackedHand(1, 0, hand(2.0)), TrackedHand(2, 0, hand(2.0, shift=0.3))
+    stage.actuate(result(1.0, [first, second], {1, 2}))
+    engine = stage.gesture_engines[1]
+    assert stage.primary_id == 1
+    actions.clear() # Taking over the cursor starts from no buttons held
+
+    # Missed for a frame: still the primary, same filter and gesture state
+    stage.actuate(result(1.03, [second], {1, 2}))
+    assert stage.primary_id == 1
+    assert stage.gesture_engines[1] is engine
+    assert actions == []
+
+    stage.actuate(result(1.06, [first, second], {1, 2}))
+    assert stage.primary_id == 1 and stage.gesture_engines[1] is engine
+
+    # Track expired: the cursor changes hands and buttons are let go
+    stage.actuate(result(1.7, [second], {2}))
+    assert stage.primary_id == 2
+    assert 1 not in stage.gesture_engines
+    assert [action.kind for action in actions] == ["release_all"]
+
+
+def test_stop_waits_for_every_stage_that_uses_the_mouse(record_trace):
+    # A held pinch in a trace replayed at the recorded pace, stopped midway
+    state = SharedState()
+    source, detector = open_replay(record_trace([2.0] * 5 + [0.1] * 295), realtime=True)
+    mouse = SlowMouse(record=True)
+    tracker = HandTracker(state, source=source, detector=detector, mouse=mouse)
+    tracker.start()
+    state.wait_for_version(20, timeout=5.0)
+    stages = (tracker.actuation_stage, tracker.actuation_stage.executor, tracker.cursor)
+    assert all(stage.is_alive() for stage in stages)
+
+    tracker.stop()
+    assert not any(stage.is_alive() for stage in stages)
+    assert [event[1] for event in mouse.events][-1:] == ["release"] # Let go before returning
+    tracker.join(timeout=2.0)
+
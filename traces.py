@@ -0,0 +1,218 @@
+import argparse
+import os
+import queue
+import threading
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+# Binary landmark traces: a 16-byte header followed by fixed-size records,
+# one per hand per frame (a frame without hands gets one record with
+# hand_id -1), appended in frame order:
+#
+#   header  magic "HTRACE\0\0" (8 bytes), version u2, record size u2,
+#           landmark dtype u2 (4 = float32, 2 = float16), reserved u2
+#   record  timestamp f8 (perf_counter at capture), frame u4, hand_id i2,
+#           handedness i1 (landmarks.HANDEDNESS_*), gesture i1
+#           (gestures.GESTURE_CODES), landmarks (21, 3) in detector space
+#
+# All little-endian and unpadded, so a trace is read with np.memmap at any
+# size: nothing is parsed or loaded until it is indexed. A crash can only
+# cost the record being written when it happened.
+#
+# Next to it, "<trace>.index" holds each frame's first record index (u8), so
+# a reader finds frame boundaries without reading every record. Frames
+# missing from it (a crash, or a trace without one) are found by scanning
+# the records after the last indexed frame.
+
+TRACE_MAGIC = b"HTRACE\0\0"
+TRACE_VERSION = 1
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("record_size", "<u2"),
+    ("landmark_size", "<u2"),
+    ("reserved", "<u2"),
+])
+LANDMARK_DTYPES = {4: np.dtype("<f4"), 2: np.dtype("<f2")}
+INDEX_SUFFIX = ".index"
+INDEX_DTYPE = np.dtype("<u8")
+
+
+def record_dtype(landmark_dtype=np.float32):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("frame", "<u4"),
+        ("hand_id", "<i2"),
+        ("handedness", "i1"),
+        ("gesture", "i1"),
+        ("landmarks", np.dtype(landmark_dtype).newbyteorder("<"), (NUM_LANDMARKS, 3)),
+    ])
+
+
+class TraceWriter:
+    """Appends landmark records to a trace file without blocking the caller.
+
+    write() only builds the records and hands them to a writer thread
+    through an unbounded queue (a frame is a few hundred bytes), so the
+    tracking loop never waits on the disk. close() writes what is left and
+    closes the file.
+    """
+
+    def __init__(self, path, landmark_dtype=np.float32):
+        self.path = path
+        self.dtype = record_dtype(landmark_dtype)
+        header = np.zeros((), dtype=HEADER_DTYPE)
+        header["magic"] = TRACE_MAGIC
+        header["version"] = TRACE_VERSION
+        header["record_size"] = self.dtype.itemsize
+        header["landmark_size"] = np.dtype(landmark_dtype).itemsize
+
+        self.file = open(path, "wb")
+        self.file.write(header.tobytes())
+        self.index = open(path + INDEX_SUFFIX, "wb")
+        self.records = 0
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_records, daemon=True)
+        self._writer.start()
+
+    def write(self, timestamp, frame, hands=(), hand_ids=None, handedness=None, gestures=None):
+        # One frame: `hands` are (21, 3) arrays; the optional per-hand
+        # sequences default to -1 (unknown) / 0 (no gesture)
+        records = np.zeros(max(1, len(hands)), dtype=self.dtype)
+        records["timestamp"] = timestamp
+        records["frame"] = frame
+        if hands:
+            records["landmarks"] = hands
+            records["hand_id"] = hand_ids if hand_ids is not None else range(len(hands))
+            records["handedness"] = handedness if handedness is not None else -1
+            if gestures is not None:
+                records["gesture"] = gestures
+        else:
+            records["hand_id"] = -1
+            records["handedness"] = -1
+        self._queue.put(records)
+
+    def _write_records(self):
+        while True:
+            records = self._queue.get()
+            if records is None:
+                break
+            # Coalesce whatever else is queued into one write
+            batch = [records]
+            while True:
+                try:
+                    records = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if records is None:
+                    self._queue.put(None)
+                    break
+                batch.append(records)
+            starts = []
+            for records in batch:
+                starts.append(self.records)
+                self.file.write(records.tobytes())
+                self.records += len(records)
+            # After the records: an index entry never points past the trace
+            self.index.write(np.asarray(starts, dtype=INDEX_DTYPE).tobytes())
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        self.file.close()
+        self.index.close()
+
+
+class TraceReader:
+    """Memory-mapped view of a trace file.
+
+    `records` is a structured np.memmap over the whole file; indexing and
+    slicing (reader[1000:2000], reader["timestamp"]) touch only the pages
+    they need. A partially written last record is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header[0]["magic"] != TRACE_MAGIC.rstrip(b"\0"):
+            raise ValueError(f"{path} is not a landmark trace")
+        header = header[0]
+        if header["version"] != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {header['version']} in {path}")
+        self.dtype = record_dtype(LANDMARK_DTYPES[int(header["landmark_size"])])
+        if self.dtype.itemsize != header["record_size"]:
+            raise ValueError(f"Corrupt trace header in {path}")
+
+        count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self._frame_starts = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def _read_index(self):
+        # Frame starts from the index file that point inside the records
+        path = self.path + INDEX_SUFFIX
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=np.int64)
+        count = os.path.getsize(path) // INDEX_DTYPE.itemsize
+        starts = np.fromfile(path, dtype=INDEX_DTYPE, count=count).astype(np.int64)
+        return starts[:np.searchsorted(starts, len(self.records))]
+
+    @property
+    def frame_starts(self):
+        # Index of each frame's first record, plus len(self) at the end
+        if self._frame_starts is None:
+            count = len(self.records)
+            if count == 0:
+                self._frame_starts = np.zeros(1, dtype=np.int64)
+                return self._frame_starts
+            starts = self._read_index()
+            # Only the records from the last indexed frame on are scanned:
+            # normally just that frame's, all of them without an index
+            tail = int(starts[-1]) if len(starts) else 0
+            frames = self.records["frame"][tail:]
+            boundaries = np.flatnonzero(frames[1:] != frames[:-1]) + 1 + tail
+            self._frame_starts = np.concatenate((starts[:-1], [tail], boundaries, [count])).astype(np.int64)
+        return self._frame_starts
+
+    @property
+    def frame_count(self):
+        return len(self.frame_starts) - 1
+
+    def frame(self, i):
+        # Records of the i-th frame in the file (hands, or one hand_id -1 record)
+        return self.records[self.frame_starts[i]:self.frame_starts[i + 1]]
+
+    def close(self):
+        self.records = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a binary landmark trace.")
+    parser.add_argument("path", help="Trace file (.trace)")
+    args = parser.parse_args()
+
+    reader = TraceReader(args.path)
+    records = reader.records
+    print(f"Trace:       {args.path} ({os.path.getsize(args.path) / 1e6:.1f} MB)")
+    print(f"Records:     {len(records)} ({reader.dtype.itemsize} bytes each, {reader.dtype['landmarks'].base} landmarks)")
+    if len(records):
+        duration = float(records["timestamp"][-1] - records["timestamp"][0])
+        with_hands = np.count_nonzero(records["hand_id"] >= 0)
+        print(f"Frames:      {reader.frame_count} over {duration:.1f}s")
+        print(f"Hands:       {with_hands} records, {len(np.unique(records['hand_id'][records['hand_id'] >= 0]))} distinct IDs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,159 +1,475 @@
-import cv2
-import mediapipe as mp
 import threading
-import pyautogui
 import time
-import numpy as np
 
 from config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT,
-    CAMERA_INDEX,
-    COLOR_HAND,
-    GESTURE_NONE, GESTURE_PINCH, GESTURE_SCROLL
+    CAMERA_INDEX, MAX_NUM_HANDS, INFERENCE_MODE, SCHEDULER_ENABLED,
+    COLOR_HAND, GESTURE_NONE
 )
-from gestures import GestureEngine
+from actuation import ActionExecutor, CursorActuator
+from capture import CameraSource
+from detector import HandDetector
+from eventbus import EVENT_END, EVENT_HOLD, EVENT_START, GestureEvent
+from gestures import Action, GestureEngine
+from hands import HandMatcher
+from inference_worker import RemoteHandDetector
+from landmarks import INDEX_FINGER_TIP, draw_landmarks, freeze, mirror
+from mapping import LayoutWatcher, ScreenMapper, desktop_layout
+from mouse import create_mouse
+from pipeline import END_OF_STREAM, ActionQueue, FramePacket, InferenceResult, LatestQueue
+from scheduler import InferenceScheduler
 
-class HandTracker(threading.Thread):
-    def __init__(self, shared_state):
+# How long a stage waits on its input queue before re-checking `running`
+STAGE_POLL_TIMEOUT = 0.1
+
+# How long stop() waits for a stage to exit. The actuation stage first waits
+# up to a second for its ActionExecutor to release the buttons.
+STAGE_JOIN_TIMEOUT = 2.0
+
+# Pause after a failed read from a source that does not pace itself
+CAPTURE_RETRY_DELAY = 0.01
+
+
+class CaptureStage(threading.Thread):
+    """Grabs camera frames as fast as the device delivers them.
+
+    Frames go into a latest-frame-wins queue, so a slow inference stage never
+    stalls the camera and never sees a stale backlog. A finite source
+    (replay) is followed by END_OF_STREAM once it runs out.
+
+    Frames are stamped with the source's grab time when it has one
+    (capture.CameraSource), otherwise with the time read() returned.
+    """
+
+    def __init__(self, cap, output, timer):
         super().__init__()
-        self.state = shared_state
-        self.daemon = True # Ensure thread stops when main thread exits
+        self.daemon = True
+        self.cap = cap
+        self.output = output
+        self.timer = timer
         self.running = True
-        
-        # MediaPipe Setup
-        self.mp_hands = mp.solutions.hands
-        self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7,
-            model_complexity=1
-        )
-        
-        self.cap = cv2.VideoCapture(CAMERA_INDEX)
-        self.gesture_engine = GestureEngine(shared_state)
-        
-        # Performance monitoring
-        self.prev_time = 0
-        
-        # Cursor State
-        self.mouse_pressed = False
-        
+
     def run(self):
+        index = 0
+        failing = False
         while self.running and self.cap.isOpened():
+            start = time.perf_counter()
             success, image = self.cap.read()
             if not success:
-                print("Ignoring empty camera frame.")
+                if not failing:
+                    print("Ignoring empty camera frame.")
+                    failing = True
+                if not isinstance(self.cap, CameraSource):
+                    time.sleep(CAPTURE_RETRY_DELAY) # CameraSource waits by itself
+                continue
+            failing = False
+
+            done = time.perf_counter()
+            self.timer.record("capture", done - start)
+            grabbed = getattr(self.cap, "timestamp", None)
+            if grabbed is None:
+                grabbed = done
+            self.output.put(FramePacket(index, grabbed, image))
+            index += 1
+
+        if getattr(self.cap, "finite", False):
+            self.output.put(END_OF_STREAM)
+
+    def stop(self):
+        self.running = False
+
+
+class ActuationStage(threading.Thread):
+    """Turns the newest landmarks into cursor targets, clicks and gestures.
+
+    Every tracked hand gets its own gesture stream (GestureEngine, with its
+    own landmark filter state and gesture table state). The primary hand,
+    the oldest one tracked, drives the cursor, and its gesture actions go to
+    an ActionExecutor thread that presses, releases and scrolls. Every
+    hand's gesture starts, holds and ends are published to `bus` (see
+    eventbus.py) for anything else that reacts to gestures.
+    """
+
+    def __init__(self, shared_state, cursor, mouse, results, timer, recorder=None, bus=None):
+        super().__init__()
+        self.daemon = True
+        self.state = shared_state
+        self.cursor = cursor
+        self.mouse = mouse
+        self.results = results
+        self.timer = timer
+        self.recorder = recorder # Gets every frame's hands with their gestures
+        self.bus = bus # Gets every hand's gesture events
+        self.running = True
+
+        # Cursor State
+        self.primary_id = None
+        self.controls_enabled = False
+
+        # Camera -> desktop mapping, following monitor changes
+        self.mapper = ScreenMapper(desktop_layout(mouse.size()))
+        self.layout_watcher = LayoutWatcher(self.mapper, mouse.size())
+        self.cursor_layout = None # Layout the cursor's bounds were taken from
+
+        # Gesture Streams
+        self.gesture_engines = {} # hand_id -> GestureEngine
+        self.hand_gestures = {} # hand_id -> (gesture, position) last frame, for events
+        self.actions = ActionQueue()
+        self.executor = ActionExecutor(mouse, self.actions, timer=timer)
+
+        # Performance monitoring
+        self.prev_time = 0
+
+    def run(self):
+        self.executor.start()
+        self.layout_watcher.start()
+        try:
+            self.actuate_loop()
+        finally:
+            # Carries out what is queued, then lets go of every button
+            self.layout_watcher.stop()
+            self.executor.stop()
+            self.executor.join(timeout=1.0)
+
+    def actuate_loop(self):
+        while self.running:
+            result = self.results.get(timeout=STAGE_POLL_TIMEOUT)
+            if result is None:
                 continue
+            if result is END_OF_STREAM:
+                break
 
-            # Flip the image horizontally for a later selfie-view display
-            # Convert the BGR image to RGB.
-            image = cv2.flip(image, 1)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # To improve performance, optionally mark the image as not writeable to
-            # pass by reference.
-            image_rgb.flags.writeable = False
-            results = self.hands.process(image_rgb)
-
-            # Draw the hand annotations on the image.
-            image_rgb.flags.writeable = True
-            image = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR) # Convert back for display/processing logic if needed
-            
-            h, w, _ = image.shape
-            
-            current_gesture = GESTURE_NONE
-            hand_detected = False
-
-            if results.multi_hand_landmarks:
-                hand_detected = True
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Update Shared State with landmarks for Calibration/Dashboard
-                    self.state.set_landmarks(hand_landmarks)
-
-                    # Draw landmarks on debug frame
-                    self.mp_draw.draw_landmarks(
-                        image,
-                        hand_landmarks,
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_draw.DrawingSpec(color=COLOR_HAND, thickness=2, circle_radius=2),
-                        self.mp_draw.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2)
-                    )
-                    
-                    # 1. Gesture Detection
-                    
-                    current_gesture = GESTURE_NONE
-
-                    # Shared State Update Logic for Gesture
-                    if current_gesture != GESTURE_NONE:
-                        pass # Keep it set
-                    
-                    # 2. Movement Logic (Index Finger Tip)
-                    if self.state.cursor_active and not self.state.is_calibrating_active():
-                        # Get Index Finger Tip
-                        index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                        
-                        # Convert to screen coordinates
-                        margin = self.state.get_margin() # Dynamic Margin
-                        
-                        # Use numpy interp to map camera coords -> screen coords
-                        target_x = np.interp(index_tip.x, (margin, 1-margin), (0, SCREEN_WIDTH))
-                        target_y = np.interp(index_tip.y, (margin, 1-margin), (0, SCREEN_HEIGHT))
-                        
-                        # Smoothing
-                        final_x, final_y = self.gesture_engine.smooth_coordinates(target_x, target_y)
-                        
-                        # Apply limits
-                        final_x = max(0, min(SCREEN_WIDTH - 1, final_x))
-                        final_y = max(0, min(SCREEN_HEIGHT - 1, final_y))
-                        
-                        pyautogui.moveTo(final_x, final_y, _pause=False)
-                        
-                        # 3. Click Logic (Pinch)
-                        thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                        
-                        dist = np.hypot(index_tip.x - thumb_tip.x, index_tip.y - thumb_tip.y)
-                        
-                        # Logic: if distance < threshold -> Click
-                        if dist < self.state.click_threshold:
-                            if not self.mouse_pressed:
-                                pyautogui.mouseDown()
-                                self.mouse_pressed = True
-                                current_gesture = GESTURE_PINCH
-                        else:
-                            if self.mouse_pressed:
-                                pyautogui.mouseUp()
-                                self.mouse_pressed = False
-            else:
-                self.state.set_landmarks(None) # Clear landmarks
-                if self.mouse_pressed:
-                    pyautogui.mouseUp()
-                    self.mouse_pressed = False
-            
-            # FPS Calculation
-            curr_time = time.time()
+            gesture, hands = self.actuate(result)
+            if self.recorder is not None:
+                self.recorder.record_hands(result.timestamp, result.index, hands)
+
+            # FPS Calculation (frames that made it through the whole pipeline)
+            curr_time = time.perf_counter()
             fps = 1 / (curr_time - self.prev_time) if self.prev_time != 0 else 0
             self.prev_time = curr_time
-            
-            # Update Shared State
-            self.state.update_frame(image)
-            self.state.set_hand_detected(hand_detected)
-            if current_gesture != GESTURE_NONE:
-                 self.state.set_gesture(current_gesture)
-            elif hand_detected and self.mouse_pressed:
-                 self.state.set_gesture(GESTURE_PINCH)
-            elif hand_detected:
-                 self.state.set_gesture(GESTURE_NONE)
-            else:
-                 self.state.set_gesture("No Hand")
-                 
-            self.state.set_fps(fps)
-            
-            time.sleep(0.001)
+
+            # One snapshot per frame for the dashboard and calibration
+            self.state.publish(
+                captured=result.timestamp,
+                landmarks=result.landmarks,
+                hand_detected=result.hand_detected,
+                gesture=gesture,
+                fps=fps,
+                hands=hands
+            )
+            # Capture -> snapshot published, whether or not the cursor moved
+            self.timer.record("frame_latency", time.perf_counter() - result.timestamp)
+
+            if self.state.settings.startup_message:
+                self.state.update_settings(startup_message="") # First frame is through
+
+    def actuate(self, result):
+        # Returns the primary hand's gesture and every hand with its gesture
+        settings = self.state.settings
+
+        # Denoise each hand's landmarks once, with its own filter, and run
+        # its gesture table on the result; movement and gestures share it
+        with self.timer.measure("gesture"):
+            filtered, recognised = self.evaluate_hands(result)
+
+        # The oldest tracked hand drives the cursor, and keeps it through
+        # frames it is missed in until its track expires. `primary` is its
+        # index in result.hands, None while it is hidden.
+        primary_id = self.primary_id
+        if primary_id not in result.tracked_ids:
+            primary_id = result.hands[0].hand_id if result.hands else None
+        primary = next((i for i, hand in enumerate(result.hands) if hand.hand_id == primary_id), None)
+
+        enabled = settings.cursor_active and not settings.is_calibrating
+        if primary_id != self.primary_id or enabled != self.controls_enabled:
+            # Cursor changes hands, the hand is gone or control was switched
+            # on/off: start clean, gestures in progress have to start over
+            self.cursor.deactivate()
+            self.cancel_gestures(result.timestamp, (self.primary_id, primary_id))
+            self.primary_id = primary_id
+            self.controls_enabled = enabled
+        elif primary is not None and enabled:
+            for action in recognised[primary][1]:
+                self.actions.put(action)
+
+        if primary is not None and enabled:
+            # Movement Logic (Index Finger Tip): calibrated camera -> desktop
+            # mapping, cached until calibration or the monitors change
+            target_x, target_y = self.mapper.map(filtered[primary][INDEX_FINGER_TIP, :2], settings)
+            if self.mapper.layout is not self.cursor_layout:
+                self.cursor_layout = self.mapper.layout
+                self.cursor.bounds = self.cursor_layout.pixel_bounds
+
+            # The cursor thread moves towards this at its own, higher rate
+            self.cursor.push(target_x, target_y, result.timestamp)
+
+        if self.bus is not None:
+            self.publish_events(result, filtered, recognised)
+
+        gesture = recognised[primary][0] if primary is not None else "No Hand"
+
+        # Other hands only report their gestures (one OS cursor to drive)
+        hands = tuple(
+            hand._replace(gesture=recognised[i][0])
+            for i, hand in enumerate(result.hands)
+        )
+        return gesture, hands
+
+    def evaluate_hands(self, result):
+        # Per hand, in result.hands order: filtered landmarks and the
+        # (gesture, actions) its gesture table produced. Hands missed in this
+        # frame keep their engines; engines of expired tracks are dropped, so
+        # a hand that returns later starts fresh.
+        engines = {i: e for i, e in self.gesture_engines.items() if i in result.tracked_ids}
+        filtered = []
+        recognised = []
+        for hand in result.hands:
+            engine = self.gesture_engines.get(hand.hand_id) or GestureEngine(self.state)
+            engines[hand.hand_id] = engine
+            hand_landmarks = engine.filter_landmarks(hand.landmarks, result.timestamp)
+            filtered.append(hand_landmarks)
+            recognised.append(engine.recognise(hand_landmarks, result.timestamp))
+        self.gesture_engines = engines
+        return filtered, recognised
+
+    def publish_events(self, result, filtered, recognised):
+        # Compares each hand's gesture with its previous frame's: a change
+        # ends the old gesture and starts the new one, no change holds it.
+        # Hidden hands hold their gesture silently; hands whose track expired
+        # end it at their last position.
+        timestamp = result.timestamp
+        current = {}
+        for i, hand in enumerate(result.hands):
+            gesture = recognised[i][0]
+            position = tuple(float(v) for v in filtered[i][INDEX_FINGER_TIP, :2])
+            previous, last_position = self.hand_gestures.get(hand.hand_id, (GESTURE_NONE, None))
+            primary = hand.hand_id == self.primary_id
+            if previous != gesture and previous != GESTURE_NONE:
+                self.bus.publish(GestureEvent(EVENT_END, previous, hand.hand_id, timestamp, position, primary))
+            if gesture != GESTURE_NONE:
+                kind = EVENT_HOLD if gesture == previous else EVENT_START
+                self.bus.publish(GestureEvent(kind, gesture, hand.hand_id, timestamp, position, primary))
+            current[hand.hand_id] = (gesture, position)
+
+        for hand_id, (previous, position) in self.hand_gestures.items():
+            if hand_id in current:
+                continue
+            if hand_id in result.tracked_ids:
+                current[hand_id] = (previous, position)
+            elif previous != GESTURE_NONE:
+                self.bus.publish(GestureEvent(EVENT_END, previous, hand_id, timestamp, position, False))
+        self.hand_gestures = current
+
+    def cancel_gestures(self, timestamp, hand_ids):
+        for hand_id in hand_ids:
+            engine = self.gesture_engines.get(hand_id)
+            if engine is not None:
+                engine.cancel(timestamp)
+        # Covers hands that are gone along with their engines
+        self.actions.put(Action("release_all", timestamp=timestamp))
+
+    def stop(self):
+        self.running = False
+
+
+def join_stages(*stages, timeout=STAGE_JOIN_TIMEOUT):
+    # Waits for stopped stages, and the ActionExecutor of an actuation stage,
+    # to exit, so the mouse can be closed once nothing uses it anymore. Safe
+    # to call from one of the stages.
+    current = threading.current_thread()
+    for stage in stages:
+        for thread in (stage, getattr(stage, "executor", None)):
+            if thread is not None and thread is not current and thread.is_alive():
+                thread.join(timeout)
+
+
+class HandTracker(threading.Thread):
+    """Inference stage of the tracking pipeline.
+
+    Owns the capture and actuation stages and starts them alongside itself:
+
+        CaptureStage -> LatestQueue -> HandTracker (MediaPipe)
+                     -> LatestQueue -> ActuationStage (gestures)
+                     -> CursorActuator (fixed-rate cursor movement)
+                      + ActionExecutor (clicks, drags, scrolling)
+
+    Everything external can be swapped for offline runs: `source` replaces
+    the camera (see replay.py), `detector` replaces MediaPipe (or
+    `inference_mode="process"` moves it to a worker process), `mouse` the
+    real cursor (see mouse.py), and `recorder` receives every frame that
+    reaches inference and the hands of every frame that reaches actuation
+    (see recorder.py). Gesture events go to `bus` (see eventbus.py). With
+    SCHEDULER_ENABLED, frames in which nothing moved skip MediaPipe and
+    reuse the last hands (see scheduler.py).
+
+    Every stage records its timings into `shared_state.timer`.
+    """
+
+    def __init__(self, shared_state, source=None, detector=None, mouse=None, recorder=None, camera=CAMERA_INDEX, inference_mode=INFERENCE_MODE, max_num_hands=MAX_NUM_HANDS, bus=None):
+        super().__init__()
+        self.state = shared_state
+        self.daemon = True # Ensure thread stops when main thread exits
+        self.running = True
+
+        self.timer = shared_state.timer
+
+        # Camera, MediaPipe and mouse are created in start_up() on the tracker
+        # thread unless given here, so constructing the tracker is instant.
+        self.detector = detector
+        self.cap = source
+        self.camera = camera # Opened when no source is given
+        self.inference_mode = inference_mode # "process" runs MediaPipe in a worker process
+        self.max_num_hands = max_num_hands
+        self.mouse = mouse
+        self.recorder = recorder
+        self.bus = bus
+        self.matcher = HandMatcher()
+        self.scheduler = InferenceScheduler() if SCHEDULER_ENABLED else None
+        self.last_tracked = ()
+        self.cursor = None
+
+        # Pipeline Stages (replayed sources must not drop frames)
+        lossless = getattr(source, "finite", False)
+        self.frames = LatestQueue(maxsize=1, lossless=lossless)
+        self.results = LatestQueue(maxsize=1, lossless=lossless)
+        self.capture_stage = None
+        self.actuation_stage = None
+
+        # Frame Processing
+        self.last_preview_time = 0.0
+
+    def start_up(self):
+        # The slow part of starting: the MediaPipe graph loads on a helper
+        # thread while this one opens the camera (both mostly wait on native
+        # code). Progress is shown through settings.startup_message.
+        errors = []
+        loader = None
+        if self.detector is None:
+            def load_detector():
+                try:
+                    # ROI cropping + adaptive input size live in the detector
+                    if self.inference_mode == "process":
+                        self.detector = RemoteHandDetector(max_num_hands=self.max_num_hands, timer=self.timer)
+                    else:
+                        self.detector = HandDetector(max_num_hands=self.max_num_hands, timer=self.timer)
+                except Exception as e:
+                    errors.append(e)
+            loader = threading.Thread(target=load_detector, daemon=True)
+            loader.start()
+
+        if self.cap is None:
+            self.state.update_settings(startup_message="Opening camera...")
+            self.cap = CameraSource(self.camera)
+            self.cap.open()
+        if self.mouse is None:
+            self.mouse = create_mouse()
+
+        if loader is not None:
+            self.state.update_settings(startup_message="Loading hand model...")
+            loader.join()
+        if errors:
+            print(f"Failed to load hand model: {errors[0]}")
+            self.state.update_settings(startup_message=f"Hand model failed: {str(errors[0])[:40]}")
+            return False
+        if not self.cap.isOpened():
+            self.state.update_settings(startup_message="Camera not available")
+            return False
+
+        self.cursor = CursorActuator(self.mouse, timer=self.timer)
+        self.capture_stage = CaptureStage(self.cap, self.frames, self.timer)
+        self.actuation_stage = ActuationStage(self.state, self.cursor, self.mouse, self.results, self.timer, self.recorder, self.bus)
+        self.state.update_settings(startup_message="Waiting for first frame...")
+        return True
+
+    def run(self):
+        if not self.start_up() or not self.running:
+            self.stop()
+            return
+
+        self.capture_stage.start()
+        self.actuation_stage.start()
+        self.cursor.start()
+
+        while self.running:
+            packet = self.frames.get(timeout=STAGE_POLL_TIMEOUT)
+            if packet is None:
+                continue
+            if packet is END_OF_STREAM:
+                # Replay finished: let actuation drain, then shut down
+                self.results.put(END_OF_STREAM)
+                self.actuation_stage.join()
+                self.stop()
+                break
+
+            result = self.infer(packet)
+            self.results.put(result)
+
+    def infer(self, packet):
+        # The frame itself is never flipped: the selfie mirror is folded into
+        # the landmark x coordinates instead, which saves a full-frame pass.
+        image = packet.image
+        has_frames = getattr(self.cap, "has_frames", True)
+
+        infer = True
+        if self.scheduler is not None and has_frames:
+            with self.timer.measure("motion"):
+                infer = self.scheduler.should_infer(image, packet.timestamp, self.state.settings, bool(self.last_tracked))
+
+        if infer:
+            hands = self.detector.process(image)
+            handedness = getattr(self.detector, "handedness", None)
+
+            for hand_landmarks in hands:
+                # Selfie view: mirror x instead of flipping the frame
+                freeze(mirror(hand_landmarks))
+        else:
+            # Nothing moved since the last inferred frame: same hands again
+            hands = [hand.landmarks for hand in self.last_tracked]
+            handedness = [hand.handedness for hand in self.last_tracked]
+
+        if self.recorder is not None and has_frames:
+            self.recorder.record_frame(image)
+
+        # Stable IDs, oldest hand (the one driving the cursor) first
+        tracked = self.matcher.update(self.camera, hands, packet.timestamp, handedness)
+        primary = tracked[0].landmarks if tracked else None
+        self.last_tracked = tracked
+
+        self.publish_preview(image, tracked)
+
+        return InferenceResult(packet.index, packet.timestamp, primary, primary is not None, tracked, self.matcher.live_ids())
+
+    def publish_preview(self, image, tracked):
+        # Annotating and publishing a display frame only pays off when the
+        # dashboard preview is open, and only as often as it refreshes.
+        preview_fps = self.state.settings.preview_fps
+        if preview_fps <= 0 or not getattr(self.cap, "has_frames", True):
+            return
+
+        now = time.perf_counter()
+        if now - self.last_preview_time < 1.0 / preview_fps:
+            return
+        self.last_preview_time = now
+
+        def annotate(preview):
+            # Draw on the mirrored preview-sized RGB slot (colours are symmetric)
+            for hand in tracked:
+                draw_landmarks(preview, hand.landmarks, line_color=(255, 255, 255), point_color=COLOR_HAND)
+
+        with self.timer.measure("draw"):
+            self.state.update_frame(image, annotate, mirror=True)
 
     def stop(self):
+        # Safe at any point, including while start_up() is still running
         self.running = False
-        if self.cap.isOpened():
+        for stage in (self.capture_stage, self.actuation_stage, self.cursor):
+            if stage is not None:
+                stage.stop()
+        self.frames.clear() # Wake a capture stage blocked on a lossless put
+        if self.capture_stage is not None and self.capture_stage.is_alive():
+            self.capture_stage.join(timeout=1.0)
+        join_stages(self.actuation_stage, self.cursor)
+        if self.cap is not None and self.cap.isOpened():
             self.cap.release()
-        self.hands.close()
+        if self.detector is not None:
+            self.detector.close()
+            self.detector = None